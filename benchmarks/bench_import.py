@@ -0,0 +1,135 @@
+"""
+Import-time / cold-start benchmark.
+
+    python benchmarks/bench_import.py --repeat 7 --output import.json
+
+Every target runs in a fresh interpreter `--repeat` times, with its own config
+(STOCKIFY_CONFIG) whose state and logs point into a temporary directory.
+- modules: time of `import <module>` measured inside the child, so interpreter
+  start-up is left out; plus the heaviest third-party packages it pulls in
+  (`python -X importtime`, cumulative)
+- commands: wall time of short-lived CLIs (listing tickers, the manifest, the
+  dead-letter queue, the catalog), interpreter start-up included
+Results are written as JSON so they can be compared between releases.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASE_CONFIG = REPO_ROOT / "config" / "config.yaml"
+
+MODULES = [
+    "stockify.config",
+    "stockify.utils.logger",
+    "stockify.utils.tickers",
+    "stockify.ingest.manifest",
+    "stockify.ingest.dead_letter",
+    "stockify.ingest.quarantine",
+    "stockify.query.catalog",
+    "stockify.orchestration.replay",
+    "stockify.ingest.fetcher",
+    "stockify.orchestration.daily_ingest",
+]
+COMMANDS = {
+    "tickers": ["-m", "stockify.utils.tickers", "--count"],
+    "manifest": ["-m", "stockify.ingest.manifest", "--runs", "1"],
+    "dead_letter_list": ["-m", "stockify.orchestration.replay", "list", "--limit", "1"],
+    "quarantine_list": ["-m", "stockify.ingest.quarantine", "--limit", "1"],
+    "catalog_datasets": ["-m", "stockify.query.catalog"],
+}
+HEAVY_PACKAGES = ("pandas", "numpy", "pyarrow", "polars", "duckdb", "yfinance", "psutil", "yaml")
+
+_CHILD = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def summarise(samples: list[float]) -> dict:
+    return {"median_ms": round(1000 * statistics.median(samples), 1),
+            "min_ms": round(1000 * min(samples), 1),
+            "max_ms": round(1000 * max(samples), 1)}
+
+
+def heavy_imports(module: str, env: dict, cwd: Path) -> dict:
+    """Cumulative import time of the heavy third-party packages `module` loads."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, cwd=cwd, capture_output=True, text=True, check=True).stderr
+    found = {}
+    for line in stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] in HEAVY_PACKAGES:
+            found[parts[2]] = round(int(parts[1]) / 1000, 1)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--commands", nargs="+", default=list(COMMANDS), choices=list(COMMANDS))
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    with open(BASE_CONFIG) as f:
+        config = yaml.safe_load(f)
+
+    with tempfile.TemporaryDirectory(prefix="stockify-bench-") as tmp:
+        work_dir = Path(tmp)
+        config["paths"].update(logs=str(work_dir / "logs"), state=str(work_dir / "state"))
+        config_file = work_dir / "config.yaml"
+        config_file.write_text(yaml.safe_dump(config))
+        env = dict(os.environ, STOCKIFY_CONFIG=str(config_file))
+
+        modules = {}
+        for module in args.modules:
+            samples = [float(subprocess.run([sys.executable, "-c", _CHILD.format(module=module)], env=env,
+                                            cwd=work_dir, capture_output=True, text=True, check=True).stdout)
+                       for _ in range(args.repeat)]
+            modules[module] = {**summarise(samples), "heavy_imports_ms": heavy_imports(module, env, work_dir)}
+            print(f"import {module:<38} {modules[module]['median_ms']:>8} ms  "
+                  f"(heavy: {', '.join(modules[module]['heavy_imports_ms']) or '-'})")
+
+        commands = {}
+        for name in args.commands:
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *COMMANDS[name]], env=env, cwd=work_dir,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                samples.append(time.perf_counter() - started)
+            commands[name] = {"argv": COMMANDS[name], **summarise(samples)}
+            print(f"command {name:<37} {commands[name]['median_ms']:>8} ms")
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+        baseline = (time.perf_counter() - started) / args.repeat
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_rev": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                  capture_output=True, text=True).stdout.strip() or None,
+        "repeat": args.repeat,
+        "interpreter_startup_ms": round(1000 * baseline, 1),
+        "modules": modules,
+        "commands": commands,
+    }
+    output = args.output or REPO_ROOT / "benchmarks" / "results" / f"import-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+End-to-end ingestion benchmark against the offline synthetic source.
+
+    python benchmarks/bench_ingest.py --universe 500,2000 --concurrency 5,10,20 \\
+        --batch-size 200 --format csv_json,parquet --output results.json
+
+Every combination runs `trigger_daily_ingestion` in a fresh subprocess with its
+own config (STOCKIFY_CONFIG), state directory and output directory, so runs do
+not share caches, manifests or watermarks. Reported per run: symbols/sec,
+items/sec, p50/p95/p99 fetch and write latency, peak RSS, files and bytes written.
+Results are written as JSON so they can be compared between releases.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASE_CONFIG = REPO_ROOT / "config" / "config.yaml"
+DEFAULT_METHODS = "history,get_news,get_actions,earnings_dates,calendar"
+
+
+def csv_list(cast):
+    return lambda value: [cast(v) for v in value.split(",") if v]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def dir_stats(path: Path) -> tuple[int, int]:
+    files = [p for p in path.rglob("*") if p.is_file()]
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+def run_child(args) -> None:
+    """Runs inside the subprocess: one ingestion run, result JSON to --result."""
+    from stockify.orchestration.daily_ingest import trigger_daily_ingestion
+    from stockify.ingest.rate_control import rate_controller
+    from stockify.utils.metrics import metrics
+
+    symbols = [f"SYN{i:05d}.NS" for i in range(args.universe[0])]
+    methods = args.methods
+
+    start = time.perf_counter()
+    summary = asyncio.run(trigger_daily_ingestion(methods, symbols=symbols))
+    elapsed = time.perf_counter() - start
+
+    run_metrics = metrics.summary()
+    result = {
+        "seconds": round(elapsed, 3),
+        "items": summary["total"],
+        "symbols_per_sec": round(len(symbols) / elapsed, 2),
+        "items_per_sec": round(summary["total"] / elapsed, 2),
+        "pipeline": summary,
+        "fetch_latency": run_metrics["stages"].get("fetch", {}).get("all"),
+        "write_latency": run_metrics["stages"].get("write", {}).get("all"),
+        "stages": {stage: values["all"] for stage, values in run_metrics["stages"].items()},
+        "counters": {name: values["all"] for name, values in run_metrics["counters"].items()},
+        "rate_controller": rate_controller.snapshot(),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    Path(args.result).write_text(json.dumps(result))
+
+
+def run_case(case: dict, args) -> dict:
+    """Prepare an isolated config + working directory and run one case in a subprocess."""
+    with open(BASE_CONFIG) as f:
+        config = yaml.safe_load(f)
+
+    with tempfile.TemporaryDirectory(prefix="stockify-bench-") as tmp:
+        work_dir = Path(tmp)
+        config["ingestion"].update(source="synthetic",
+                                   max_concurrency=case["max_concurrency"],
+                                   batch_size=case["batch_size"])
+        config["ingestion"].setdefault("history_bulk", {})["enabled"] = case["history_bulk"] == "on"
+        config["writer"]["format"] = case["writer_format"]
+        config["rate_limit"].update(initial_rate=args.max_rate, max_rate=args.max_rate, burst=case["max_concurrency"])
+        config["synthetic_source"].update(latency_ms_median=args.latency_ms, error_rate=args.error_rate,
+                                          rate_limit_every=args.rate_limit_every, rate_limit_burst=args.rate_limit_burst)
+        config.setdefault("catalog", {})["refresh_after_run"] = False         # ingestion only, not the catalog load
+        config["paths"].update(logs=str(work_dir / "logs"), state=str(work_dir / "state"))
+
+        config_file = work_dir / "config.yaml"
+        config_file.write_text(yaml.safe_dump(config))
+        result_file = work_dir / "result.json"
+
+        cmd = [sys.executable, __file__, "--child", "--result", str(result_file),
+               "--universe", str(case["universe"]), "--methods", ",".join(args.methods)]
+        env = dict(os.environ, STOCKIFY_CONFIG=str(config_file))
+        subprocess.run(cmd, cwd=work_dir, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+
+        result = json.loads(result_file.read_text())
+        files, size = dir_stats(work_dir / "DataStorage")
+
+    return {**case, **result, "files_written": files, "bytes_written": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--universe", type=csv_list(int), default=[500], help="symbol counts to sweep")
+    parser.add_argument("--concurrency", type=csv_list(int), default=[10], help="max_concurrency values to sweep")
+    parser.add_argument("--batch-size", type=csv_list(int), default=[200], help="batch_size values to sweep")
+    parser.add_argument("--format", type=csv_list(str), default=["parquet"], help="writer formats to sweep")
+    parser.add_argument("--history-bulk", type=csv_list(str), default=["on"],
+                        help="multi-ticker `history` downloads (on / off) to sweep")
+    parser.add_argument("--methods", type=csv_list(str), default=DEFAULT_METHODS.split(","))
+    parser.add_argument("--latency-ms", type=float, default=50, help="median synthetic request latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--rate-limit-burst", type=int, default=0)
+    parser.add_argument("--max-rate", type=float, default=1000, help="rate controller ceiling (req/s)")
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file")
+    parser.add_argument("--verbose", action="store_true", help="show the child runs' log output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    cases = [
+        {"universe": u, "max_concurrency": c, "batch_size": b, "writer_format": w, "history_bulk": h}
+        for u, c, b, w, h in itertools.product(args.universe, args.concurrency, args.batch_size, args.format,
+                                               args.history_bulk)
+    ]
+
+    results = []
+    for case in cases:
+        result = run_case(case, args)
+        results.append(result)
+        fetch, write = result["fetch_latency"] or {}, result["write_latency"] or {}
+        print(f"universe={case['universe']:<6} conc={case['max_concurrency']:<3} batch={case['batch_size']:<5} "
+              f"{case['writer_format']:<9} bulk={case['history_bulk']:<3} {result['symbols_per_sec']:>8} sym/s  "
+              f"requests {result['rate_controller']['requests']}  "
+              f"fetch p50/p99 {fetch.get('p50_ms')}/{fetch.get('p99_ms')} ms  "
+              f"write p50/p99 {write.get('p50_ms')}/{write.get('p99_ms')} ms  "
+              f"rss {result['peak_rss_mb']} MB  files {result['files_written']}  bytes {result['bytes_written']}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_rev": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                  capture_output=True, text=True).stdout.strip() or None,
+        "settings": {"latency_ms": args.latency_ms, "error_rate": args.error_rate,
+                     "rate_limit_every": args.rate_limit_every, "rate_limit_burst": args.rate_limit_burst,
+                     "max_rate": args.max_rate, "methods": args.methods},
+        "results": results,
+    }
+    output = args.output or REPO_ROOT / "benchmarks" / "results" / f"ingest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
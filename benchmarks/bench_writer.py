@@ -0,0 +1,111 @@
+"""
+Compare the per-symbol CSV/JSON writer against the buffered Parquet writer.
+
+    python benchmarks/bench_writer.py --symbols 2000 --rows 250 --output writer.json
+
+Each backend writes the same synthetic `history` frames and `get_news` lists
+into its own temporary directory. Reported per backend and dataset:
+files written, bytes on disk, wall time and files/sec + symbols/sec.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from stockify.ingest.writer import RawDataWriter
+from stockify.ingest.parquet_writer import ParquetBatchWriter
+
+BATCH_DATE = "2026-01-01"
+
+
+def make_history(rng: np.random.Generator, rows: int) -> pd.DataFrame:
+    index = pd.bdate_range(end=BATCH_DATE, periods=rows, tz="Asia/Kolkata", name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, rows)),
+        "High": close * (1 + np.abs(rng.normal(0, 0.01, rows))),
+        "Low": close * (1 - np.abs(rng.normal(0, 0.01, rows))),
+        "Close": close,
+        "Volume": rng.integers(10_000, 5_000_000, rows),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def make_news(rng: np.random.Generator, items: int) -> list:
+    return [{"id": f"{rng.integers(1 << 62):x}",
+             "content": {"title": "Quarterly results announced", "summary": "x" * 200,
+                         "pubDate": BATCH_DATE, "provider": {"displayName": "Wire"}}}
+            for _ in range(items)]
+
+
+def dir_stats(path: Path) -> tuple[int, int]:
+    files = [p for p in path.rglob("*") if p.is_file()]
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+def run_backend(backend: str, func: str, payloads: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+
+        if backend == "parquet":
+            writer = ParquetBatchWriter(root_dir=root)
+            for symbol, data in payloads.items():
+                writer.write(symbol, func, BATCH_DATE, data)
+            writer.flush()
+        else:
+            for symbol, data in payloads.items():
+                RawDataWriter(root_dir=root, symbol=symbol, func=func,
+                              data=data, batch_date=BATCH_DATE).write_data_to_raw_layer()
+
+        elapsed = time.perf_counter() - start
+        files, size = dir_stats(root)
+
+    return {
+        "backend": backend,
+        "func": func,
+        "symbols": len(payloads),
+        "files": files,
+        "bytes_on_disk": size,
+        "seconds": round(elapsed, 4),
+        "files_per_sec": round(files / elapsed, 2) if elapsed else None,
+        "symbols_per_sec": round(len(payloads) / elapsed, 2) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=250, help="history rows per symbol")
+    parser.add_argument("--news", type=int, default=10, help="news items per symbol")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    symbols = [f"SYM{i:05d}" for i in range(args.symbols)]
+    datasets = {
+        "history": {s: make_history(rng, args.rows) for s in symbols},
+        "get_news": {s: make_news(rng, args.news) for s in symbols},
+    }
+
+    results = []
+    for func, payloads in datasets.items():
+        for backend in ("csv_json", "parquet"):
+            # writers mutate DataFrames in place, so every backend gets its own copy
+            fresh = {s: (d.copy() if isinstance(d, pd.DataFrame) else d) for s, d in payloads.items()}
+            result = run_backend(backend, func, fresh)
+            results.append(result)
+            print(f"{func:<10} {backend:<9} files={result['files']:<6} "
+                  f"bytes={result['bytes_on_disk']:<12} {result['seconds']:.2f}s "
+                  f"({result['symbols_per_sec']} symbols/s)")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
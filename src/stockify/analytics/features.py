@@ -0,0 +1,300 @@
+# src/stockify/analytics/features.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import math
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+import polars as pl
+from stockify.orchestration.compact import raw_partitions, read_raw_partition
+from stockify.orchestration.shard import shard_of
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.config import add_settings_argument, get_raw_data_path, get_settings, get_state_path
+
+# CONFIGURATION
+_settings = get_settings()
+_features_config = _settings.features
+_TIMEZONE = _settings.catalog.timezone
+_SMA_WINDOWS = _features_config.sma_windows
+_VOLATILITY_WINDOW = _features_config.volatility_window
+_HIGH_LOW_WINDOW = _features_config.high_low_window
+_BUCKETS = _features_config.buckets
+_MAX_PARTS = _features_config.max_parts_per_bucket
+_COMPRESSION = _settings.compaction.compression
+
+_PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+_BASE_COLUMNS = ("symbol", "date", *_PRICE_COLUMNS, "Volume", "Dividends", "Stock Splits", "fetched_on")
+_TRADING_DAYS = 252
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    as_of_date    TEXT PRIMARY KEY,
+    source_files  INTEGER NOT NULL,
+    processed_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol        TEXT PRIMARY KEY,
+    last_date     TEXT NOT NULL,
+    last_action   TEXT
+);
+"""
+
+
+def compute_features(base: pl.DataFrame, sma_windows: Iterable[int] = _SMA_WINDOWS,
+                     volatility_window: int = _VOLATILITY_WINDOW,
+                     high_low_window: int = _HIGH_LOW_WINDOW) -> pl.DataFrame:
+    """
+    Derived columns for a frame of daily bars (`_BASE_COLUMNS`), all symbols at
+    once: every expression runs `.over("symbol")` on the frame sorted by
+    (symbol, date), nothing loops per symbol.
+
+    Bars come from `Ticker.history(auto_adjust=True)`, i.e. already adjusted
+    for the corporate actions Yahoo knew of on the day they were fetched
+    (`fetched_on`). `adj_factor` adds the actions that arrived later: the
+    product of the split (1 / ratio) and dividend (1 - dividend / previous
+    close) factors of every action dated after the bar's fetch date.
+    """
+    frame = base.sort("symbol", "date")
+    ratio = (
+        pl.when(pl.col("Stock Splits") > 0).then(1 / pl.col("Stock Splits")).otherwise(1.0)
+        * pl.when(pl.col("Dividends") > 0)
+          .then(1 - pl.col("Dividends") / pl.col("Close").shift(1).over("symbol"))
+          .otherwise(1.0)
+    )
+    actions = (
+        frame.with_columns(_ratio=ratio)
+        .filter(pl.col("_ratio") != 1.0)
+        .select("symbol", pl.col("date").alias("_action_date"),
+                # product of this and every later action of the symbol
+                pl.col("_ratio").cum_prod(reverse=True).over("symbol").alias("adj_factor"))
+        .sort("_action_date")
+    )
+    frame = (
+        frame.sort("fetched_on")
+        .join_asof(actions, left_on="fetched_on", right_on="_action_date", by="symbol",
+                   strategy="forward", allow_exact_matches=False)
+        .drop("_action_date")
+        .with_columns(pl.col("adj_factor").fill_null(1.0))
+        .sort("symbol", "date")
+    )
+
+    adjusted = [(pl.col(c) * pl.col("adj_factor")).alias(f"adj_{c.lower()}") for c in _PRICE_COLUMNS]
+    frame = frame.with_columns(adjusted)
+    log_return = (pl.col("adj_close") / pl.col("adj_close").shift(1)).log()
+    return frame.with_columns(
+        (pl.col("adj_close") / pl.col("adj_close").shift(1) - 1).over("symbol").alias("ret_1d"),
+        log_return.over("symbol").alias("log_ret_1d"),
+        (log_return.rolling_std(volatility_window) * math.sqrt(_TRADING_DAYS))
+        .over("symbol").alias(f"vol_{volatility_window}d"),
+        *[pl.col("adj_close").rolling_mean(window).over("symbol").alias(f"sma_{window}") for window in sma_windows],
+        pl.col("adj_high").rolling_max(high_low_window).over("symbol").alias("high_52w"),
+        pl.col("adj_low").rolling_min(high_low_window).over("symbol").alias("low_52w"),
+    )
+
+
+class FeatureStore:
+    """
+    Post-ingest analytics over the raw `history` layer, written as a columnar
+    feature store:
+        root_dir/features/history/bucket=<NN>/part-*.parquet
+
+    Symbols are spread over `buckets` by the same stable hash the shards use.
+    Each row is one daily bar with its raw columns, `fetched_on`, the
+    corporate-action adjusted prices and the derived features (`compute_features`).
+
+    Incremental: a SQLite index remembers the raw date partitions already
+    processed and the last bar per symbol. A run reads only new partitions and
+    recomputes only the trailing window the new bars depend on (the longest
+    rolling window), appending one part file per touched bucket. A symbol
+    whose new bars carry a dividend or split is recomputed in full, since the
+    adjustment reaches back over its whole history; its bucket is rewritten.
+    Buckets are also rewritten into a single file once they pile up more than
+    `max_parts` part files.
+    """
+    def __init__(self, root_dir: Path, db_path: Path, timezone: str = _TIMEZONE, buckets: int = _BUCKETS,
+                 max_parts: int = _MAX_PARTS, compression: str = _COMPRESSION):
+        self.root_dir = root_dir
+        self.out_root = root_dir/"features"/"history"
+        self.timezone = timezone
+        self.buckets = buckets
+        self.max_parts = max_parts
+        self.compression = compression
+        self.window = max(*_SMA_WINDOWS, _VOLATILITY_WINDOW, _HIGH_LOW_WINDOW) + 1      # + the previous close
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # Reading
+    def _bucket_dir(self, bucket: int) -> Path:
+        return self.out_root/f"bucket={bucket:02d}"
+
+    def _read_new_bars(self, partitions: dict[str, list[Path]]) -> Optional[pl.DataFrame]:
+        frames = []
+        for as_of_date, files in partitions.items():
+            frame = read_raw_partition("history", files)
+            if frame is None:
+                continue
+            frames.append(frame.with_columns(fetched_on=pl.lit(as_of_date).str.to_date()))
+        if not frames:
+            return None
+        frame = pl.concat(frames, how="diagonal_relaxed")
+        frame = frame.with_columns(
+            date=pl.col("Date").dt.convert_time_zone(self.timezone).dt.date(),
+            **{c: pl.col(c).cast(pl.Float64) for c in ("Dividends", "Stock Splits") if c in frame.columns},
+        )
+        for column in ("Dividends", "Stock Splits"):
+            if column not in frame.columns:
+                frame = frame.with_columns(pl.lit(0.0).alias(column))
+        # a bar delivered twice keeps its latest copy
+        return (frame.select(_BASE_COLUMNS)
+                .with_columns(*(pl.col(c).cast(pl.Float64) for c in _PRICE_COLUMNS), pl.col("Volume").cast(pl.Int64))
+                .sort("fetched_on")
+                .unique(subset=["symbol", "date"], keep="last"))
+
+    def _read_bucket(self, bucket: int) -> Optional[pl.DataFrame]:
+        parts = sorted(self._bucket_dir(bucket).glob("part-*.parquet"))
+        return pl.concat([pl.read_parquet(p) for p in parts], how="diagonal_relaxed") if parts else None
+
+    # Writing
+    def _write_part(self, bucket: int, frame: pl.DataFrame, replace: bool) -> Path:
+        out_dir = self._bucket_dir(bucket)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_file = out_dir/f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        stale = sorted(out_dir.glob("part-*.parquet")) if replace else []
+        tmp_path = out_dir/f".{out_file.name}.tmp"
+        frame.sort("symbol", "date").write_parquet(tmp_path, compression=self.compression)
+        os.replace(tmp_path, out_file)
+        for path in stale:
+            path.unlink()
+        return out_file
+
+    # Run
+    def pending_partitions(self, until: Optional[str] = None) -> dict[str, list[Path]]:
+        done = {row[0] for row in self._conn.execute("SELECT as_of_date FROM partitions")}
+        return {d: files for d, files in raw_partitions(self.root_dir, "history").items()
+                if d not in done and (until is None or d <= until)}
+
+    def run(self, until: Optional[str] = None, rebuild: bool = False) -> dict:
+        """Process the raw partitions not seen yet. `rebuild` drops the store and starts over."""
+        if rebuild:
+            shutil.rmtree(self.out_root, ignore_errors=True)
+            with self._conn:
+                self._conn.execute("DELETE FROM partitions")
+                self._conn.execute("DELETE FROM symbols")
+
+        partitions = self.pending_partitions(until)
+        stats = {"partitions": len(partitions), "new_bars": 0, "symbols": 0, "full_recomputes": 0,
+                 "buckets_appended": 0, "buckets_rewritten": 0}
+        if not partitions:
+            return stats
+
+        new = self._read_new_bars(partitions)
+        if new is not None:
+            last_dates = pl.DataFrame(
+                self._conn.execute("SELECT symbol, last_date FROM symbols").fetchall(),
+                schema={"symbol": pl.String, "last_date": pl.String}, orient="row",
+            ).with_columns(pl.col("last_date").str.to_date())
+            # only bars after what the store already holds
+            new = (new.join(last_dates, on="symbol", how="left")
+                   .filter(pl.col("last_date").is_null() | (pl.col("date") > pl.col("last_date")))
+                   .drop("last_date"))
+            stats["new_bars"] = new.height
+            stats["symbols"] = new["symbol"].n_unique()
+
+            full = set(new.filter((pl.col("Dividends") > 0) | (pl.col("Stock Splits") > 0))["symbol"].unique())
+            buckets = {symbol: shard_of(symbol, self.buckets) for symbol in new["symbol"].unique()}
+            new = new.with_columns(_bucket=pl.col("symbol").replace_strict(buckets, return_dtype=pl.Int64))
+            for (bucket,), bucket_new in new.partition_by("_bucket", as_dict=True).items():
+                appended = self._update_bucket(bucket, bucket_new.drop("_bucket"), full)
+                stats["buckets_appended" if appended else "buckets_rewritten"] += 1
+            stats["full_recomputes"] = len(full)
+
+        with self._conn:
+            now = datetime.now().isoformat(timespec="seconds")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?)",
+                [(d, len(files), now) for d, files in partitions.items()],
+            )
+        return stats
+
+    def _update_bucket(self, bucket: int, new: pl.DataFrame, full: set[str]) -> bool:
+        """Recompute and store the features of one bucket. Returns True if appended, False if rewritten."""
+        stored = self._read_bucket(bucket)
+        symbols = set(new["symbol"].unique())
+        rewrite = stored is not None and (bool(full & symbols) or
+                                          len(list(self._bucket_dir(bucket).glob("part-*.parquet"))) >= self.max_parts)
+
+        history = None
+        if stored is not None:
+            history = stored.filter(pl.col("symbol").is_in(symbols)).select(_BASE_COLUMNS)
+            # only the trailing window of symbols without new corporate actions
+            history = history.sort("symbol", "date").filter(
+                pl.col("symbol").is_in(full) |
+                (pl.int_range(pl.len()).over("symbol") >= pl.len().over("symbol") - self.window)
+            )
+        base = pl.concat([history, new], how="vertical_relaxed") if history is not None else new
+        computed = compute_features(base)
+
+        recomputed = computed.filter(pl.col("symbol").is_in(full))
+        fresh = computed.filter(~pl.col("symbol").is_in(full)).join(new.select("symbol", "date"),
+                                                                    on=["symbol", "date"], how="semi")
+        if rewrite:
+            keep = stored.filter(~pl.col("symbol").is_in(full))
+            self._write_part(bucket, pl.concat([keep, fresh, recomputed], how="diagonal_relaxed"), replace=True)
+        else:
+            self._write_part(bucket, pl.concat([fresh, recomputed], how="diagonal_relaxed"), replace=False)
+
+        summary = computed.group_by("symbol").agg(
+            last_date=pl.col("date").max().cast(pl.String),
+            last_action=pl.col("date").filter((pl.col("Dividends") > 0) | (pl.col("Stock Splits") > 0))
+            .max().cast(pl.String),
+        )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO symbols (symbol, last_date, last_action) VALUES (?, ?, ?) "
+                "ON CONFLICT (symbol) DO UPDATE SET last_date = excluded.last_date, "
+                "last_action = coalesce(excluded.last_action, symbols.last_action)",
+                summary.select("symbol", "last_date", "last_action").iter_rows(),
+            )
+        return not rewrite
+
+    def scan(self) -> pl.LazyFrame:
+        """The feature store as a polars LazyFrame; filters and projections are pushed into the scan."""
+        return pl.scan_parquet(self.out_root/"**"/"*.parquet", hive_partitioning=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def build_features(root_dir: Optional[Path] = None, until: Optional[str] = None, rebuild: bool = False) -> dict:
+    store = FeatureStore(root_dir or get_raw_data_path(), get_state_path() / "features.sqlite")
+    try:
+        return store.run(until=until, rebuild=rebuild)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Derived analytics over ingested `history`, into the feature store")
+    parser.add_argument("--until", default=None, help="last as_of_date to process (default: all)")
+    parser.add_argument("--rebuild", action="store_true", help="drop the feature store and recompute from scratch")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    stats = build_features(until=args.until, rebuild=args.rebuild)
+    logger_file.info("Feature store run: %s", stats)
+    log_terminal.info("Feature store run in %.2f seconds: %s", time.perf_counter() - start_time, stats)
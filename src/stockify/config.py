@@ -1,24 +1,340 @@
 # load and validates config
-from pathlib import Path
 import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple, Optional, get_type_hints
 import yaml
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
-CONFIG_FILE = PROJECT_ROOT / "config" / "config.yaml"
+CONFIG_FILE = Path(os.environ.get("STOCKIFY_CONFIG", PROJECT_ROOT / "config" / "config.yaml"))        # env override, e.g. for benchmarks
+
+# STOCKIFY__INGESTION__MAX_CONCURRENCY=20 overrides ingestion.max_concurrency
+ENV_PREFIX = "STOCKIFY__"
+CLI_FLAG = "--set"
+
+# libyaml parser when PyYAML was built with it, about 10x faster than the pure Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# Sections of config.yaml; the defaults apply to keys the file leaves out and are the
+# values config/config.yaml ships with, so a missing key never changes behaviour.
+# NamedTuples rather than frozen dataclasses: as immutable, but several times cheaper to define at import
+class AppSettings(NamedTuple):
+    name: str = "stockify"
+    environment: str = "local"
+
+
+class HistoryBulkSettings(NamedTuple):
+    enabled: bool = False
+    batch_size: int = 100
+    parallel_batches: int = 2
+    timeout_seconds: float = 300
+    download_threads: int = 4
+
+
+class IngestionSettings(NamedTuple):
+    source: str = "yfinance"
+    max_concurrency: int = 10
+    writer_concurrency: int = 2
+    batch_size: int = 200
+    retries: int = 3
+    retry_backoff_seconds: float = 30
+    request_timeout_seconds: float = 30
+    http_timeout_seconds: float = 20
+    zombie_headroom: int = 4
+    history_initial_period: str = "5y"
+    history_bulk: HistoryBulkSettings = HistoryBulkSettings()
+
+
+class RateLimitSettings(NamedTuple):
+    initial_rate: float = 2.0
+    min_rate: float = 0.2
+    max_rate: float = 10.0
+    additive_increase: float = 0.1
+    decrease_factor: float = 0.5
+    cooldown_seconds: float = 120
+    burst: int = 5
+
+
+class SymbolCacheSettings(NamedTuple):
+    positive_ttl_days: int = 30
+    negative_ttl_days: int = 7
+
+
+class SyntheticSourceSettings(NamedTuple):
+    seed: int = 7
+    latency_ms_median: float = 120
+    latency_sigma: float = 0.5
+    error_rate: float = 0.01
+    delisted_rate: float = 0.02
+    bse_only_rate: float = 0.03
+    rate_limit_every: int = 5000
+    rate_limit_burst: int = 25
+
+
+class WriterSettings(NamedTuple):
+    format: str = "csv_json"
+    max_buffer_rows: int = 500_000
+    max_buffer_mb: float = 64
+    compression: str = "zstd"
+
+
+class ChangeDetectionSettings(NamedTuple):
+    methods: tuple[str, ...] = ("calendar", "earnings_dates", "get_actions")
+    stable_after_checks: int = 3
+    stable_refresh_days: int = 7
+
+
+class DeadLetterSettings(NamedTuple):
+    main_pass_retries: int = 1
+    retry_after_run: bool = False
+    retry_concurrency: int = 2
+    retry_attempts: int = 3
+    max_attempts: int = 5
+
+
+class ValidationSettings(NamedTuple):
+    enabled: bool = True
+    max_nan_ratio: float = 0.05
+    price_tolerance: float = 0.01
+    stale_after_days: int = 14
+    warn_only: tuple[str, ...] = ()
+
+
+class SchedulingIntervals(NamedTuple):
+    history: int = 1
+    get_news: int = 1
+    get_actions: int = 7
+    earnings_dates: int = 7
+    calendar: int = 7
+
+
+class SchedulingSettings(NamedTuple):
+    enabled: bool = False
+    max_requests: int = 0
+    intervals: SchedulingIntervals = SchedulingIntervals()
+    max_interval_days: int = 30
+    adaptive_methods: tuple[str, ...] = ("calendar", "earnings_dates", "get_actions", "get_news")
+    backoff_after: int = 2
+    tier_sizes: tuple[int, ...] = (50, 150)
+    tier_interval_factors: tuple[float, ...] = (1.0, 2.0, 4.0)
+    tiers_file: Optional[str] = None
+    event_window_days: int = 3
+    event_methods: tuple[str, ...] = ("calendar", "earnings_dates", "get_actions", "get_news", "history")
+
+
+class CatalogSettings(NamedTuple):
+    refresh_after_run: bool = False
+    timezone: str = "Asia/Kolkata"
+    load_batch_files: int = 500
+
+
+class CompactionSettings(NamedTuple):
+    methods: tuple[str, ...] = ("get_news", "get_actions", "earnings_dates", "calendar")
+    compression: str = "zstd"
+
+
+class FeaturesSettings(NamedTuple):
+    refresh_after_run: bool = False
+    sma_windows: tuple[int, ...] = (20, 50, 200)
+    volatility_window: int = 20
+    high_low_window: int = 252
+    buckets: int = 16
+    max_parts_per_bucket: int = 30
+
+
+class LoggingSettings(NamedTuple):
+    level: str = "INFO"
+    json_lines: bool = False
+    max_bytes: int = 5 * 1024 * 1024
+    backup_count: int = 5
+
 
-def load_config():
+class MetricsSettings(NamedTuple):
+    sample_interval_seconds: float = 5
+
+
+class PathsSettings(NamedTuple):
+    raw_data: Optional[str] = None                  # machine specific, unused: raw data lives under ./DataStorage
+    logs: str = "logs"
+    state: str = "state"
+    ticker_list: str = "config/nse_tickers.csv"
+
+
+class RuntimeSettings(NamedTuple):
+    timezone: Optional[str] = "GMT +5:30"
+
+
+class Settings(NamedTuple):
+    """
+    Typed, immutable view of config.yaml with its overrides applied, parsed
+    once per process (`get_settings`). Every module reads its section from here.
+    """
+    app: AppSettings = AppSettings()
+    ingestion: IngestionSettings = IngestionSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    symbol_cache: SymbolCacheSettings = SymbolCacheSettings()
+    synthetic_source: SyntheticSourceSettings = SyntheticSourceSettings()
+    writer: WriterSettings = WriterSettings()
+    change_detection: ChangeDetectionSettings = ChangeDetectionSettings()
+    dead_letter: DeadLetterSettings = DeadLetterSettings()
+    validation: ValidationSettings = ValidationSettings()
+    scheduling: SchedulingSettings = SchedulingSettings()
+    catalog: CatalogSettings = CatalogSettings()
+    compaction: CompactionSettings = CompactionSettings()
+    features: FeaturesSettings = FeaturesSettings()
+    logging: LoggingSettings = LoggingSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    paths: PathsSettings = PathsSettings()
+    runtime: RuntimeSettings = RuntimeSettings()
+    config_file: Path = CONFIG_FILE
+    overrides: tuple[str, ...] = ()
+
+
+def _is_section(hint: Any) -> bool:
+    return getattr(hint, "__origin__", None) is None and isinstance(hint, type) and \
+        issubclass(hint, tuple) and hasattr(hint, "_fields")
+
+
+def _coerce(value: Any, hint: Any, where: str) -> Any:
+    if _is_section(hint):
+        if not isinstance(value, dict):
+            raise ValueError(f"Config `{where}` must be a mapping, got {value!r}")
+        return _build(hint, value, where)
+    origin = getattr(hint, "__origin__", None)
+    if origin is tuple:
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"Config `{where}` must be a list, got {value!r}")
+        return tuple(_coerce(item, hint.__args__[0], f"{where}[]") for item in value)
+    if origin is not None:                                  # Optional[...]
+        if value is None:
+            return None
+        hint = next(arg for arg in hint.__args__ if arg is not type(None))
+    if hint is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if hint is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if not isinstance(value, hint) or (hint is int and isinstance(value, bool)):
+        raise ValueError(f"Config `{where}` must be {hint.__name__}, got {value!r}")
+    return value
+
+
+def _build(cls: type, values: dict, where: str = "") -> Any:
+    hints = get_type_hints(cls)
+    unknown = sorted(set(values) - set(hints))
+    if unknown:
+        raise ValueError(f"Unknown config key(s) in `{where or 'root'}`: {', '.join(unknown)}")
+    return cls(**{key: _coerce(value, hints[key], f"{where}.{key}".lstrip("."))
+                  for key, value in values.items()})
+
+
+def _apply_override(tree: dict, assignment: str) -> None:
+    """`section.key=value`; the value is read as YAML, so numbers, booleans and lists keep their type."""
+    dotted, sep, raw = assignment.partition("=")
+    if not sep or not dotted:
+        raise ValueError(f"Config override must look like section.key=value, got {assignment!r}")
+    *parents, key = dotted.strip().split(".")
+    node = tree
+    for part in parents:
+        node = node.setdefault(part, {})
+        if not isinstance(node, dict):
+            raise ValueError(f"Config override {assignment!r}: `{part}` is not a section")
+    node[key] = yaml.load(raw, Loader=_YAML_LOADER)
+
+
+def env_overrides(environ: Mapping[str, str] = os.environ) -> list[str]:
+    return [f"{name[len(ENV_PREFIX):].lower().replace('__', '.')}={value}"
+            for name, value in sorted(environ.items()) if name.startswith(ENV_PREFIX)]
+
+
+def cli_overrides(argv: list[str]) -> list[str]:
+    """
+    `--set section.key=value` pairs of a command line. Entry points read them
+    from `sys.argv` and pass them to `set_cli_overrides` before importing
+    anything else, because modules take their settings at import time, before a
+    command gets to parse its arguments; `add_settings_argument` registers the
+    flag so argparse accepts it.
+    """
+    found = []
+    for index, arg in enumerate(argv):
+        if arg == CLI_FLAG and index + 1 < len(argv):
+            found.append(argv[index + 1])
+        elif arg.startswith(CLI_FLAG + "="):
+            found.append(arg[len(CLI_FLAG) + 1:])
+    return found
+
+
+def add_settings_argument(parser) -> None:
+    parser.add_argument(CLI_FLAG, action="append", default=[], metavar="SECTION.KEY=VALUE",
+                        help="override a config.yaml setting (repeatable), "
+                             f"also as env {ENV_PREFIX}SECTION__KEY=VALUE")
+
+
+# Command line overrides of the running entry point, see `set_cli_overrides`
+_cli_overrides: tuple[str, ...] = ()
+
+
+def set_cli_overrides(assignments: list[str]) -> None:
+    """
+    Apply a command's `--set` values to the settings. Has to run before the
+    first `get_settings()`, i.e. before the entry point imports the modules
+    that read their settings at import time.
+    """
+    global _cli_overrides
+    if tuple(assignments) == _cli_overrides:
+        return
+    if get_settings.cache_info().currsize:
+        raise RuntimeError("Settings were already loaded, `--set` overrides would not reach every module")
+    _cli_overrides = tuple(assignments)
+    get_settings.cache_clear()
+
+
+def get_cli_overrides() -> tuple[str, ...]:
+    return _cli_overrides
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Parse config.yaml once. Overrides are applied on top, in this order:
+    environment (`STOCKIFY__SECTION__KEY`), then the command line values an
+    entry point passed to `set_cli_overrides` (`--set section.key=value`).
+    """
     with open(CONFIG_FILE) as f:
-        return yaml.safe_load(f)
+        tree = yaml.load(f, Loader=_YAML_LOADER) or {}
+    overrides = env_overrides() + list(_cli_overrides)
+    for assignment in overrides:
+        _apply_override(tree, assignment)
+    return _build(Settings, {**tree, "config_file": CONFIG_FILE, "overrides": tuple(overrides)})
+
+
+def _freeze(value: Any) -> Any:
+    if _is_section(type(value)):
+        return MappingProxyType({key: _freeze(item) for key, item in value._asdict().items()})
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def load_config() -> Mapping[str, Any]:
+    """Plain read-only mapping of the settings, for scripts that still index config.yaml by key."""
+    return _freeze(get_settings())
+
 
 def get_logs_path() -> Path:
-    config = load_config()
-    return PROJECT_ROOT / config["paths"]["logs"]
+    return PROJECT_ROOT / get_settings().paths.logs
 
-def get_ticker_list_path() -> Path:
-    config = load_config()
-    path = PROJECT_ROOT / config["paths"]["ticker_list"]
+def get_state_path() -> Path:
+    path = PROJECT_ROOT / get_settings().paths.state
+    path.mkdir(parents=True, exist_ok=True)
     return path
 
+def get_ticker_list_path() -> Path:
+    return PROJECT_ROOT / get_settings().paths.ticker_list
+
 # def get_raw_data_path() -> Path:
 #     config = load_config()
 #     path = PROJECT_ROOT / config["paths"]["raw_data"]
@@ -0,0 +1,143 @@
+# src/stockify/ingest/bulk_history.py
+import asyncio
+import time
+from datetime import date
+from functools import partial
+from typing import Optional
+import pandas as pd
+from stockify.ingest.fetcher import FetchMetaData, get_executor, get_semaphore
+from stockify.ingest.sources import get_source_provider
+from stockify.ingest.rate_control import rate_controller
+from stockify.ingest.symbol_cache import get_symbol_cache
+from stockify.ingest.watermark import get_watermark_store
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.metrics import metrics, timed_call
+from stockify.config import get_settings
+
+# CONFIGURATION
+_ingestion_config = get_settings().ingestion
+_bulk_config = _ingestion_config.history_bulk
+BULK_HISTORY_ENABLED = _bulk_config.enabled
+BULK_BATCH_SIZE = _bulk_config.batch_size
+BULK_PARALLEL_BATCHES = _bulk_config.parallel_batches
+_BULK_TIMEOUT = _bulk_config.timeout_seconds
+_BULK_RETRIES = _ingestion_config.retries
+_HISTORY_INITIAL_PERIOD = _ingestion_config.history_initial_period
+
+
+def bulk_history_available() -> bool:
+    return BULK_HISTORY_ENABLED and get_source_provider().supports_bulk_history
+
+
+def plan_history_batches(symbols: list[str], job_run_date: date,
+                         batch_size: int = BULK_BATCH_SIZE) -> tuple[list[tuple[dict, list[str]]], list[str]]:
+    """
+    Group symbols by the window they need (watermark start, or the initial period
+    for symbols never ingested) and cut each group into batches of `batch_size`.
+    Returns ([(window, symbols), ...], symbols already up to date).
+    """
+    watermarks = get_watermark_store()
+    groups: dict[Optional[date], list[str]] = {}
+    has_new_bars: dict[date, bool] = {}
+    up_to_date = []
+    for symbol in symbols:
+        start = watermarks.next_start(symbol)
+        if start is not None:
+            if start not in has_new_bars:
+                has_new_bars[start] = not pd.bdate_range(start, job_run_date).empty
+            if not has_new_bars[start]:
+                up_to_date.append(symbol)
+                continue
+        groups.setdefault(start, []).append(symbol)
+
+    batches = []
+    for start, members in groups.items():
+        window = {"start": start.isoformat()} if start else {"period": _HISTORY_INITIAL_PERIOD}
+        batches.extend((window, members[i:i + batch_size]) for i in range(0, len(members), batch_size))
+    return batches, up_to_date
+
+
+def split_wide_history(wide: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Turn a (ticker, field) wide frame into one `Ticker.history`-shaped frame per ticker.
+    One stack to long format, then a groupby; tickers without any bar drop out.
+    """
+    if wide.empty:
+        return {}
+    fields = list(dict.fromkeys(wide.columns.get_level_values(1)))
+    long = wide.stack(level=0, future_stack=True).dropna(how="all")
+    long = long[fields].rename_axis(columns=None)
+    if "Volume" in long and long["Volume"].notna().all():
+        long["Volume"] = long["Volume"].astype("int64")
+    return {ticker: frame.droplevel(1) for ticker, frame in long.groupby(level=1, sort=False)}
+
+
+async def fetch_history_batch(symbols: list[str], window: dict,
+                              timeout: float = _BULK_TIMEOUT) -> tuple[dict[str, pd.DataFrame], list[str]]:
+    """
+    One multi-ticker download for `symbols`. Each symbol is requested as its
+    preferred exchange variant; bars at or before the symbol's watermark are dropped.
+    Returns ({symbol: frame}, symbols missing from the download), the latter
+    go through the per-ticker path with its `.NS` / `.BO` fallback.
+    """
+    provider = get_source_provider()
+    symbol_cache = get_symbol_cache()
+    watermarks = get_watermark_store()
+
+    requested: dict[str, str] = {}                      # variant -> symbol
+    for symbol in symbols:
+        variants = symbol_cache.order_variants(symbol.split(".")[0],
+                                               FetchMetaData(symbol=symbol)._generate_symbol_variants())
+        if variants:
+            requested[variants[0]] = symbol
+    if not requested:
+        return {}, symbols
+
+    wide = None
+    for attempt in range(1, _BULK_RETRIES + 1):
+        try:
+            async with get_semaphore():
+                if await get_executor().admit():
+                    metrics.incr("admission_waits", "history_bulk")
+                await rate_controller.acquire(provider.bulk_request_cost(list(requested)))
+                call = partial(provider.download_many, list(requested), **window)
+                wide = await get_executor().run(partial(timed_call, call, "history_bulk", time.perf_counter()),
+                                          timeout=timeout)
+                rate_controller.record_success()
+                metrics.incr("bulk_requests", "history")
+                break
+
+        except asyncio.TimeoutError:
+            metrics.incr("timeouts", "history_bulk")
+            logger_file.warning("Timeout on bulk history for %d symbols (attempt %d/%d)",
+                                len(requested), attempt, _BULK_RETRIES)
+
+        except Exception as e:
+            if provider.is_rate_limit_error(e):
+                metrics.incr("rate_limit_hits", "history_bulk")
+                rate_controller.record_throttle()
+                continue
+            metrics.incr("errors", "history_bulk")
+            logger_file.warning("Bulk history failed for %d symbols (attempt %d/%d)",
+                                len(requested), attempt, _BULK_RETRIES, exc_info=True)
+
+    if wide is None:
+        logger_file.error("Bulk history gave up on %d symbols, using per-ticker fetches", len(requested))
+        return {}, symbols
+
+    results = {}
+    for variant, frame in split_wide_history(wide).items():
+        symbol = requested.get(variant)
+        if symbol is None:
+            continue
+        symbol_cache.record_success(symbol.split(".")[0], variant)
+        watermark = watermarks.get(symbol)
+        # the API may hand back bars we already have (e.g. the watermark day itself)
+        results[symbol] = frame[frame.index.date > watermark] if watermark is not None else frame
+
+    missing = [symbol for symbol in symbols if symbol not in results]
+    if missing:
+        metrics.incr("bulk_fallbacks", "history", len(missing))
+        logger_file.info("%d of %d symbols missing from bulk history, falling back to per-ticker fetches",
+                         len(missing), len(symbols))
+    return results, missing
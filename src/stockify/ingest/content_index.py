@@ -0,0 +1,156 @@
+# src/stockify/ingest/content_index.py
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+import pandas as pd
+from stockify.config import get_settings, get_state_path
+from stockify.utils.logger import logger as logger_file
+
+# CONFIGURATION
+_change_config = get_settings().change_detection
+CHANGE_DETECTION_METHODS = _change_config.methods
+_STABLE_AFTER_CHECKS = _change_config.stable_after_checks
+_STABLE_REFRESH_DAYS = _change_config.stable_refresh_days
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest (
+    symbol           TEXT NOT NULL,
+    func             TEXT NOT NULL,
+    content_hash     TEXT NOT NULL,
+    location         TEXT NOT NULL,
+    confirmed        INTEGER NOT NULL,
+    last_changed     TEXT NOT NULL,
+    last_checked     TEXT NOT NULL,
+    unchanged_streak INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (symbol, func)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    symbol        TEXT NOT NULL,
+    func          TEXT NOT NULL,
+    batch_date    TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    location      TEXT NOT NULL,
+    changed       INTEGER NOT NULL,
+    PRIMARY KEY (symbol, func, batch_date)
+);
+"""
+
+
+class ContentHashIndex:
+    """
+    SQLite index of the last content hash written per (symbol, func).
+
+    - latest: hash, location of the stored copy, when it last changed and how
+      many checks in a row found it unchanged
+    - snapshots: one row per (symbol, func, batch_date) pointing at the copy
+      that holds that day's content, either freshly written or a previous one
+
+    Hashes written through the buffered parquet writer stay unconfirmed until
+    the partition is flushed (`confirm`), so a crash never leaves the index
+    claiming content that is not on disk.
+    """
+    def __init__(self, db_path: Path, stable_after_checks: int = _STABLE_AFTER_CHECKS,
+                 stable_refresh_days: int = _STABLE_REFRESH_DAYS):
+        self.db_path = db_path
+        self.stable_after_checks = stable_after_checks
+        self.stable_refresh_days = stable_refresh_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def hash_payload(data: Any) -> str:
+        """Stable hash of a fetched payload, independent of dict key order and process."""
+        if isinstance(data, pd.DataFrame):
+            text = data.to_csv(index=True)
+        else:
+            if isinstance(data, dict):
+                data = {str(k): v for k, v in data.items()}
+            text = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def unchanged(self, symbol: str, func: str, content_hash: str) -> Optional[str]:
+        """Location of the stored copy if it already has this content, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT location FROM latest WHERE symbol = ? AND func = ? AND content_hash = ? AND confirmed = 1",
+                (symbol, func, content_hash),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, symbol: str, func: str, batch_date: str, content_hash: str, location: str,
+               changed: bool, confirmed: bool = True) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO latest (symbol, func, content_hash, location, confirmed, last_changed, last_checked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (symbol, func) DO UPDATE SET "
+                "content_hash = excluded.content_hash, location = excluded.location, "
+                "confirmed = excluded.confirmed, last_checked = excluded.last_checked, "
+                "last_changed = CASE WHEN ? THEN excluded.last_changed ELSE latest.last_changed END, "
+                "unchanged_streak = CASE WHEN ? THEN 0 ELSE latest.unchanged_streak + 1 END",
+                (symbol, func, content_hash, location, int(confirmed), batch_date, batch_date, changed, changed),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (symbol, func, batch_date, content_hash, location, changed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (symbol, func, batch_date, content_hash, location, int(changed)),
+            )
+
+    def confirm(self, func: str, batch_date: str, symbols: Iterable[str]) -> None:
+        """Mark hashes written through the parquet writer as on disk."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE latest SET confirmed = 1 WHERE symbol = ? AND func = ? AND last_changed = ?",
+                [(symbol, func, batch_date) for symbol in symbols],
+            )
+
+    def due(self, func: str, symbols: list[str], batch_date: date) -> list[str]:
+        """
+        Symbols whose `func` should be fetched on `batch_date`. Content that came
+        back unchanged `stable_after_checks` times in a row is only re-checked
+        every `stable_refresh_days`.
+        """
+        cutoff = (batch_date - timedelta(days=self.stable_refresh_days)).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol FROM latest WHERE func = ? AND confirmed = 1 "
+                "AND unchanged_streak >= ? AND last_checked > ?",
+                (func, self.stable_after_checks, cutoff),
+            ).fetchall()
+        resting = {row[0] for row in rows}
+        return [symbol for symbol in symbols if symbol not in resting]
+
+    def summary(self) -> dict:
+        """Per func: tracked symbols, stable ones and the share of checks that found a change."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT l.func, COUNT(*), SUM(l.unchanged_streak >= ?), "
+                "(SELECT AVG(changed) FROM snapshots s WHERE s.func = l.func) "
+                "FROM latest l GROUP BY l.func",
+                (self.stable_after_checks,),
+            ).fetchall()
+        return {func: {"symbols": total, "stable": stable, "change_rate": round(rate or 0.0, 3)}
+                for func, total, stable, rate in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide index
+_content_index: Optional[ContentHashIndex] = None
+
+
+def get_content_index() -> ContentHashIndex:
+    global _content_index
+    if _content_index is None:
+        _content_index = ContentHashIndex(get_state_path() / "content_index.sqlite")
+        logger_file.debug("Opened content hash index %s", _content_index.db_path)
+    return _content_index
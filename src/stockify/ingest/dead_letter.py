@@ -0,0 +1,159 @@
+# src/stockify/ingest/dead_letter.py
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from stockify.config import get_settings, get_state_path
+from stockify.utils.logger import logger as logger_file
+
+# CONFIGURATION
+_MAX_ATTEMPTS = get_settings().dead_letter.max_attempts
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    symbol        TEXT NOT NULL,
+    func          TEXT NOT NULL,
+    batch_date    TEXT NOT NULL,
+    reason        TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 1,
+    status        TEXT NOT NULL,
+    first_failed  TEXT NOT NULL,
+    last_failed   TEXT NOT NULL,
+    PRIMARY KEY (symbol, func, batch_date)
+);
+CREATE INDEX IF NOT EXISTS dead_letters_status ON dead_letters (status, batch_date);
+"""
+
+
+class DeadLetterQueue:
+    """
+    SQLite queue of (symbol, func, batch_date) items whose fetch failed, with
+    the last failure reason and how many passes have tried them so far.
+
+    The main pass gives every item a single attempt and parks failures here
+    instead of backing off inline; the deferred retry pass
+    (`stockify.orchestration.replay`) drains the queue at lower concurrency,
+    at the end of the run or on a later one.
+
+    Statuses:
+        pending    waiting for the retry pass
+        exhausted  failed `max_attempts` passes, only replayed on request
+    Items that are fetched successfully are removed (`resolve`).
+    """
+    def __init__(self, db_path: Path, max_attempts: int = _MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec="seconds")
+
+    def push(self, symbol: str, func: str, batch_date: str, reason: str) -> None:
+        now = self._now()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO dead_letters (symbol, func, batch_date, reason, attempts, status, first_failed, last_failed) "
+                "VALUES (?, ?, ?, ?, 1, 'pending', ?, ?) "
+                "ON CONFLICT (symbol, func, batch_date) DO UPDATE SET "
+                "reason = excluded.reason, attempts = dead_letters.attempts + 1, last_failed = excluded.last_failed, "
+                "status = CASE WHEN dead_letters.attempts + 1 >= ? THEN 'exhausted' ELSE 'pending' END",
+                (symbol, func, batch_date, reason, now, now, self.max_attempts),
+            )
+
+    def resolve(self, symbol: str, func: str, batch_date: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM dead_letters WHERE symbol = ? AND func = ? AND batch_date = ?",
+                (symbol, func, batch_date),
+            )
+
+    def move(self, symbol: str, func: str, from_date: str, to_date: str) -> None:
+        """Re-key an item to another batch date, merged with one already queued there."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO dead_letters (symbol, func, batch_date, reason, attempts, status, first_failed, last_failed) "
+                "SELECT symbol, func, ?, reason, attempts, status, first_failed, last_failed FROM dead_letters "
+                "WHERE symbol = ? AND func = ? AND batch_date = ? "
+                "ON CONFLICT (symbol, func, batch_date) DO UPDATE SET "
+                "attempts = MAX(dead_letters.attempts, excluded.attempts), "
+                "first_failed = MIN(dead_letters.first_failed, excluded.first_failed), "
+                "status = CASE WHEN 'exhausted' IN (dead_letters.status, excluded.status) "
+                "THEN 'exhausted' ELSE 'pending' END",
+                (to_date, symbol, func, from_date),
+            )
+            self._conn.execute(
+                "DELETE FROM dead_letters WHERE symbol = ? AND func = ? AND batch_date = ?",
+                (symbol, func, from_date),
+            )
+
+    def items(self, statuses: Iterable[str] = ("pending",), func: Optional[str] = None,
+              batch_date: Optional[str] = None, symbols: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None) -> list[dict]:
+        """Queued items, oldest batch date first."""
+        statuses = list(statuses)
+        query = f"SELECT * FROM dead_letters WHERE status IN ({','.join('?' * len(statuses))})"
+        params: list = statuses
+        if func is not None:
+            query += " AND func = ?"
+            params.append(func)
+        if batch_date is not None:
+            query += " AND batch_date = ?"
+            params.append(batch_date)
+        query += " ORDER BY batch_date, func, symbol"
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if symbols is not None:
+            wanted = set(symbols)
+            rows = [row for row in rows if row["symbol"] in wanted]
+        return rows[:limit] if limit is not None else rows
+
+    def purge(self, status: Optional[str] = None, func: Optional[str] = None,
+              before: Optional[str] = None) -> int:
+        """Drop items, optionally only one status / func / batch dates before `before`. Returns the count."""
+        query, params = "DELETE FROM dead_letters WHERE 1 = 1", []
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        if func is not None:
+            query += " AND func = ?"
+            params.append(func)
+        if before is not None:
+            query += " AND batch_date < ?"
+            params.append(before)
+        with self._lock, self._conn:
+            return self._conn.execute(query, params).rowcount
+
+    def summary(self) -> dict:
+        """{func: {status: count}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT func, status, COUNT(*) FROM dead_letters GROUP BY func, status"
+            ).fetchall()
+        summary: dict[str, dict[str, int]] = {}
+        for func, status, count in rows:
+            summary.setdefault(func, {})[status] = count
+        return summary
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide queue
+_dead_letter_queue: Optional[DeadLetterQueue] = None
+
+
+def get_dead_letter_queue() -> DeadLetterQueue:
+    global _dead_letter_queue
+    if _dead_letter_queue is None:
+        _dead_letter_queue = DeadLetterQueue(get_state_path() / "dead_letter.sqlite")
+        logger_file.debug("Opened dead-letter queue %s", _dead_letter_queue.db_path)
+    return _dead_letter_queue
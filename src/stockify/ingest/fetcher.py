@@ -1,31 +1,64 @@
 import asyncio
 import random
+import time
 from functools import partial
 from typing import Any, Optional
-import pandas as pd
-import yfinance as yf
-from yfinance.exceptions import YFRateLimitError
-from concurrent.futures import ThreadPoolExecutor
-from stockify.ingest.scrapper import api_trigger
+from stockify.ingest.sources import get_source_provider
+from stockify.ingest.rate_control import rate_controller
+from stockify.ingest.symbol_cache import get_symbol_cache
 from stockify.utils.logger import logger as logger_file
-from stockify.config import load_config
+from stockify.utils.metrics import metrics, timed_call
+from stockify.utils.executor import TrackedExecutor
+from stockify.config import get_settings
 
 # CONFIGURATION
-_config = load_config()
-_MAX_CONCURRENCY = _config.get("ingestion", {}).get("max_concurrency", 5)
-_DEFAULT_TIMEOUT = _config.get("ingestion", {}).get("request_timeout_seconds", 30)
-_RATE_LIMIT_COOLDOWN = 120
+_ingestion_config = get_settings().ingestion
+_MAX_CONCURRENCY = _ingestion_config.max_concurrency
+_DEFAULT_TIMEOUT = _ingestion_config.request_timeout_seconds
+_ZOMBIE_HEADROOM = _ingestion_config.zombie_headroom
 
-executor = ThreadPoolExecutor(max_workers=_MAX_CONCURRENCY)
-semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+# Process-wide fetch pool and concurrency gate, created on first use rather than at import
+_executor: Optional[TrackedExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_executor() -> TrackedExecutor:
+    global _executor
+    if _executor is None:
+        # extra threads absorb calls that outlived their deadline, see `TrackedExecutor`
+        _executor = TrackedExecutor(max_workers=_MAX_CONCURRENCY, zombie_headroom=_ZOMBIE_HEADROOM,
+                                    thread_name_prefix="fetch")
+    return _executor
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+    return _semaphore
+
+
+class FetchFailed(Exception):
+    """
+    Final failure of one (symbol, func) fetch. `retryable` is False when every
+    variant is delisted or came back empty, i.e. a later attempt won't help.
+    """
+    def __init__(self, reason: str, retryable: bool = True):
+        super().__init__(reason)
+        self.reason = reason
+        self.retryable = retryable
 
 
 class FetchMetaData:
 
-    def __init__(self, symbol: str, retries: int = 3, period: Optional[str] = None):
+    def __init__(self, symbol: str, retries: int = 3, period: Optional[str] = None,
+                 start: Optional[str] = None):
         self.symbol = symbol
         self.retries = retries
         self.period = period
+        self.start = start                  # `history` only: fetch bars from this date to today instead of `period`
+        self.failure_reason: Optional[str] = None       # why the last `fetch_meta_data` returned None
+        self.retryable = False
 
     # Variant Generator
     def _generate_symbol_variants(self) -> list[str]:
@@ -44,8 +77,8 @@ class FetchMetaData:
         if result is None:
             return False
 
-        if isinstance(result, pd.DataFrame):
-            # empty DataFrame should be treated as failure
+        if hasattr(result, "empty"):
+            # empty DataFrame should be treated as failure (duck-typed, pandas stays out of the import)
             if result.empty:
                 return False
             return True
@@ -61,48 +94,79 @@ class FetchMetaData:
     # Fetch Logic
     async def fetch_meta_data(self,func: str,as_dict_flag: Optional[bool] = None,
                               timeout: Optional[float] = None,) -> Optional[Any]:
+        """
+        The first valid payload over the symbol's variants (`.NS` / `.BO`).
+        Only an empty result or a delisted error moves on to the next variant;
+        a variant that keeps timing out, erroring or being rate limited ends the
+        fetch with `retryable` set, so the item is retried later on the same
+        exchange instead of being resolved to the other one.
+        """
 
         timeout = timeout or _DEFAULT_TIMEOUT
-        loop = asyncio.get_running_loop()
-        variants = self._generate_symbol_variants()
 
-        for variant in variants:
-            ticker = yf.Ticker(variant)
+        # Known-good variant first, known-dead variants dropped
+        base = self.symbol.split(".")[0]
+        symbol_cache = get_symbol_cache()
+        variants = symbol_cache.order_variants(base, self._generate_symbol_variants())
+        if not variants:
+            metrics.incr("negative_cache_skips", func)
+            logger_file.debug("All variants of %s are cached as delisted, skipping `%s`", self.symbol, func)
+            self.failure_reason, self.retryable = "all variants cached as delisted", False
+            return None
+
+        provider = get_source_provider()
+
+        for position, variant in enumerate(variants):
+            if position > 0:
+                metrics.incr("variant_fallbacks", func)
+            # only how the last variant ended decides whether the item is worth retrying
+            self.failure_reason, self.retryable = None, False
+
             for attempt in range(1, self.retries + 1):
+                if attempt > 1:
+                    metrics.incr("retries", func)
                 try:
-                    async with semaphore:
-                        # Build task
+                    waited = time.perf_counter()
+                    async with get_semaphore():
+                        metrics.observe("semaphore_wait", time.perf_counter() - waited, func)
+
+                        # Admission control: hold back while timed-out calls still hold the spare threads
+                        waited = time.perf_counter()
+                        if await get_executor().admit():
+                            metrics.incr("admission_waits", func)
+                            metrics.observe("admission_wait", time.perf_counter() - waited, func)
+
+                        # Shared request budget (also waits out a pipeline-wide rate-limit pause)
+                        waited = time.perf_counter()
+                        await rate_controller.acquire()
+                        metrics.observe("rate_wait", time.perf_counter() - waited, func)
+
+                        # Build call
                         if func == "history":
-                            task = loop.run_in_executor(
-                                executor,
-                                partial(
-                                    api_trigger,ticker,func,period=self.period)
-                            )
+                            window = {"start": self.start} if self.start else {"period": self.period}
+                            call = partial(provider.fetch, variant, func, **window)
 
                         elif func in ["get_news", "get_actions", "earnings_dates"]:
-                            task = loop.run_in_executor(
-                                executor,
-                                partial(api_trigger, ticker, func)
-                            )
+                            call = partial(provider.fetch, variant, func)
 
                         else:
-                            task = loop.run_in_executor(
-                                executor,
-                                partial(
-                                    api_trigger,
-                                    ticker,
-                                    func,
-                                    as_dict=as_dict_flag
-                                )
-                            )
-
-                        result = await asyncio.wait_for(task, timeout=timeout)
+                            call = partial(provider.fetch, variant, func, as_dict=as_dict_flag)
+
+                        result = await get_executor().run(partial(timed_call, call, func, time.perf_counter()),
+                                                    timeout=timeout)
+                        rate_controller.record_success()
 
                         # Validate result
-                        if self._is_valid_result(result):
+                        validated = time.perf_counter()
+                        is_valid = self._is_valid_result(result)
+                        metrics.observe("validation", time.perf_counter() - validated, func)
+                        if is_valid:
+                            symbol_cache.record_success(base, variant)
                             return result
 
                         # Empty result → stop retrying this variant
+                        self.failure_reason = f"empty result from {variant}"
+                        metrics.incr("empty_results", func)
                         logger_file.warning(
                             "Empty or invalid result for %s (%s). Trying next variant.",
                             variant,
@@ -111,23 +175,41 @@ class FetchMetaData:
                         break
 
                 except asyncio.TimeoutError:
+                    self.failure_reason, self.retryable = f"timeout after {timeout:g}s on {variant}", True
+                    metrics.incr("timeouts", func)
                     logger_file.warning("Timeout fetching %s for %s (attempt %d/%d)", func,variant,attempt,self.retries)
+                    if attempt == self.retries:
+                        # a transient failure says nothing about the variant: give up on the item
+                        # (dead-letter queue) rather than resolve it to the other exchange
+                        return None
 
                 except Exception as e:
                     error_str = str(e)
 
-                    # Rate limit handling
-                    if isinstance(e, YFRateLimitError) or "Too Many Requests" in error_str:
-                        logger_file.error("Rate limit hit. Cooling down %ds...",_RATE_LIMIT_COOLDOWN)
-                        await asyncio.sleep(_RATE_LIMIT_COOLDOWN)
+                    # Rate limit handling: one pause for the whole pipeline, the next
+                    # attempt waits for it inside `rate_controller.acquire()`
+                    if provider.is_rate_limit_error(e):
+                        metrics.incr("rate_limit_hits", func)
+                        rate_controller.record_throttle()
+                        if attempt == self.retries:
+                            # as with timeouts and errors: give up on the item, not on to the next variant
+                            self.failure_reason, self.retryable = f"rate limited on {variant}", True
+                            return None
                         continue
 
                     # Delisted or no data handling
                     if "delisted" in error_str.lower() or "no data found" in error_str.lower():
                         logger_file.warning("Variant %s appears inactive/delisted. Trying next variant.",variant)
+                        self.failure_reason = f"{variant} delisted / no data"
+                        symbol_cache.record_dead(variant)
+                        metrics.incr("delisted_variants", func)
                         break  # Stop retrying this variant
 
+                    self.failure_reason, self.retryable = f"{type(e).__name__}: {error_str[:200]}", True
+                    metrics.incr("errors", func)
                     logger_file.warning("Retry %d for %s of %s",attempt,func,variant,exc_info=True)
+                    if attempt == self.retries:
+                        return None
 
                 if attempt < self.retries:
                     backoff = min(30, (2 ** attempt)) + random.uniform(0, 1)
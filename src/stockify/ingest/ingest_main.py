@@ -1,68 +1,187 @@
 import asyncio
-from stockify.config import get_raw_data_path
+import time
+from functools import partial
+import pandas as pd
+from stockify.config import get_raw_data_path, get_settings
 from stockify.utils.logger import logger as logger_file
 from stockify.ingest.writer import RawDataWriter
-from stockify.ingest.fetcher import FetchMetaData
-from stockify.ingest.fetcher import executor
+from stockify.ingest.parquet_writer import WRITER_FORMAT, get_parquet_writer
+from stockify.ingest.fetcher import FetchFailed, FetchMetaData
+from stockify.ingest.fetcher import get_executor
+from stockify.ingest.watermark import get_watermark_store
+from stockify.ingest.content_index import CHANGE_DETECTION_METHODS, get_content_index
+from stockify.ingest.validation import validate_payload
+from stockify.ingest.quarantine import get_quarantine
+from stockify.ingest.symbol_signals import get_symbol_signals
+from stockify.utils.metrics import metrics
 
+_HISTORY_INITIAL_PERIOD = get_settings().ingestion.history_initial_period
 
 import warnings
 warnings.filterwarnings("ignore")
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
-async def api_ingestion_load(stock_symbol, job_run_date, func, period):
-
+async def fetch_for_symbol(stock_symbol, job_run_date, func, period, retries: int = 3):
+    """
+    Network half of `api_ingestion_load`: returns the fetched payload, or an
+    empty DataFrame when `history` is already up to date. Raises `FetchFailed`
+    with the reason when the fetch failed after `retries` attempts per variant.
+    """
     as_dict_flag = True if func not in ["history", "get_news"]  else False             # history dataset will be handled as DataFrame, others as dict for easier JSON writing                           
     """ we can change the function argument to test different datasets (history, info, balancesheet) 
         without modifying the FetchMetaData class or the fetch_meta_data method. 
         This makes our testing more flexible and modular"""
     
+    # Incremental `history`: only request the bars after the stored watermark
+    watermark = None
+    start = None
+    if func == "history":
+        watermarks = get_watermark_store()
+        watermark = watermarks.get(stock_symbol)
+        if watermark is None:
+            period = period or _HISTORY_INITIAL_PERIOD
+        else:
+            start = watermarks.next_start(stock_symbol)
+            if pd.bdate_range(start, job_run_date).empty:               # no trading day since the last bar
+                logger_file.debug("History for %s is up to date (watermark %s)", stock_symbol, watermark)
+                return pd.DataFrame()
+
     # 1.  Instance creation to get data from API from `fetcher.py` module
     meta_data_obj = FetchMetaData(symbol=stock_symbol, 
-                                  retries=3, 
-                                  period=period
+                                  retries=retries, 
+                                  period=period,
+                                  start=start.isoformat() if start else None
                                   )
     
     result = await meta_data_obj \
                         .fetch_meta_data(func=func, 
                                          as_dict_flag=as_dict_flag
                                          )
+    if result is None:
+        raise FetchFailed(meta_data_obj.failure_reason or "unknown", retryable=meta_data_obj.retryable)
     
+    # The API may hand back bars we already have (e.g. the watermark day itself)
+    if watermark is not None and isinstance(result, pd.DataFrame) and not result.empty:
+        result = result[result.index.date > watermark]
+
     logger_file.debug("Data type for %s: %s", func, type(result))
-    logger_file.info("Total length of `%s` data ingested for %s: %s", func, stock_symbol, len(result)) # type: ignore
+    logger_file.debug("Total length of `%s` data ingested for %s: %s", func, stock_symbol, len(result))
+    return result
+
 
+def _buffer_for_parquet(stock_symbol, symbol_clean, func, batch_date, result, content_hash, last_bar) -> None:
+    """
+    Hand one payload to the shared parquet writer. The unconfirmed content hash
+    is recorded first: the write may flush the partition on the spot, and the
+    flush (`on_flush`) is what confirms it.
+    """
+    if content_hash is not None:
+        location = f"yf/func={func}/as_of_date={batch_date}"
+        get_content_index().record(stock_symbol, func, batch_date, content_hash, location,
+                                   changed=True, confirmed=False)
+    get_parquet_writer(get_raw_data_path()).write(symbol_clean, func, batch_date, result, source_symbol=stock_symbol)
+    # in memory until `save_watermark_store()`, after the final flush; only once the rows are buffered
+    if last_bar is not None:
+        get_watermark_store().update(stock_symbol, last_bar)
+
+
+async def write_result(stock_symbol, job_run_date, func, result) -> str:
+    """
+    Disk half of `api_ingestion_load`: hands a fetched payload to the configured
+    writer backend. Returns the manifest status of the item:
+    `done`, `buffered` (parquet, not flushed yet), `unchanged` (same content as
+    the stored copy, not written again), `quarantined` (failed validation, see
+    `stockify.ingest.validation`), `skipped`, `empty` or `failed`.
+    """
     # 2. Write If not empty
     try:
         if result is None:
             logger_file.warning("%s -> failed or timed out", stock_symbol)
-            return
+            return "failed"
 
         # Handle empty DataFrame
         if hasattr(result, "empty") and result.empty:
             logger_file.warning("Empty DataFrame for %s (%s)", stock_symbol, func)
-            return
+            return "empty"
 
         # Handle empty dict or list
         if isinstance(result, (dict, list)) and not result:
             logger_file.warning("Empty result for %s (%s)", stock_symbol, func)
-            return
+            return "empty"
 
         symbol_clean = stock_symbol.replace(".NS", "")
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+
+        # Schema / quality rules: bad payloads are held back with their reason instead of written
+        started = time.perf_counter()
+        checked = await loop.run_in_executor(executor, validate_payload, func, result, job_run_date)
+        metrics.observe("quality_check", time.perf_counter() - started, func)
+        metrics.incr("quality_checked", func)
+        for violation in checked.errors + checked.warnings:
+            metrics.incr(f"dq_{violation.rule}", func)
+        if not checked.ok:
+            await loop.run_in_executor(executor, get_quarantine().put, symbol_clean, func, str(job_run_date),
+                                       checked.errors, result)
+            metrics.incr("quarantined", func)
+            logger_file.warning("Quarantined `%s` for %s: %s", func, stock_symbol, checked.reason)
+            return "quarantined"
+        last_bar = result.index.max().date() if func == "history" else None
+
+        # Liquidity / next earnings date for the scheduler, also from payloads that turn out unchanged
+        await loop.run_in_executor(executor, get_symbol_signals().observe, stock_symbol, func, result, job_run_date)
+
+        # Slow-changing methods: skip the write when the content matches the stored copy
+        content_hash = None
+        if func in CHANGE_DETECTION_METHODS:
+            content_index = get_content_index()
+            # SQLite lookups take the index lock, so they stay off the event loop with the hashing
+            content_hash = await loop.run_in_executor(executor, content_index.hash_payload, result)
+            previous = await loop.run_in_executor(executor, content_index.unchanged, stock_symbol, func, content_hash)
+            if previous is not None:
+                await loop.run_in_executor(executor, partial(content_index.record, stock_symbol, func,
+                                                             str(job_run_date), content_hash, previous, changed=False))
+                metrics.incr("unchanged_snapshots", func)
+                logger_file.debug("`%s` for %s unchanged since %s", func, stock_symbol, previous)
+                return "unchanged"
+
+        # Buffered columnar backend: rows land in shared partition files, flushed in bulk
+        if WRITER_FORMAT == "parquet":
+            await loop.run_in_executor(executor, partial(_buffer_for_parquet, stock_symbol, symbol_clean, func,
+                                                         str(job_run_date), result, content_hash, last_bar))
+            return "buffered"
 
         raw_writer_obj = RawDataWriter(root_dir=get_raw_data_path(), 
                                             symbol=symbol_clean, 
                                             func=func, 
                                             data=result,                      # type: ignore
-                                            batch_date=job_run_date
+                                            batch_date=job_run_date,
+                                            append=func == "history"        # same-day reruns only, see RawDataWriter
                                             )
-        
-        loop = asyncio.get_running_loop()
 
         # Offload blocking writer to threadpool
         # change the `None` inside `run_in_executor` to `executor` instance made above for optimization.
-        await loop.run_in_executor(executor,
+        out_file = await loop.run_in_executor(executor,
                                 raw_writer_obj.write_data_to_raw_layer
                                 )
+        if out_file is not None and last_bar is not None:
+            get_watermark_store().update(stock_symbol, last_bar)
+        if out_file is not None and content_hash is not None:
+            location = out_file.relative_to(get_raw_data_path()).as_posix()
+            await loop.run_in_executor(executor, partial(get_content_index().record, stock_symbol, func,
+                                                         str(job_run_date), content_hash, location, changed=True))
+        return "done" if out_file is not None else "skipped"
     except Exception as e:
-        logger_file.error("Error in ingest_main: %s", e, exc_info=True)
\ No newline at end of file
+        logger_file.error("Error in ingest_main: %s", e, exc_info=True)
+        return "failed"
+
+
+async def api_ingestion_load(stock_symbol, job_run_date, func, period):
+    try:
+        result = await fetch_for_symbol(stock_symbol, job_run_date, func, period)
+    except FetchFailed:
+        return
+    if (isinstance(result, pd.DataFrame) and result.empty):
+        return
+    await write_result(stock_symbol, job_run_date, func, result)
@@ -0,0 +1,230 @@
+# src/stockify/ingest/manifest.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from stockify.config import add_settings_argument, get_state_path
+from stockify.utils.logger import logger as logger_file
+
+# Statuses after which an item is not fetched again for the same batch date
+TERMINAL_STATUSES = ("done", "empty", "skipped", "unchanged", "quarantined")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    symbol      TEXT NOT NULL,
+    func        TEXT NOT NULL,
+    batch_date  TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    row_count   INTEGER,
+    latency_ms  REAL,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (symbol, func, batch_date)
+);
+CREATE INDEX IF NOT EXISTS items_by_func_date ON items (func, batch_date);
+CREATE TABLE IF NOT EXISTS runs (
+    batch_date  TEXT PRIMARY KEY,
+    methods     TEXT NOT NULL,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT
+);
+"""
+
+
+class RunManifest:
+    """
+    SQLite manifest of every (symbol, func, batch_date) the daily job has touched,
+    with status, attempts, row count and fetch latency.
+    Consulted before work is scheduled so a rerun only does what is left.
+
+    Statuses:
+        done      written to the raw layer
+        buffered  handed to the parquet writer, becomes `done` once flushed
+        empty     fetched fine but nothing (new) to write
+        unchanged same content as the stored copy, see `ContentHashIndex`
+        skipped   writer found the output already on disk
+        quarantined failed validation, payload kept under <raw>/quarantine/
+        failed    fetch failed, retried on the next run
+    """
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # flushed before their `buffered` record arrived, see `mark_flushed`
+        self._flushed_early: set[tuple[str, str, str]] = set()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec="seconds")
+
+    # Runs
+    def start_run(self, batch_date: str, methods: list[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (batch_date, methods, started_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (batch_date) DO UPDATE SET methods = excluded.methods, finished_at = NULL",
+                (batch_date, ",".join(methods), self._now()),
+            )
+
+    def finish_run(self, batch_date: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE batch_date = ?", (self._now(), batch_date))
+
+    def last_unfinished_run(self) -> Optional[tuple[str, list[str]]]:
+        """(batch_date, methods) of the most recent run that never finished, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_date, methods FROM runs WHERE finished_at IS NULL "
+                "ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        return (row[0], row[1].split(",")) if row else None
+
+    def runs(self, limit: int = 10) -> list[dict]:
+        """Most recent runs first."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT ?", (limit,))
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # Items
+    def record(self, symbol: str, func: str, batch_date: str, status: str,
+               row_count: Optional[int] = None, latency_ms: Optional[float] = None) -> None:
+        with self._lock, self._conn:
+            if status == "buffered" and (symbol, func, batch_date) in self._flushed_early:
+                self._flushed_early.discard((symbol, func, batch_date))
+                status = "done"
+            self._conn.execute(
+                "INSERT INTO items (symbol, func, batch_date, status, attempts, row_count, latency_ms, updated_at) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (symbol, func, batch_date) DO UPDATE SET "
+                "status = excluded.status, attempts = items.attempts + 1, "
+                "row_count = excluded.row_count, latency_ms = excluded.latency_ms, updated_at = excluded.updated_at",
+                (symbol, func, batch_date, status, row_count, latency_ms, self._now()),
+            )
+
+    def mark_flushed(self, func: str, batch_date: str, symbols: Iterable[str]) -> None:
+        """
+        Promote `buffered` items to `done` once the parquet writer has them on disk.
+        A write can flush before the pipeline has recorded its item as `buffered`
+        (the flush runs inside the write); such an item is remembered and
+        recorded as `done` straight away when its `buffered` record arrives.
+        """
+        now = self._now()
+        with self._lock, self._conn:
+            for symbol in symbols:
+                cursor = self._conn.execute(
+                    "UPDATE items SET status = 'done', updated_at = ? "
+                    "WHERE symbol = ? AND func = ? AND batch_date = ? AND status = 'buffered'",
+                    (now, symbol, func, batch_date),
+                )
+                if cursor.rowcount == 0:
+                    self._flushed_early.add((symbol, func, batch_date))
+
+    def completed(self, func: str, batch_date: str) -> set[str]:
+        """Symbols that need no further work for `func` on `batch_date`."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT symbol FROM items WHERE func = ? AND batch_date = ? "
+                f"AND status IN ({','.join('?' * len(TERMINAL_STATUSES))})",
+                (func, batch_date, *TERMINAL_STATUSES),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def recent_statuses(self, func: str, since: str, until: str) -> dict[str, list[tuple[str, str]]]:
+        """{symbol: [(batch_date, status), ...]} for since <= batch_date < until, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, batch_date, status FROM items "
+                "WHERE func = ? AND batch_date >= ? AND batch_date < ? ORDER BY symbol, batch_date DESC",
+                (func, since, until),
+            ).fetchall()
+        statuses: dict[str, list[tuple[str, str]]] = {}
+        for symbol, batch_date, status in rows:
+            statuses.setdefault(symbol, []).append((batch_date, status))
+        return statuses
+
+    def summary(self, batch_date: str) -> dict:
+        """Item count per (func, status) for one batch date."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT func, status, COUNT(*) FROM items WHERE batch_date = ? GROUP BY func, status",
+                (batch_date,),
+            ).fetchall()
+        summary: dict[str, dict[str, int]] = {}
+        for func, status, count in rows:
+            summary.setdefault(func, {})[status] = count
+        return summary
+
+    def merge(self, other_db: Path) -> int:
+        """
+        Fold another host's / shard's manifest into this one; for each item the
+        most recently updated record wins. Returns the number of items merged.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("ATTACH DATABASE ? AS other", (str(other_db),))
+            try:
+                merged = self._conn.execute("SELECT COUNT(*) FROM other.items").fetchone()[0]
+                self._conn.execute(
+                    "INSERT INTO items SELECT * FROM other.items WHERE true "
+                    "ON CONFLICT (symbol, func, batch_date) DO UPDATE SET "
+                    "status = excluded.status, attempts = max(items.attempts, excluded.attempts), "
+                    "row_count = excluded.row_count, latency_ms = excluded.latency_ms, "
+                    "updated_at = excluded.updated_at WHERE excluded.updated_at > items.updated_at"
+                )
+                self._conn.execute(
+                    "INSERT INTO runs SELECT * FROM other.runs WHERE true "
+                    "ON CONFLICT (batch_date) DO UPDATE SET "
+                    "started_at = min(runs.started_at, excluded.started_at), "
+                    "finished_at = CASE WHEN runs.finished_at IS NULL OR excluded.finished_at IS NULL THEN NULL "
+                    "ELSE max(runs.finished_at, excluded.finished_at) END"
+                )
+            finally:
+                self._conn.commit()
+                self._conn.execute("DETACH DATABASE other")
+        return merged
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide manifest
+_manifest: Optional[RunManifest] = None
+
+
+def get_run_manifest() -> RunManifest:
+    global _manifest
+    if _manifest is None:
+        _manifest = RunManifest(get_state_path() / "manifest.sqlite")
+        logger_file.debug("Opened run manifest %s", _manifest.db_path)
+    return _manifest
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Inspect the run manifest")
+    parser.add_argument("--date", default=None, help="item counts of this batch date (default: the latest run)")
+    parser.add_argument("--runs", type=int, default=10, help="number of recent runs to list")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    manifest = get_run_manifest()
+    runs = manifest.runs(args.runs)
+    for run in runs:
+        print(f"{run['batch_date']}  started {run['started_at']}  finished {run['finished_at'] or '-':<19}  "
+              f"{run['methods']}")
+    batch_date = args.date or (runs[0]["batch_date"] if runs else None)
+    if batch_date is not None:
+        print(f"Items of {batch_date}: {manifest.summary(batch_date)}")
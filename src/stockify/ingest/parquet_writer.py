@@ -0,0 +1,195 @@
+# src/stockify/ingest/parquet_writer.py
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from stockify.ingest.writer import RawDataWriter
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.metrics import metrics
+from stockify.config import get_settings
+
+# CONFIGURATION
+_writer_config = get_settings().writer
+WRITER_FORMAT = _writer_config.format
+_MAX_BUFFER_ROWS = _writer_config.max_buffer_rows
+_MAX_BUFFER_BYTES = int(_writer_config.max_buffer_mb * 1024 * 1024)
+_COMPRESSION = _writer_config.compression
+
+
+class ParquetBatchWriter:
+    """
+    Buffered columnar writer backend for raw data.
+    Results are converted to Arrow tables and held in memory per (func, batch_date)
+    partition, then flushed in bulk to one compressed Parquet file per flush:
+        root_dir/yf/func=<func>/as_of_date=<batch_date>/part-<id>.parquet
+    Every row carries a `symbol` column. A partition is flushed as soon as it
+    crosses `max_rows` or `max_bytes`; `flush()` writes whatever is left.
+    `on_flush(func, batch_date, symbols)` is called once a partition's files are on disk.
+    Safe to share across executor threads.
+    """
+    def __init__(self, root_dir: Path, max_rows: int = _MAX_BUFFER_ROWS,
+                 max_bytes: int = _MAX_BUFFER_BYTES, compression: str = _COMPRESSION):
+        self.root_dir = root_dir
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self._buffers: dict[tuple[str, str], list[pa.Table]] = {}
+        self._buffered_rows: dict[tuple[str, str], int] = {}
+        self._buffered_bytes: dict[tuple[str, str], int] = {}
+        self._buffered_symbols: dict[tuple[str, str], list[str]] = {}
+        self._lock = threading.Lock()
+        self.on_flush: Optional[Callable[[str, str, list[str]], None]] = None
+        RawDataWriter._validate_root_dir(self.root_dir)
+
+    @staticmethod
+    def build_partition_dir(root_dir: Path, func: str, batch_date: str) -> Path:
+        """
+        Build hive-style partition path like:
+        root_dir/yf/func=<dataset>/as_of_date=YYYY-MM-DD
+        """
+        path = root_dir/"yf"/f"func={func}"/f"as_of_date={batch_date}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @staticmethod
+    def to_arrow(symbol: str, func: str, data: Any) -> Optional[pa.Table]:
+        """
+        Convert a fetched payload to an Arrow table with a leading `symbol` column.
+        DataFrames keep their columns (index labelled like the CSV writer does);
+        dicts and lists are stored as JSON strings in a `payload` column, one row
+        per dict / list element, since their keys differ from symbol to symbol.
+        """
+        if isinstance(data, pd.DataFrame):
+            if data.empty:
+                return None
+            frame = RawDataWriter.apply_feature_labels(data.copy(), func)
+            try:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # mixed-type object columns (e.g. strings and floats) -> store as text
+                for col in frame.columns[frame.dtypes == object]:
+                    frame[col] = frame[col].astype(str)
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+
+        elif isinstance(data, list):
+            if not data:
+                return None
+            table = pa.table({"payload": pa.array([json.dumps(item, default=str) for item in data], pa.string())})
+
+        elif isinstance(data, dict):
+            if not data:
+                return None
+            json_serializable_data = {str(k): v for k, v in data.items()}
+            table = pa.table({"payload": pa.array([json.dumps(json_serializable_data, default=str)], pa.string())})
+
+        else:
+            logger_file.error("Unsupported data type for parquet writing: %s", type(data))
+            return None
+
+        # pandas metadata differs per frame and would only get in the way of concatenation
+        table = table.replace_schema_metadata(None)
+        symbol_col = pa.repeat(pa.scalar(symbol, pa.string()), table.num_rows)
+        return table.add_column(0, "symbol", symbol_col)
+
+    def write(self, symbol: str, func: str, batch_date: str, data: Any,
+              source_symbol: Optional[str] = None) -> list[Path]:
+        """
+        Buffer one symbol's result. Returns the files written if this call
+        pushed the partition over its size / row bound, otherwise an empty list.
+        `source_symbol` is what `on_flush` reports back (defaults to `symbol`).
+        """
+        started = time.perf_counter()
+        table = self.to_arrow(symbol, func, data)
+        metrics.observe("serialization", time.perf_counter() - started, func)
+        if table is None:
+            logger_file.warning("Empty or unsupported result for %s (%s), skipping write", symbol, func)
+            return []
+
+        key = (func, str(batch_date))
+        with self._lock:
+            self._buffers.setdefault(key, []).append(table)
+            self._buffered_rows[key] = self._buffered_rows.get(key, 0) + table.num_rows
+            self._buffered_bytes[key] = self._buffered_bytes.get(key, 0) + table.nbytes
+            self._buffered_symbols.setdefault(key, []).append(source_symbol or symbol)
+            logger_file.debug("Buffered `%s` for %s (%d rows)", func, symbol, table.num_rows)
+
+            if self._buffered_rows[key] < self.max_rows and self._buffered_bytes[key] < self.max_bytes:
+                return []
+            tables, symbols = self._pop(key)
+
+        return self._write_partition(key, tables, symbols)
+
+    def flush(self) -> list[Path]:
+        """Write every buffered partition to disk."""
+        with self._lock:
+            pending = {key: self._pop(key) for key in list(self._buffers)}
+
+        written = []
+        for key, (tables, symbols) in pending.items():
+            written.extend(self._write_partition(key, tables, symbols))
+        return written
+
+    def _pop(self, key: tuple[str, str]) -> tuple[list[pa.Table], list[str]]:
+        self._buffered_rows.pop(key, None)
+        self._buffered_bytes.pop(key, None)
+        return self._buffers.pop(key, []), self._buffered_symbols.pop(key, [])
+
+    @staticmethod
+    def _combine(tables: list[pa.Table]) -> list[pa.Table]:
+        """
+        Concatenate buffered tables, widening types where possible.
+        Tables whose schemas cannot be unified are kept apart (one file per schema).
+        """
+        try:
+            return [pa.concat_tables(tables, promote_options="permissive")]
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            groups: dict[str, list[pa.Table]] = {}
+            for table in tables:
+                groups.setdefault(str(table.schema), []).append(table)
+            return [pa.concat_tables(group) for group in groups.values()]
+
+    def _write_partition(self, key: tuple[str, str], tables: list[pa.Table], symbols: list[str]) -> list[Path]:
+        if not tables:
+            return []
+
+        func, batch_date = key
+        out_dir = self.build_partition_dir(self.root_dir, func, batch_date)
+        written = []
+        for table in self._combine(tables):
+            out_file = out_dir/f"part-{uuid.uuid4().hex}.parquet"
+            started = time.perf_counter()
+            pq.write_table(table, out_file, compression=self.compression)
+            metrics.observe("disk_write", time.perf_counter() - started, func)
+            written.append(out_file)
+            logger_file.info("Flushed `%s` (%d rows) -> %s", func, table.num_rows, out_file)
+
+        if self.on_flush is not None:
+            self.on_flush(func, batch_date, symbols)
+        return written
+
+
+# Process-wide writer shared by all ingestion tasks
+_parquet_writer: Optional[ParquetBatchWriter] = None
+_parquet_writer_lock = threading.Lock()
+
+
+def get_parquet_writer(root_dir: Path) -> ParquetBatchWriter:
+    global _parquet_writer
+    with _parquet_writer_lock:
+        if _parquet_writer is None or _parquet_writer.root_dir != root_dir:
+            if _parquet_writer is not None:
+                _parquet_writer.flush()
+            _parquet_writer = ParquetBatchWriter(root_dir=root_dir)
+        return _parquet_writer
+
+
+def flush_parquet_writer() -> list[Path]:
+    """Flush the shared writer, if one was created during this run."""
+    if _parquet_writer is None:
+        return []
+    return _parquet_writer.flush()
@@ -0,0 +1,102 @@
+# src/stockify/ingest/quarantine.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+from stockify.config import add_settings_argument, get_raw_data_path
+from stockify.utils.logger import logger as logger_file
+
+""" Payloads that failed validation, kept next to the raw layer with the reason they were held back """
+
+
+class Quarantine:
+    """
+    One JSON document per rejected payload:
+
+        root_dir/quarantine/func=<func>/as_of_date=<date>/<symbol>.json
+        {"symbol", "func", "batch_date", "quarantined_at", "errors": [{rule, detail}], "payload"}
+
+    Lives outside `yf/`, so the catalog, compaction and the feature store never
+    pick it up. A later rejection of the same item on the same date replaces
+    the earlier one.
+    """
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir/"quarantine"
+
+    def path(self, symbol: str, func: str, batch_date: str) -> Path:
+        return self.root_dir/f"func={func}"/f"as_of_date={batch_date}"/f"{symbol}.json"
+
+    @staticmethod
+    def _encode(payload: Any) -> Any:
+        if hasattr(payload, "to_json"):             # DataFrame; duck-typed so listing does not import pandas
+            # `split` keeps the index, duplicates and dtypes as they came from the source
+            return json.loads(payload.to_json(orient="split", date_format="iso", default_handler=str))
+        if isinstance(payload, dict):
+            return {str(key): value for key, value in payload.items()}
+        return payload
+
+    def put(self, symbol: str, func: str, batch_date: str, errors: list, payload: Any) -> Path:
+        out_file = self.path(symbol, func, batch_date)
+        out_file.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "symbol": symbol,
+            "func": func,
+            "batch_date": batch_date,
+            "quarantined_at": datetime.now().isoformat(timespec="seconds"),
+            "errors": [{"rule": rule, "detail": detail} for rule, detail in errors],
+            "payload": self._encode(payload),
+        }
+        tmp_file = out_file.with_suffix(".json.tmp")
+        tmp_file.write_text(json.dumps(document, separators=(",", ":"), default=str), encoding="utf-8")
+        os.replace(tmp_file, out_file)
+        return out_file
+
+    def entries(self, func: Optional[str] = None, batch_date: Optional[str] = None) -> list[Path]:
+        pattern = f"func={func or '*'}/as_of_date={batch_date or '*'}/*.json"
+        return sorted(self.root_dir.glob(pattern))
+
+    def summary(self, batch_date: Optional[str] = None) -> dict:
+        """{func: count}"""
+        summary: dict[str, int] = {}
+        for entry in self.entries(batch_date=batch_date):
+            func = entry.parent.parent.name.partition("=")[2]
+            summary[func] = summary.get(func, 0) + 1
+        return summary
+
+
+# Process-wide quarantine
+_quarantine: Optional[Quarantine] = None
+
+
+def get_quarantine() -> Quarantine:
+    global _quarantine
+    if _quarantine is None:
+        _quarantine = Quarantine(get_raw_data_path())
+        logger_file.debug("Quarantine area %s", _quarantine.root_dir)
+    return _quarantine
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="List payloads held back by validation")
+    parser.add_argument("--func", default=None)
+    parser.add_argument("--date", default=None, help="only this batch date (YYYY-MM-DD)")
+    parser.add_argument("--limit", type=int, default=50)
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    quarantine = get_quarantine()
+    print(f"Quarantine: {quarantine.summary(args.date)}")
+    for entry in quarantine.entries(args.func, args.date)[:args.limit]:
+        document = json.loads(entry.read_text(encoding="utf-8"))
+        reasons = "; ".join(f"{e['rule']}: {e['detail']}" for e in document["errors"])
+        print(f"{document['batch_date']}  {document['func']:<16} {document['symbol']:<20} {reasons}")
@@ -0,0 +1,123 @@
+# src/stockify/ingest/rate_control.py
+import asyncio
+import time
+from stockify.utils.logger import logger as logger_file
+from stockify.config import get_settings
+
+# CONFIGURATION
+_rate_config = get_settings().rate_limit
+
+
+class AdaptiveRateController:
+    """
+    Process-wide token bucket with AIMD (additive increase, multiplicative decrease)
+    rate adjustment. Every API request calls `acquire()` before going out.
+
+    - each successful call nudges the rate up by `additive_increase / rate`,
+      i.e. roughly +`additive_increase` req/s for every second of clean traffic
+    - a rate-limit response cuts the rate by `decrease_factor` and pauses *all*
+      callers for `cooldown_seconds`. Further 429s that arrive while the pause is
+      active belong to the same burst and are not counted again.
+
+    `rate`, `throttle_events` and `snapshot()` expose the controller state so
+    `max_concurrency` can be tuned from observed numbers.
+    """
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 additive_increase: float = 0.1, decrease_factor: float = 0.5,
+                 cooldown_seconds: float = 120, burst: int = 5):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.burst = burst
+
+        self.requests = 0
+        self.throttle_events = 0
+        self.peak_rate = initial_rate
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    @property
+    def paused(self) -> bool:
+        return time.monotonic() < self._paused_until
+
+    async def acquire(self, cost: float = 1) -> None:
+        """
+        Wait until the shared budget allows one more request. A call worth
+        several requests (`cost` > 1) goes out as soon as one token is there and
+        leaves the bucket in debt, which later callers wait out.
+        """
+        # No lock needed: check-and-take happens without an await in between,
+        # and everything runs on the event loop thread.
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= cost
+                self.requests += 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def record_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.additive_increase / self.rate)
+        self.peak_rate = max(self.peak_rate, self.rate)
+
+    def record_throttle(self) -> bool:
+        """
+        Register a rate-limit response. Returns True if this started a new
+        back-off, False if the pipeline was already paused for the same burst.
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return False
+
+        self.throttle_events += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._tokens = 0.0
+        self._last_refill = now + self.cooldown_seconds
+        self._paused_until = now + self.cooldown_seconds
+        logger_file.error("Rate limit hit (event #%d). Pausing all requests for %ds, rate -> %.2f req/s",
+                          self.throttle_events, self.cooldown_seconds, self.rate)
+        return True
+
+    def scale(self, factor: float) -> None:
+        """Shrink the budget to a share of it, e.g. 1/N for one of N shards behind the same IP."""
+        self.rate *= factor
+        self.min_rate *= factor
+        self.max_rate *= factor
+        self.additive_increase *= factor
+        self.peak_rate = self.rate
+        self.burst = max(1, round(self.burst * factor))
+        self._tokens = min(self._tokens, float(self.burst))
+
+    def snapshot(self) -> dict:
+        return {
+            "rate": round(self.rate, 3),
+            "peak_rate": round(self.peak_rate, 3),
+            "requests": self.requests,
+            "throttle_events": self.throttle_events,
+            "paused": self.paused,
+        }
+
+
+# Process-wide controller shared by every fetch
+rate_controller = AdaptiveRateController(
+    initial_rate=_rate_config.initial_rate,
+    min_rate=_rate_config.min_rate,
+    max_rate=_rate_config.max_rate,
+    additive_increase=_rate_config.additive_increase,
+    decrease_factor=_rate_config.decrease_factor,
+    cooldown_seconds=_rate_config.cooldown_seconds,
+    burst=_rate_config.burst,
+)
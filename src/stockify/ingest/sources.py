@@ -0,0 +1,348 @@
+# src/stockify/ingest/sources.py
+import math
+import random
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+from stockify.ingest.scrapper import api_trigger, silence_output
+from stockify.utils.logger import logger as logger_file
+from stockify.config import get_settings
+
+# numpy / pandas only come in with the synthetic source's payloads, the interface does not need them
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# CONFIGURATION
+_settings = get_settings()
+_SOURCE = _settings.ingestion.source
+_synthetic_config = _settings.synthetic_source
+_HTTP_TIMEOUT = _settings.ingestion.http_timeout_seconds
+
+
+class SourceProvider(ABC):
+    """
+    Interface every market data source implements. `FetchMetaData` dispatches
+    through it, so the rest of the pipeline never talks to a vendor library.
+
+    `fetch` is a blocking call that runs inside the fetch executor; it takes the
+    (variant) symbol, the dataset name (`history`, `get_news`, `calendar`, ...)
+    and the dataset specific keyword arguments, and returns a DataFrame, dict or list.
+
+    `download_many` returns `history` for many symbols as one wide frame with
+    (ticker, field) columns; tickers without data are simply absent. Only
+    sources that set `supports_bulk_history` implement it; callers check the
+    flag first. `fetch` is abstract, so an incomplete provider fails when it is
+    created rather than in the middle of a run.
+    """
+    name = "base"
+    supports_bulk_history = False
+
+    @abstractmethod
+    def fetch(self, symbol: str, func: str, **kwargs) -> Any:
+        ...
+
+    def download_many(self, symbols: list[str], **kwargs) -> "pd.DataFrame":
+        raise NotImplementedError(f"Source `{self.name}` has no multi-ticker history download "
+                                  f"(supports_bulk_history is False)")
+
+    def bulk_request_cost(self, symbols: list[str]) -> int:
+        """Rate limit tokens one `download_many` call is charged."""
+        return 1
+
+    def is_rate_limit_error(self, exc: Exception) -> bool:
+        return "Too Many Requests" in str(exc)
+
+
+def _deadline_session(http_timeout: float):
+    """
+    curl_cffi session whose requests never wait longer than `http_timeout`,
+    whatever timeout yfinance passes (30 s for most endpoints). The blocking
+    call then returns on its own and gives its executor thread back.
+    """
+    from curl_cffi import requests as curl_requests
+
+    class DeadlineSession(curl_requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            timeout = kwargs.get("timeout")
+            if isinstance(timeout, (int, float)):
+                kwargs["timeout"] = min(timeout, http_timeout)
+            return super().request(method, url, *args, **kwargs)
+
+    return DeadlineSession(impersonate="chrome", timeout=http_timeout)
+
+
+class YFinanceProvider(SourceProvider):
+    """
+    Yahoo Finance through `yf.Ticker`, one ticker object per call; `yf.download` for bulk history.
+
+    Every ticker object and download shares one HTTP session instead of
+    opening its own: curl_cffi keeps a curl handle, and with it the open
+    connections, per executor thread, so each thread reuses its pool.
+    """
+    name = "yfinance"
+    supports_bulk_history = True
+
+    def __init__(self, download_threads: int = 4, http_timeout: float = _HTTP_TIMEOUT):
+        self.download_threads = download_threads
+        self.http_timeout = http_timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                try:
+                    self._session = _deadline_session(self.http_timeout)
+                except ImportError:                 # no curl_cffi: let yfinance pick its fallback session
+                    logger_file.warning("curl_cffi not installed, yfinance requests use its default session")
+                    self._session = False
+            return self._session or None
+
+    def fetch(self, symbol: str, func: str, **kwargs) -> Any:
+        import yfinance as yf
+        return api_trigger(yf.Ticker(symbol, session=self.session), func, **kwargs)
+
+    def download_many(self, symbols: list[str], **kwargs) -> "pd.DataFrame":
+        import yfinance as yf
+        # same columns and tz-aware index as `Ticker.history`
+        return silence_output(yf.download)(symbols, group_by="ticker", auto_adjust=True, actions=True,
+                                           ignore_tz=False, multi_level_index=True, progress=False,
+                                           threads=self.download_threads, timeout=self.http_timeout,
+                                           session=self.session, **kwargs)
+
+    def bulk_request_cost(self, symbols: list[str]) -> int:
+        # yf.download still sends one chart request per ticker behind the scenes
+        return len(symbols)
+
+    def is_rate_limit_error(self, exc: Exception) -> bool:
+        from yfinance.exceptions import YFRateLimitError
+        return isinstance(exc, YFRateLimitError) or super().is_rate_limit_error(exc)
+
+
+class SyntheticRateLimitError(Exception):
+    pass
+
+
+class SyntheticProvider(SourceProvider):
+    """
+    Offline, deterministic stand-in for a real vendor, meant for load tests.
+
+    Payloads are derived from (seed, symbol, dataset), so the same symbol always
+    gets the same price path, actions and calendar, and `history` windows from
+    different runs line up. Behaviour knobs:
+
+    - latency: log-normal around `latency_ms_median` with shape `latency_sigma`
+    - error_rate: share of calls failing with a transient error
+    - delisted_rate: share of base symbols that are dead on every exchange
+    - bse_only_rate: share of base symbols that only resolve as `.BO`
+    - rate_limit_every / rate_limit_burst: every N calls, the next `burst` calls get a 429
+    """
+    name = "synthetic"
+    supports_bulk_history = True
+    _EPOCH = date(2000, 1, 3)
+
+    def __init__(self, seed: int = 7, latency_ms_median: float = 120, latency_sigma: float = 0.5,
+                 error_rate: float = 0.01, delisted_rate: float = 0.02, bse_only_rate: float = 0.03,
+                 rate_limit_every: int = 0, rate_limit_burst: int = 0):
+        self.seed = seed
+        self.latency_ms_median = latency_ms_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.delisted_rate = delisted_rate
+        self.bse_only_rate = bse_only_rate
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_burst = rate_limit_burst
+
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _stable_fraction(self, *parts: str) -> float:
+        """Deterministic number in [0, 1) for the given key."""
+        return zlib.crc32(":".join((str(self.seed), *parts)).encode()) / 2**32
+
+    def _rng(self, *parts: str) -> "np.random.Generator":
+        import numpy as np
+        return np.random.default_rng(zlib.crc32(":".join((str(self.seed), *parts)).encode()))
+
+    def _request(self, symbol: str, latency_scale: float = 1.0) -> None:
+        """Latency, rate limits and transient errors of one simulated HTTP request."""
+        with self._lock:
+            self.calls += 1
+            call_no = self.calls
+        # per-call randomness is seeded by call number, so runs replay identically
+        call_rng = random.Random(self.seed * 1_000_003 + call_no)
+
+        time.sleep(latency_scale * call_rng.lognormvariate(math.log(self.latency_ms_median / 1000), self.latency_sigma))
+
+        if self.rate_limit_every and call_no % self.rate_limit_every < self.rate_limit_burst:
+            raise SyntheticRateLimitError("Too Many Requests. Rate limited. Try after a while.")
+        if call_rng.random() < self.error_rate:
+            raise ConnectionError(f"Synthetic transient error for {symbol}")
+
+    def _is_dead(self, symbol: str) -> bool:
+        base, _, exchange = symbol.partition(".")
+        return self._stable_fraction(base, "delisted") < self.delisted_rate or \
+            (exchange == "NS" and self._stable_fraction(base, "bse_only") < self.bse_only_rate)
+
+    def fetch(self, symbol: str, func: str, **kwargs) -> Any:
+        self._request(symbol)
+        if self._is_dead(symbol):
+            raise ValueError(f"{symbol}: No data found, symbol may be delisted")
+
+        builder = getattr(self, f"_build_{func}", None)
+        if builder is None:
+            raise AttributeError(f"Synthetic source has no dataset `{func}`")
+        return builder(symbol.partition(".")[0], **kwargs)
+
+    def download_many(self, symbols: list[str], **kwargs) -> "pd.DataFrame":
+        # one request for the whole batch, a bigger payload takes a bit longer
+        import pandas as pd
+        self._request(",".join(symbols), latency_scale=1 + len(symbols) / 50)
+        frames = {symbol: self._build_history(symbol.partition(".")[0], **kwargs)
+                  for symbol in symbols if not self._is_dead(symbol)}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1, names=["Ticker", "Price"])
+
+    # Dataset builders
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _trading_days(end: date) -> "pd.DatetimeIndex":
+        # shared by every symbol; building it is the slowest part of a synthetic call
+        import pandas as pd
+        return pd.bdate_range(SyntheticProvider._EPOCH, end, tz="Asia/Kolkata", name="Date")
+
+    def _prices(self, base: str, end: date) -> "pd.DataFrame":
+        """Full daily OHLCV path from a fixed epoch, so any window of it is stable."""
+        import numpy as np
+        import pandas as pd
+        rng = self._rng(base, "prices")
+        index = self._trading_days(end)
+        n = len(index)
+        close = (20 + 2000 * rng.random()) * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n)))
+        spread = np.abs(rng.normal(0, 0.01, n))
+        open_ = close * (1 + rng.normal(0, 0.004, n))
+        return pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(close * (1 + spread), open_),
+            "Low": np.minimum(close * (1 - spread), open_),
+            "Close": close,
+            "Volume": rng.integers(5_000, 5_000_000, n),
+            "Dividends": np.where(rng.random(n) < 0.004, np.round(close * 0.01, 2), 0.0),
+            "Stock Splits": np.where(rng.random(n) < 0.0002, 2.0, 0.0),
+        }, index=index)
+
+    @staticmethod
+    def _period_start(end: date, period: Optional[str]) -> date:
+        period = (period or "1mo").lower()
+        if period == "max":
+            return SyntheticProvider._EPOCH
+        for unit, days in (("mo", 30), ("wk", 7), ("y", 365), ("d", 1)):
+            if period.endswith(unit) and period[:-len(unit)].isdigit():
+                return end - timedelta(days=int(period[:-len(unit)]) * days)
+        return end - timedelta(days=30)
+
+    def _build_history(self, base: str, period: Optional[str] = None, start: Optional[str] = None,
+                       **kwargs) -> "pd.DataFrame":
+        import pandas as pd
+        end = date.today()
+        first = date.fromisoformat(start) if start else self._period_start(end, period)
+        prices = self._prices(base, end)
+        return prices.iloc[prices.index.searchsorted(pd.Timestamp(first, tz="Asia/Kolkata")):]
+
+    def _build_get_actions(self, base: str, **kwargs) -> "pd.DataFrame":
+        prices = self._prices(base, date.today())
+        actions = prices[["Dividends", "Stock Splits"]]
+        return actions[(actions["Dividends"] > 0) | (actions["Stock Splits"] > 0)]
+
+    def _build_get_news(self, base: str, **kwargs) -> list:
+        today = date.today()
+        items = []
+        # news rolls over gradually: each item is keyed by the day it was published
+        for age in range(10):
+            published = today - timedelta(days=age)
+            rng = self._rng(base, "news", published.isoformat())
+            if rng.random() < 0.5:
+                continue
+            items.append({
+                "id": f"{zlib.crc32(f'{base}{published}'.encode()):08x}-{self.seed:04x}",
+                "content": {
+                    "title": f"{base} shares move {rng.normal(0, 2):+.2f}% on session volume",
+                    "summary": f"Synthetic market update for {base}.",
+                    "pubDate": f"{published.isoformat()}T09:{int(rng.integers(0, 60)):02d}:00Z",
+                    "provider": {"displayName": "Synthetic Wire"},
+                },
+            })
+        return items
+
+    def _earnings_schedule(self, base: str) -> "pd.DatetimeIndex":
+        # quarterly cadence with a per-symbol offset, two upcoming dates included
+        import pandas as pd
+        offset = int(self._stable_fraction(base, "earnings") * 90)
+        first = pd.Timestamp(date.today() - timedelta(days=3 * 365 - offset))
+        return pd.date_range(first, periods=14, freq="91D", tz="Asia/Kolkata", name="Earnings Date")
+
+    def _build_earnings_dates(self, base: str, **kwargs) -> "pd.DataFrame":
+        import numpy as np
+        import pandas as pd
+        index = self._earnings_schedule(base)
+        rng = self._rng(base, "eps")
+        estimate = np.round(rng.normal(10, 3, len(index)), 2)
+        reported = np.round(estimate * (1 + rng.normal(0, 0.1, len(index))), 2)
+        reported[index > pd.Timestamp.now(tz="Asia/Kolkata")] = np.nan
+        return pd.DataFrame({
+            "EPS Estimate": estimate,
+            "Reported EPS": reported,
+            "Surprise(%)": np.round((reported / estimate - 1) * 100, 2),
+        }, index=index)
+
+    def _build_calendar(self, base: str, **kwargs) -> dict:
+        upcoming = [d.date() for d in self._earnings_schedule(base) if d.date() >= date.today()]
+        import numpy as np
+        rng = self._rng(base, "calendar")
+        average = float(np.round(rng.normal(10, 3), 2))
+        return {
+            "Ex-Dividend Date": upcoming[0] - timedelta(days=20) if upcoming else None,
+            "Earnings Date": upcoming[:1],
+            "Earnings High": round(average * 1.1, 2),
+            "Earnings Low": round(average * 0.9, 2),
+            "Earnings Average": average,
+        }
+
+    def _build_info(self, base: str, **kwargs) -> dict:
+        rng = self._rng(base, "info")
+        return {
+            "symbol": f"{base}.NS",
+            "shortName": f"{base} Ltd",
+            "sector": ["Financial Services", "Technology", "Energy", "Consumer Cyclical"][int(rng.integers(0, 4))],
+            "marketCap": int(rng.integers(10**9, 10**13)),
+            "currency": "INR",
+        }
+
+
+_PROVIDERS = {
+    YFinanceProvider.name: YFinanceProvider,
+    SyntheticProvider.name: SyntheticProvider,
+}
+
+# Process-wide provider for the configured `ingestion.source`
+_provider: Optional[SourceProvider] = None
+
+
+def get_source_provider() -> SourceProvider:
+    global _provider
+    if _provider is None:
+        if _SOURCE not in _PROVIDERS:
+            raise ValueError(f"Unknown ingestion source `{_SOURCE}`, expected one of {sorted(_PROVIDERS)}")
+        if _SOURCE == "synthetic":
+            _provider = _PROVIDERS[_SOURCE](**_synthetic_config._asdict())
+        else:
+            _provider = _PROVIDERS[_SOURCE](download_threads=_settings.ingestion.history_bulk.download_threads)
+        logger_file.info("Using `%s` data source", _provider.name)
+    return _provider
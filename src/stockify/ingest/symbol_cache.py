@@ -0,0 +1,152 @@
+# src/stockify/ingest/symbol_cache.py
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from stockify.config import get_settings, get_state_path
+from stockify.utils.filelock import file_lock
+from stockify.utils.logger import logger as logger_file
+
+# CONFIGURATION
+_cache_config = get_settings().symbol_cache
+_DAY = 24 * 60 * 60
+
+
+class SymbolResolutionCache:
+    """
+    Persistent cache of symbol variant resolution, kept as JSON in the state directory.
+
+    - resolved: base symbol -> the exchange variant (`.NS` / `.BO`) that last returned data,
+      tried first on the next fetch
+    - dead: variants that came back delisted / "no data found", skipped until they expire
+
+    Hit / miss counters are kept per process and reported by `stats()`.
+    `save()` merges with the file under a lock (newest entry wins), so shards
+    can share one cache file.
+    """
+    def __init__(self, path: Path, positive_ttl_days: float = 30, negative_ttl_days: float = 7):
+        self.path = path
+        self.positive_ttl = positive_ttl_days * _DAY
+        self.negative_ttl = negative_ttl_days * _DAY
+        self._lock = threading.Lock()
+
+        data = self._load(path)
+        self._resolved: dict[str, dict] = data.get("resolved", {})
+        self._dead: dict[str, float] = data.get("dead", {})
+
+        self.lookups = 0
+        self.hits = 0                       # known-good variant available
+        self.misses = 0                     # no (fresh) entry, default order used
+        self.negative_hits = 0              # variants skipped because they are known dead
+
+    @staticmethod
+    def _load(path: Path) -> dict:
+        if not path.exists() or path.stat().st_size == 0:
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger_file.error("Unreadable symbol cache %s, starting from scratch", path, exc_info=True)
+            return {}
+
+    def order_variants(self, base: str, variants: list[str]) -> list[str]:
+        """
+        Reorder `variants` so the known-good one comes first and drop the ones
+        known to be dead. An empty list means every variant is negatively cached.
+        """
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+
+            alive = []
+            for variant in variants:
+                dead_at = self._dead.get(variant)
+                if dead_at is not None and now - dead_at < self.negative_ttl:
+                    self.negative_hits += 1
+                    continue
+                alive.append(variant)
+
+            entry = self._resolved.get(base)
+            if entry and now - entry["at"] < self.positive_ttl and entry["variant"] in alive:
+                self.hits += 1
+                alive.remove(entry["variant"])
+                alive.insert(0, entry["variant"])
+            else:
+                self.misses += 1
+        return alive
+
+    def record_success(self, base: str, variant: str) -> None:
+        with self._lock:
+            self._resolved[base] = {"variant": variant, "at": time.time()}
+            self._dead.pop(variant, None)
+
+    def record_dead(self, variant: str) -> None:
+        with self._lock:
+            self._dead[variant] = time.time()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else None,
+                "resolved_entries": len(self._resolved),
+                "dead_entries": len(self._dead),
+            }
+
+    def _merge(self, on_disk: dict) -> None:
+        """Fold in entries another process saved; the newest observation of each key wins."""
+        for base, entry in on_disk.get("resolved", {}).items():
+            if entry["at"] > self._resolved.get(base, {}).get("at", 0):
+                self._resolved[base] = entry
+        for variant, dead_at in on_disk.get("dead", {}).items():
+            if dead_at > self._dead.get(variant, 0):
+                self._dead[variant] = dead_at
+        # a variant that resolved after it was marked dead is alive again
+        for entry in self._resolved.values():
+            if self._dead.get(entry["variant"], 0) < entry["at"]:
+                self._dead.pop(entry["variant"], None)
+
+    def save(self) -> None:
+        now = time.time()
+        with file_lock(self.path):
+            on_disk = self._load(self.path)
+            with self._lock:
+                self._merge(on_disk)
+                # expired entries are dropped on save so the file does not grow forever
+                snapshot = {
+                    "resolved": {k: v for k, v in self._resolved.items() if now - v["at"] < self.positive_ttl},
+                    "dead": {k: v for k, v in self._dead.items() if now - v < self.negative_ttl},
+                }
+
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp_path, self.path)
+        logger_file.debug("Saved symbol cache -> %s", self.path)
+
+
+# Process-wide cache shared by every fetch
+_symbol_cache: Optional[SymbolResolutionCache] = None
+
+
+def get_symbol_cache() -> SymbolResolutionCache:
+    global _symbol_cache
+    if _symbol_cache is None:
+        _symbol_cache = SymbolResolutionCache(get_state_path() / "symbol_cache.json",
+                                              positive_ttl_days=_cache_config.positive_ttl_days,
+                                              negative_ttl_days=_cache_config.negative_ttl_days)
+    return _symbol_cache
+
+
+def save_symbol_cache() -> Optional[dict]:
+    """Persist the shared cache, if one was created during this run, and return its stats."""
+    if _symbol_cache is None:
+        return None
+    _symbol_cache.save()
+    return _symbol_cache.stats()
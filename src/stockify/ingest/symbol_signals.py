@@ -0,0 +1,129 @@
+# src/stockify/ingest/symbol_signals.py
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Optional
+import pandas as pd
+from stockify.config import get_state_path
+from stockify.utils.logger import logger as logger_file
+
+""" Per-symbol signals picked up from fetched payloads, read by the scheduler """
+
+_TURNOVER_BARS = 20                 # median daily traded value over the last N bars
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    symbol         TEXT PRIMARY KEY,
+    turnover       REAL,
+    turnover_date  TEXT,
+    next_earnings  TEXT,
+    updated_at     TEXT NOT NULL
+);
+"""
+
+
+def _turnover(frame: pd.DataFrame) -> Optional[tuple[float, int]]:
+    """(median Close x Volume, bars it covers) of the last bars of a `history` frame."""
+    tail = frame[["Close", "Volume"]].dropna().tail(_TURNOVER_BARS)
+    if tail.empty:
+        return None
+    return float((tail["Close"] * tail["Volume"]).median()), len(tail)
+
+
+def _next_earnings(func: str, payload: Any, batch_date: date) -> Optional[date]:
+    """First earnings date on or after `batch_date`, else the latest one before it."""
+    if func == "calendar":
+        values = payload.get("Earnings Date")
+        values = [] if values is None else list(values) if isinstance(values, (list, tuple)) else [values]
+        dates = pd.to_datetime(pd.Series(values, dtype="object"), errors="coerce").dropna()
+    else:
+        dates = pd.Series(pd.to_datetime(payload.index, errors="coerce", utc=True)).dropna().dt.tz_localize(None)
+    days = sorted({stamp.date() for stamp in dates})
+    if not days:
+        return None
+    upcoming = [day for day in days if day >= batch_date]
+    return upcoming[0] if upcoming else days[-1]
+
+
+class SymbolSignals:
+    """
+    SQLite table of what the scheduler needs to know about a symbol:
+
+    - turnover: median daily traded value, a liquidity proxy. `history` is
+      fetched incrementally, so a payload of a few new bars is blended into
+      the stored value in proportion to the bars it covers.
+    - next_earnings: from `calendar` / `earnings_dates`, the next announced
+      earnings date (or the last one once it has passed).
+    """
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def observe(self, symbol: str, func: str, payload: Any, batch_date: date) -> None:
+        """Pick the signals out of a validated payload; other methods are ignored."""
+        if func == "history" and isinstance(payload, pd.DataFrame):
+            observed = _turnover(payload)
+            if observed is not None:
+                self._update_turnover(symbol, *observed, batch_date)
+        elif (func == "calendar" and isinstance(payload, dict)) or \
+                (func == "earnings_dates" and isinstance(payload, pd.DataFrame)):
+            next_earnings = _next_earnings(func, payload, batch_date)
+            if next_earnings is not None:
+                self._upsert(symbol, "next_earnings", next_earnings.isoformat())
+
+    def _update_turnover(self, symbol: str, turnover: float, bars: int, batch_date: date) -> None:
+        weight = min(bars, _TURNOVER_BARS) / _TURNOVER_BARS
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO signals (symbol, turnover, turnover_date, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (symbol) DO UPDATE SET "
+                "turnover = CASE WHEN signals.turnover IS NULL THEN excluded.turnover "
+                "ELSE ? * excluded.turnover + (1 - ?) * signals.turnover END, "
+                "turnover_date = excluded.turnover_date, updated_at = excluded.updated_at",
+                (symbol, turnover, batch_date.isoformat(), self._now(), weight, weight),
+            )
+
+    def _upsert(self, symbol: str, column: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO signals (symbol, {column}, updated_at) VALUES (?, ?, ?) "
+                f"ON CONFLICT (symbol) DO UPDATE SET {column} = excluded.{column}, updated_at = excluded.updated_at",
+                (symbol, value, self._now()),
+            )
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec="seconds")
+
+    def turnover(self) -> dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute("SELECT symbol, turnover FROM signals WHERE turnover IS NOT NULL").fetchall()
+        return dict(rows)
+
+    def next_earnings(self) -> dict[str, date]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, next_earnings FROM signals WHERE next_earnings IS NOT NULL"
+            ).fetchall()
+        return {symbol: date.fromisoformat(day) for symbol, day in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide signals
+_signals: Optional[SymbolSignals] = None
+
+
+def get_symbol_signals() -> SymbolSignals:
+    global _signals
+    if _signals is None:
+        _signals = SymbolSignals(get_state_path() / "symbol_signals.sqlite")
+        logger_file.debug("Opened symbol signals %s", _signals.db_path)
+    return _signals
@@ -0,0 +1,214 @@
+# src/stockify/ingest/validation.py
+from datetime import date
+from typing import Any, Callable, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+from stockify.config import get_settings
+
+""" Schema and data-quality rules per method, checked on every fetched payload before it is written """
+
+# CONFIGURATION
+_validation_config = get_settings().validation
+VALIDATION_ENABLED = _validation_config.enabled
+_MAX_NAN_RATIO = _validation_config.max_nan_ratio
+_PRICE_TOLERANCE = _validation_config.price_tolerance
+_STALE_AFTER_DAYS = _validation_config.stale_after_days
+_WARN_ONLY = frozenset(_validation_config.warn_only)
+
+_PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+_EARNINGS_COLUMNS = ["EPS Estimate", "Reported EPS", "Surprise(%)"]
+_CALENDAR_DATE_KEYS = ["Earnings Date", "Ex-Dividend Date", "Dividend Date"]
+_CALENDAR_NUMBER_KEYS = ["Earnings High", "Earnings Low", "Earnings Average",
+                         "Revenue High", "Revenue Low", "Revenue Average"]
+
+
+class Violation(NamedTuple):
+    rule: str
+    detail: str
+
+
+class ValidationResult(NamedTuple):
+    """`errors` send the payload to quarantine, `warnings` are only counted."""
+    errors: list[Violation]
+    warnings: list[Violation]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def reason(self) -> str:
+        return "; ".join(f"{v.rule}: {v.detail}" for v in self.errors)
+
+
+def _missing(frame: pd.DataFrame, columns: list[str]) -> Optional[Violation]:
+    missing = [column for column in columns if column not in frame.columns]
+    return Violation("missing_columns", ", ".join(missing)) if missing else None
+
+
+def _non_numeric(frame: pd.DataFrame, columns: list[str]) -> Optional[Violation]:
+    bad = [f"{column}={frame[column].dtype}" for column in columns
+           if column in frame.columns and not pd.api.types.is_numeric_dtype(frame[column])]
+    return Violation("bad_dtype", ", ".join(bad)) if bad else None
+
+
+def _dated_index(frame: pd.DataFrame) -> list[Violation]:
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        return [Violation("bad_index", f"expected dates, got {type(frame.index).__name__}")]
+    violations = []
+    duplicated = int(frame.index.duplicated().sum())
+    if duplicated:
+        violations.append(Violation("duplicate_dates", f"{duplicated} repeated date(s)"))
+    if frame.index.hasnans:
+        violations.append(Violation("bad_index", "missing dates"))
+    return violations
+
+
+def _check_history(frame: pd.DataFrame, job_run_date: date) -> list[Violation]:
+    missing = _missing(frame, _PRICE_COLUMNS + ["Volume"])
+    if missing:
+        return [missing]
+    bad_dtype = _non_numeric(frame, _PRICE_COLUMNS + ["Volume"])
+    if bad_dtype:
+        return [bad_dtype]
+    violations = _dated_index(frame)
+
+    prices = frame[_PRICE_COLUMNS].to_numpy(dtype="float64")
+    nan_rows = np.isnan(prices).any(axis=1)
+    if nan_rows.mean() > _MAX_NAN_RATIO:
+        violations.append(Violation("nan_rows", f"{nan_rows.sum()} of {len(frame)} bars without prices"))
+
+    # comparisons against NaN are False, so bars without prices do not count twice
+    open_, high, low, close = prices.T
+    body_high, body_low = np.fmax(open_, close), np.fmin(open_, close)
+    inconsistent = (high < low) | (high < body_high * (1 - _PRICE_TOLERANCE)) | \
+                   (low > body_low * (1 + _PRICE_TOLERANCE))
+    if inconsistent.any():
+        violations.append(Violation("ohlc_inconsistent", f"{inconsistent.sum()} bar(s) outside their high / low"))
+    non_positive = (prices <= 0).any(axis=1)
+    if non_positive.any():
+        violations.append(Violation("non_positive_price", f"{non_positive.sum()} bar(s)"))
+    negative_volume = int((frame["Volume"] < 0).sum())
+    if negative_volume:
+        violations.append(Violation("negative_volume", f"{negative_volume} bar(s)"))
+
+    if isinstance(frame.index, pd.DatetimeIndex) and not frame.index.hasnans:
+        last_bar = frame.index.max().date()
+        if (job_run_date - last_bar).days > _STALE_AFTER_DAYS:
+            violations.append(Violation("stale", f"last bar {last_bar}"))
+    return violations
+
+
+def _check_actions(frame: pd.DataFrame, job_run_date: date) -> list[Violation]:
+    columns = ["Dividends", "Stock Splits"]
+    missing = _missing(frame, columns)
+    if missing:
+        return [missing]
+    bad_dtype = _non_numeric(frame, columns)
+    if bad_dtype:
+        return [bad_dtype]
+    violations = _dated_index(frame)
+    negative = int((frame[columns] < 0).any(axis=1).sum())
+    if negative:
+        violations.append(Violation("negative_action", f"{negative} row(s)"))
+    return violations
+
+
+def _check_earnings_dates(frame: pd.DataFrame, job_run_date: date) -> list[Violation]:
+    missing = _missing(frame, _EARNINGS_COLUMNS)
+    if missing:
+        return [missing]
+    bad_dtype = _non_numeric(frame, _EARNINGS_COLUMNS)
+    if bad_dtype:
+        return [bad_dtype]
+    violations = _dated_index(frame)
+    # upcoming dates have no reported EPS yet, only a missing estimate is suspicious
+    unestimated = frame["EPS Estimate"].isna().mean()
+    if unestimated > 0.5:
+        violations.append(Violation("nan_rows", f"{unestimated:.0%} of dates without an estimate"))
+    return violations
+
+
+def _check_calendar(payload: dict, job_run_date: date) -> list[Violation]:
+    if not set(payload) & set(_CALENDAR_DATE_KEYS + _CALENDAR_NUMBER_KEYS):
+        return [Violation("missing_columns", f"no known calendar field in {sorted(map(str, payload))[:5]}")]
+    violations = []
+    dates = pd.Series([value for key in _CALENDAR_DATE_KEYS if payload.get(key) is not None
+                       for value in np.atleast_1d(payload[key])], dtype="object")
+    if pd.to_datetime(dates, errors="coerce").isna().sum() > dates.isna().sum():
+        violations.append(Violation("bad_dtype", "unparseable date field"))
+    numbers = pd.to_numeric(pd.Series({key: payload[key] for key in _CALENDAR_NUMBER_KEYS
+                                       if payload.get(key) is not None}, dtype="object"), errors="coerce")
+    if numbers.isna().any():
+        violations.append(Violation("bad_dtype", f"non-numeric {', '.join(numbers.index[numbers.isna()])}"))
+    elif numbers.get("Earnings Low", -np.inf) > numbers.get("Earnings High", np.inf):
+        violations.append(Violation("inconsistent_range", "Earnings Low above Earnings High"))
+    return violations
+
+
+def _check_news(items: list, job_run_date: date) -> list[Violation]:
+    if not all(isinstance(item, dict) for item in items):
+        return [Violation("bad_dtype", "news items must be objects")]
+    frame = pd.json_normalize(items)
+    if "id" not in frame.columns:
+        return [Violation("missing_columns", "id")]
+    violations = []
+    missing_ids = int(frame["id"].isna().sum())
+    if missing_ids:
+        violations.append(Violation("missing_ids", f"{missing_ids} item(s)"))
+    duplicated = int(frame["id"].dropna().duplicated().sum())
+    if duplicated:
+        violations.append(Violation("duplicate_ids", f"{duplicated} item(s)"))
+    if "content.pubDate" in frame.columns:
+        published = pd.to_datetime(frame["content.pubDate"], errors="coerce", utc=True)
+        unparseable = int((published.isna() & frame["content.pubDate"].notna()).sum())
+        if unparseable:
+            violations.append(Violation("bad_dtype", f"{unparseable} unparseable pubDate(s)"))
+    return violations
+
+
+# method -> (expected payload type, rule set)
+_RULES: dict[str, tuple[type, Callable[[Any, date], list[Violation]]]] = {
+    "history": (pd.DataFrame, _check_history),
+    "get_actions": (pd.DataFrame, _check_actions),
+    "earnings_dates": (pd.DataFrame, _check_earnings_dates),
+    "calendar": (dict, _check_calendar),
+    "get_news": (list, _check_news),
+}
+
+
+def validate_payload(func: str, payload: Any, job_run_date: date) -> ValidationResult:
+    """
+    Run the rules of `func` on a fetched, non-empty payload. Every rule is a
+    column-wise check over the whole frame (numpy / pandas), never a loop
+    over rows, so a 5-year `history` costs about as much as a single bar.
+    Methods without rules pass unchecked.
+    """
+    if not VALIDATION_ENABLED or func not in _RULES:
+        return ValidationResult([], [])
+    expected_type, check = _RULES[func]
+    if not isinstance(payload, expected_type):
+        violations = [Violation("bad_payload", f"expected {expected_type.__name__}, got {type(payload).__name__}")]
+    else:
+        violations = check(payload, job_run_date)
+    errors = [v for v in violations if v.rule not in _WARN_ONLY]
+    warnings = [v for v in violations if v.rule in _WARN_ONLY]
+    return ValidationResult(errors, warnings)
+
+
+def quality_summary(counters: dict) -> dict:
+    """
+    Per-method data-quality view of a run, from the `RunMetrics.summary()` counters:
+    {func: {checked, quarantined, rules: {rule: count}}}
+    """
+    summary: dict[str, dict] = {}
+    for name, counts in counters.items():
+        if name not in ("quality_checked", "quarantined") and not name.startswith("dq_"):
+            continue
+        for func, count in counts["by_method"].items():
+            entry = summary.setdefault(func, {"checked": 0, "quarantined": 0, "rules": {}})
+            if name.startswith("dq_"):
+                entry["rules"][name[3:]] = count
+            else:
+                entry[name.replace("quality_", "")] = count
+    return summary
@@ -0,0 +1,86 @@
+# src/stockify/ingest/watermark.py
+import json
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+from stockify.config import get_state_path
+from stockify.utils.filelock import file_lock
+from stockify.utils.logger import logger as logger_file
+
+
+class HistoryWatermarkStore:
+    """
+    Persistent per-symbol watermark of the last ingested `history` bar date.
+    Stored as a small JSON map {symbol: "YYYY-MM-DD"} in the state directory,
+    so each run only asks the API for bars after the watermark.
+    Updates are kept in memory until `save()`, which the daily job calls once
+    the written data is on disk. `save()` merges with the file under a lock,
+    so shards running side by side never drop each other's watermarks.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks: dict[str, str] = self._load(path)
+
+    @staticmethod
+    def _load(path: Path) -> dict[str, str]:
+        if not path.exists() or path.stat().st_size == 0:
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logger_file.error("Unreadable watermark file %s, starting from scratch", path, exc_info=True)
+            return {}
+
+    def get(self, symbol: str) -> Optional[date]:
+        mark = self._marks.get(symbol)
+        return date.fromisoformat(mark) if mark else None
+
+    def next_start(self, symbol: str) -> Optional[date]:
+        """First bar date still missing for `symbol`, or None if it was never ingested."""
+        mark = self.get(symbol)
+        return mark + timedelta(days=1) if mark else None
+
+    def update(self, symbol: str, bar_date: date) -> None:
+        # Watermarks only move forward
+        with self._lock:
+            current = self._marks.get(symbol)
+            if current is None or bar_date.isoformat() > current:
+                self._marks[symbol] = bar_date.isoformat()
+
+    def save(self) -> None:
+        with file_lock(self.path):
+            # another process may have saved since we loaded: the newest mark wins
+            on_disk = self._load(self.path)
+            with self._lock:
+                for symbol, mark in on_disk.items():
+                    if mark > self._marks.get(symbol, ""):
+                        self._marks[symbol] = mark
+                snapshot = dict(self._marks)
+
+            # write-then-rename so a crash never leaves a half written file behind
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp_path, self.path)
+        logger_file.debug("Saved %d history watermarks -> %s", len(snapshot), self.path)
+
+
+# Process-wide store shared by all ingestion tasks
+_watermark_store: Optional[HistoryWatermarkStore] = None
+
+
+def get_watermark_store() -> HistoryWatermarkStore:
+    global _watermark_store
+    if _watermark_store is None:
+        _watermark_store = HistoryWatermarkStore(get_state_path() / "history_watermarks.json")
+    return _watermark_store
+
+
+def save_watermark_store() -> None:
+    """Persist the shared store, if one was created during this run."""
+    if _watermark_store is not None:
+        _watermark_store.save()
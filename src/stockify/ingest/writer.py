@@ -1,10 +1,13 @@
 # src/stockify/ingest/writer.py
 from typing import Union
+import csv
 import json
+import time
 from pathlib import Path
 from typing import Any, Optional
 import pandas as pd
 from stockify.utils.logger import logger as logger_file
+from stockify.utils.metrics import metrics
 
 class RawDataWriter:
     """
@@ -13,12 +16,16 @@ class RawDataWriter:
     (Parquet, databases, etc.) or additional datasets.
     """
     def __init__(self, root_dir: Path, symbol: str, func: str,
-                 data: Union[dict, pd.DataFrame], batch_date: str):               
+                 data: Union[dict, pd.DataFrame], batch_date: str, append: bool = False):               
         self.root_dir = root_dir
         self.symbol = symbol
         self.func = func
         self.data = data
         self.batch_date = batch_date
+        # DataFrames only: add rows to the file this batch date already has instead of skipping.
+        # Incremental `history` is one partition per batch date; earlier days' files are never
+        # rewritten, the catalog's `history` view unions them keyed on (symbol, Date).
+        self.append = append
         self._validate_root_dir(self.root_dir)                  # change this if path changes
         # self.data_copy = pd.DataFrame()
 
@@ -45,18 +52,37 @@ class RawDataWriter:
         For example, we could add a timestamp, source information, or any other relevant metadata.
         """
         if isinstance(self.data, pd.DataFrame):
-            if self.func == "history":
-                self.data['Date'] = self.data.index                               
-                self.data.reset_index(drop=True, inplace=True)                    
-            else:
-                self.data[f"{self.func}_features"] = self.data.index                   
-                self.data.reset_index(drop=True, inplace=True)
+            self.apply_feature_labels(self.data, self.func)
             logger_file.debug("Added feature labels to DataFrame for %s (%s)", self.symbol, self.func)                  
         else:
             logger_file.warning("Data is not a DataFrame, skipping feature label addition")
 
         return self.data  # type: ignore
 
+    @staticmethod
+    def apply_feature_labels(data: pd.DataFrame, func: str) -> pd.DataFrame:
+        """
+        Move the DataFrame index into a regular column (in place).
+        `history` keeps its index as `Date`, other datasets as `<func>_features`.
+        Shared by every writer backend so the column layout stays identical across formats.
+        """
+        label = "Date" if func == "history" else f"{func}_features"
+        data[label] = data.index
+        data.reset_index(drop=True, inplace=True)
+        return data
+
+    def _serialize(self, serializer, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        text = serializer(*args, **kwargs)
+        metrics.observe("serialization", time.perf_counter() - started, self.func)
+        return text
+
+    def _write_text(self, out_file: Path, text: str, mode: str = "w") -> None:
+        started = time.perf_counter()
+        with open(out_file, mode, encoding="utf-8", newline="") as f:
+            f.write(text)
+        metrics.observe("disk_write", time.perf_counter() - started, self.func)
+
     def write_data_to_raw_layer(self) -> Optional[Path]:
         if isinstance(self.data, list):
             if len(self.data) == 0:
@@ -66,12 +92,12 @@ class RawDataWriter:
                 out_dir = self.build_dataset_dir(self.root_dir, self.func, self.batch_date)             # Ensure correct dataset directory based on function (e.g., "info", "history")
                 out_file = out_dir/f"{self.symbol}.json"                                                # Output file named after the symbol, e.g., "AAPL.json" 
                 if out_file.exists():
-                    logger_file.info("Overwriting existing file: %s", out_file)
+                    logger_file.debug("Overwriting existing file: %s", out_file)
                     return None
                 
-                with open(out_file, "w", encoding="utf-8") as f:
-                    json.dump(self.data, f, indent=2, default=str)
-                logger_file.info(f"Loaded `{self.func}` for {self.symbol} -> {out_file}")
+                payload = self._serialize(json.dumps, self.data, separators=(",", ":"), default=str)
+                self._write_text(out_file, payload)
+                logger_file.debug("Loaded `%s` for %s -> %s", self.func, self.symbol, out_file)
                 return out_file
                 
                 
@@ -83,15 +109,15 @@ class RawDataWriter:
                 out_dir = self.build_dataset_dir(self.root_dir, self.func, self.batch_date)             # Ensure correct dataset directory based on function (e.g., "info", "history")
                 out_file = out_dir/f"{self.symbol}.json"                                                # Output file named after the symbol, e.g., "AAPL.json" 
                 if out_file.exists():
-                    logger_file.info("Overwriting existing file: %s", out_file)
+                    logger_file.debug("Overwriting existing file: %s", out_file)
                     return None
 
                 # Convert Timestamp keys to strings for JSON serialization
                 json_serializable_data = {str(k): v for k, v in self.data.items()}
                 
-                with open(out_file, "w", encoding="utf-8") as f:
-                    json.dump(json_serializable_data, f, indent=2, default=str)
-                logger_file.info(f"Loaded `{self.func}` for {self.symbol} -> {out_file}")
+                payload = self._serialize(json.dumps, json_serializable_data, separators=(",", ":"), default=str)
+                self._write_text(out_file, payload)
+                logger_file.debug("Loaded `%s` for %s -> %s", self.func, self.symbol, out_file)
                 return out_file
 
         elif isinstance(self.data, pd.DataFrame):
@@ -101,13 +127,27 @@ class RawDataWriter:
             else:
                 out_dir = self.build_dataset_dir(self.root_dir, self.func, self.batch_date)             # Ensure correct dataset directory based on function (e.g., "info", "history")
                 out_file = out_dir / f"{self.symbol}.csv"                                               # Output file named after the symbol, e.g., "AAPL.csv"
-                if out_file.exists():
-                    logger_file.info("File already exists, skipping write: %s", out_file)
+                if out_file.exists() and self.append:
+                    self.df_copy = self.add_feature_labels()
+                    # rows go under the existing header, in its column order
+                    with open(out_file, encoding="utf-8", newline="") as f:
+                        header = next(csv.reader(f), [])
+                    extra = [column for column in self.data.columns if column not in header]
+                    if extra:
+                        logger_file.warning("Dropping column(s) %s not in %s", extra, out_file)
+                    rows = self.data.reindex(columns=header)
+                    payload = self._serialize(rows.to_csv, header=False, index=False)
+                    self._write_text(out_file, payload, mode="a")
+                    logger_file.debug("Appended %d rows of `%s` for %s -> %s", len(self.data), self.func, self.symbol, out_file)
+                    return out_file
+                elif out_file.exists():
+                    logger_file.debug("File already exists, skipping write: %s", out_file)
                     return None
                 else:
                     self.df_copy = self.add_feature_labels()                                            # Add feature labels before writing
-                    self.data.to_csv(out_file, index=False)
-                    logger_file.info(f"Wrote `{self.func}` for {self.symbol} -> {out_file}")
+                    payload = self._serialize(self.data.to_csv, index=False)
+                    self._write_text(out_file, payload)
+                    logger_file.debug("Wrote `%s` for %s -> %s", self.func, self.symbol, out_file)
                     return out_file
         else:
             logger_file.error("Unsupported data type for writing: %s", type(self.data))
@@ -0,0 +1,304 @@
+# src/stockify/orchestration/compact.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Optional
+import polars as pl
+from stockify.ingest.parquet_writer import ParquetBatchWriter
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.config import add_settings_argument, get_raw_data_path, get_settings, get_state_path
+
+# CONFIGURATION
+_compaction_config = get_settings().compaction
+_METHODS = _compaction_config.methods
+_COMPRESSION = _compaction_config.compression
+
+# Natural key of a record within one symbol, per method
+_NATURAL_KEYS = {
+    "get_news": pl.col("payload").str.json_path_match("$.id"),       # news UUID
+    "get_actions": pl.col("get_actions_features").dt.to_string("%Y-%m-%dT%H:%M:%S"),
+    "earnings_dates": pl.col("earnings_dates_features").dt.to_string("%Y-%m-%dT%H:%M:%S"),
+    "calendar": pl.lit(""),                                          # one calendar per symbol
+}
+_META_COLUMNS = ("symbol", "as_of_date", "func")
+# polars' row hash is only stable within one polars version, so the key index records which one made it
+_HASH_SCHEME = f"polars-{pl.__version__}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    func          TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    first_seen    TEXT NOT NULL,
+    last_seen     TEXT NOT NULL,
+    versions      INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (func, key)
+);
+CREATE TABLE IF NOT EXISTS partitions (
+    func          TEXT NOT NULL,
+    as_of_date    TEXT NOT NULL,
+    source_files  INTEGER NOT NULL,
+    rows_in       INTEGER NOT NULL,
+    rows_out      INTEGER NOT NULL,
+    compacted_at  TEXT NOT NULL,
+    pruned        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (func, as_of_date)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name          TEXT PRIMARY KEY,
+    value         TEXT NOT NULL
+);
+"""
+
+
+def raw_partitions(root_dir: Path, func: str) -> dict[str, list[Path]]:
+    """as_of_date -> raw files, across both raw layouts."""
+    partitions: dict[str, list[Path]] = {}
+    for func_dir, prefix in ((root_dir/"yf"/func, ""), (root_dir/"yf"/f"func={func}", "as_of_date=")):
+        if not func_dir.is_dir():
+            continue
+        for date_dir in func_dir.iterdir():
+            files = sorted(p for p in date_dir.glob("*") if p.suffix in (".csv", ".json", ".parquet"))
+            if date_dir.is_dir() and files:
+                partitions.setdefault(date_dir.name.removeprefix(prefix), []).extend(files)
+    return dict(sorted(partitions.items()))
+
+
+def _read_raw_file(func: str, path: Path) -> Optional[pl.DataFrame]:
+    if path.suffix == ".parquet":
+        return pl.read_parquet(path)
+    if path.suffix == ".csv":
+        return pl.read_csv(path, try_parse_dates=True).with_columns(symbol=pl.lit(path.stem))
+    with open(path, encoding="utf-8") as f:
+        table = ParquetBatchWriter.to_arrow(path.stem, func, json.load(f))
+    return pl.from_arrow(table) if table is not None else None
+
+
+def read_raw_partition(func: str, files: list[Path]) -> Optional[pl.DataFrame]:
+    """All raw files of one date partition as one polars frame, timestamps in UTC."""
+    frames = []
+    for path in files:
+        try:
+            frame = _read_raw_file(func, path)
+        except Exception:
+            logger_file.error("Unreadable raw file %s, skipped", path, exc_info=True)
+            continue
+        if frame is not None and frame.height:
+            frames.append(frame)
+    if not frames:
+        return None
+    frame = pl.concat(frames, how="diagonal_relaxed")
+    # one representation for timestamps, whichever writer produced them
+    return frame.with_columns(pl.col(pl.Datetime).dt.convert_time_zone("UTC").dt.cast_time_unit("us"))
+
+
+class RawCompactor:
+    """
+    Rolls the daily per-symbol snapshots of a method into one deduplicated
+    Parquet dataset:
+        root_dir/compacted/<func>/first_seen=<date>/part-0.parquet
+
+    Date partitions of the raw layer (both the csv_json and the parquet layout)
+    are streamed one at a time, oldest first, so memory is bounded by the size
+    of a single day. Each record gets a natural key (`_NATURAL_KEYS`, prefixed
+    by the symbol) and a content hash; only keys never seen before, or seen
+    with different content, are written out. A SQLite key index keeps
+    first_seen / last_seen / versions per key and the list of compacted dates,
+    so a rerun only touches dates not compacted yet. After each run the index
+    is exported next to the data as `_keys.parquet`.
+    """
+    def __init__(self, root_dir: Path, db_path: Path, compression: str = _COMPRESSION):
+        self.root_dir = root_dir
+        self.out_root = root_dir/"compacted"
+        self.compression = compression
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._check_hash_scheme()
+
+    def _check_hash_scheme(self) -> None:
+        with self._conn:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'hash_scheme'").fetchone()
+            if row is not None and row[0] != _HASH_SCHEME:
+                logger_file.warning("Key index hashes were made with %s, now %s: the next compaction of each "
+                                    "known key writes it once more as a new version", row[0], _HASH_SCHEME)
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('hash_scheme', ?)", (_HASH_SCHEME,))
+
+    # Discovery
+    def raw_partitions(self, func: str) -> dict[str, list[Path]]:
+        return raw_partitions(self.root_dir, func)
+
+    def compacted_dates(self, func: str) -> set[str]:
+        rows = self._conn.execute("SELECT as_of_date FROM partitions WHERE func = ?", (func,)).fetchall()
+        return {row[0] for row in rows}
+
+    # Reading
+    def read_partition(self, func: str, files: list[Path]) -> Optional[pl.DataFrame]:
+        return read_raw_partition(func, files)
+
+    @staticmethod
+    def _with_keys(func: str, frame: pl.DataFrame) -> pl.DataFrame:
+        content = [c for c in frame.columns if c not in _META_COLUMNS]
+        row_text = pl.concat_str([pl.col(c).cast(pl.String).fill_null("") for c in content], separator="\x1f")
+        frame = frame.with_columns(
+            _key=pl.concat_str([pl.col("symbol"), _NATURAL_KEYS[func].fill_null(row_text)], separator="|"),
+            # vectorised; a fixed seed keeps it stable across processes (not polars versions, see _HASH_SCHEME)
+            _content_hash=row_text.hash(seed=0).cast(pl.String),
+        )
+        # the same record twice in one snapshot counts once
+        return frame.unique(subset="_key", keep="last", maintain_order=True)
+
+    # Compaction
+    def compact_partition(self, func: str, as_of_date: str, files: list[Path]) -> tuple[int, int]:
+        frame = self.read_partition(func, files)
+        rows_in = frame.height if frame is not None else 0
+        rows_out = 0
+        now = datetime.now().isoformat(timespec="seconds")
+
+        with self._conn:
+            if frame is not None:
+                frame = self._with_keys(func, frame)
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch (key TEXT PRIMARY KEY, content_hash TEXT)")
+                self._conn.execute("DELETE FROM batch")
+                self._conn.executemany("INSERT INTO batch VALUES (?, ?)",
+                                       frame.select("_key", "_content_hash").iter_rows())
+                known = dict(self._conn.execute(
+                    "SELECT k.key, k.content_hash FROM keys k JOIN batch b ON k.key = b.key WHERE k.func = ?",
+                    (func,)).fetchall())
+
+                hashes = frame.select("_key", "_content_hash").iter_rows()
+                fresh = [known.get(key) != content_hash for key, content_hash in hashes]
+                new_rows = frame.filter(pl.Series(fresh, dtype=pl.Boolean))
+                rows_out = new_rows.height
+                if rows_out:
+                    self._write(func, as_of_date, new_rows.drop("func", "as_of_date", strict=False)
+                                .with_columns(first_seen=pl.lit(date.fromisoformat(as_of_date))))
+
+                # new keys and new versions of known keys; everything else only moves last_seen
+                self._conn.execute(
+                    "INSERT INTO keys (func, key, content_hash, first_seen, last_seen) "
+                    "SELECT ?, key, content_hash, ?, ? FROM batch WHERE true "
+                    "ON CONFLICT (func, key) DO UPDATE SET "
+                    "versions = keys.versions + (keys.content_hash != excluded.content_hash), "
+                    "content_hash = excluded.content_hash, first_seen = min(keys.first_seen, excluded.first_seen), "
+                    "last_seen = max(keys.last_seen, excluded.last_seen)",
+                    (func, as_of_date, as_of_date),
+                )
+            self._conn.execute("INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, 0)",
+                               (func, as_of_date, len(files), rows_in, rows_out, now))
+        return rows_in, rows_out
+
+    def _write(self, func: str, as_of_date: str, frame: pl.DataFrame) -> Path:
+        out_dir = self.out_root/func/f"first_seen={as_of_date}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_file = out_dir/"part-0.parquet"
+        # write-then-rename: a rerun after a crash overwrites the same file
+        tmp_path = out_file.with_suffix(".tmp")
+        frame.write_parquet(tmp_path, compression=self.compression)
+        os.replace(tmp_path, out_file)
+        return out_file
+
+    def export_keys(self, func: str, chunk_rows: int = 100_000) -> Path:
+        """Write first_seen / last_seen / versions per key to `_keys.parquet`, chunk by chunk."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        out_file = self.out_root/func/"_keys.parquet"
+        out_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_file.with_suffix(".tmp")
+        schema = pa.schema([("_key", pa.string()), ("first_seen", pa.string()),
+                            ("last_seen", pa.string()), ("versions", pa.int64())])
+        cursor = self._conn.execute("SELECT key, first_seen, last_seen, versions FROM keys WHERE func = ? ORDER BY key",
+                                    (func,))
+        with pq.ParquetWriter(tmp_path, schema, compression=self.compression) as writer:
+            while rows := cursor.fetchmany(chunk_rows):
+                writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, row)) for row in rows], schema))
+        os.replace(tmp_path, out_file)
+        return out_file
+
+    def prune(self, func: str, partitions: dict[str, list[Path]]) -> int:
+        """Delete the raw files of compacted dates, returns the number of files removed."""
+        compacted = self.compacted_dates(func)
+        removed = 0
+        for as_of_date, files in partitions.items():
+            if as_of_date not in compacted:
+                continue
+            for path in files:
+                path.unlink(missing_ok=True)
+                removed += 1
+            for date_dir in {path.parent for path in files}:
+                if date_dir.is_dir() and not any(date_dir.iterdir()):
+                    shutil.rmtree(date_dir)
+            with self._conn:
+                self._conn.execute("UPDATE partitions SET pruned = 1 WHERE func = ? AND as_of_date = ?",
+                                   (func, as_of_date))
+        return removed
+
+    def run(self, methods: Iterable[str] = _METHODS, until: Optional[date] = None, prune: bool = False) -> dict:
+        """
+        Compact every raw date partition not compacted yet, up to and including
+        `until` (default: yesterday, today's partition may still be written to).
+        """
+        until = until or date.fromordinal(date.today().toordinal() - 1)
+        summary = {}
+        for func in methods:
+            if func not in _NATURAL_KEYS:
+                logger_file.warning("No natural key defined for `%s`, not compacted", func)
+                continue
+            partitions = {d: files for d, files in self.raw_partitions(func).items() if d <= until.isoformat()}
+            done = self.compacted_dates(func)
+            todo = {d: files for d, files in partitions.items() if d not in done}
+
+            stats = {"dates": len(todo), "files": 0, "rows_in": 0, "rows_out": 0}
+            for as_of_date, files in todo.items():
+                started = time.perf_counter()
+                rows_in, rows_out = self.compact_partition(func, as_of_date, files)
+                stats["files"] += len(files)
+                stats["rows_in"] += rows_in
+                stats["rows_out"] += rows_out
+                logger_file.info("Compacted `%s` %s: %d files, %d rows -> %d new / changed (%.2fs)",
+                                 func, as_of_date, len(files), rows_in, rows_out, time.perf_counter() - started)
+            if todo:
+                self.export_keys(func)
+            if prune:
+                stats["pruned_files"] = self.prune(func, partitions)
+            summary[func] = stats
+        return summary
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compact daily raw snapshots into deduplicated Parquet datasets")
+    parser.add_argument("--methods", default=",".join(_METHODS), help="comma separated methods to compact")
+    parser.add_argument("--until", type=date.fromisoformat, default=None,
+                        help="last as_of_date to compact (default: yesterday)")
+    parser.add_argument("--prune", action="store_true", help="delete raw files of compacted dates")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    log_terminal.info("Compaction Started....")
+    start_time = time.perf_counter()
+    compactor = RawCompactor(get_raw_data_path(), get_state_path() / "compaction.sqlite")
+    try:
+        summary = compactor.run(methods=args.methods.split(","), until=args.until, prune=args.prune)
+    finally:
+        compactor.close()
+    for func, stats in summary.items():
+        log_terminal.info("`%s`: %s", func, stats)
+    log_terminal.info("Compaction Completed in %.2f seconds", time.perf_counter() - start_time)
@@ -1,92 +1,226 @@
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
 import asyncio
+import math
 import time
-from datetime import date
-import psutil
-import os
+from datetime import date, datetime
+from typing import Optional, Union
 from stockify.utils.logger import logger as logger_file
 from stockify.utils.logger import logger_terminal as log_terminal
-from src.stockify.ingest.ingest_main import api_ingestion_load
-from src.stockify.utils.tickers import load_ticker_list
-from src.stockify.config import load_config
+from stockify.ingest.fetcher import get_executor
+from stockify.ingest.rate_control import rate_controller
+from stockify.utils.metrics import metrics
+from stockify.ingest.parquet_writer import WRITER_FORMAT, flush_parquet_writer, get_parquet_writer
+from stockify.ingest.watermark import save_watermark_store
+from stockify.ingest.symbol_cache import save_symbol_cache
+from stockify.ingest.manifest import get_run_manifest
+from stockify.ingest.bulk_history import bulk_history_available
+from stockify.ingest.content_index import CHANGE_DETECTION_METHODS, get_content_index
+from stockify.ingest.dead_letter import get_dead_letter_queue
+from stockify.ingest.validation import quality_summary
+from stockify.query.catalog import refresh_catalog
+from stockify.analytics.features import build_features
+from stockify.orchestration.pipeline import IngestionPipeline, WorkItem
+from stockify.orchestration.scheduler import SCHEDULING_ENABLED, get_scheduler
+from stockify.orchestration.replay import MAIN_PASS_RETRIES, RETRY_AFTER_RUN, retry_dead_letters
+from stockify.orchestration.shard import DEFAULT_METHODS, parse_shard, select_shard, shard_report_path
+from stockify.utils.tickers import load_ticker_list
+from stockify.config import add_settings_argument, get_raw_data_path, get_settings, get_state_path
 
 """ This job runs daily in batch to update the following """
 
-async def trigger_daily_ingestion(func):
-
-    symbols = load_ticker_list()
-    symbols = symbols[0:400]  # For testing, limit to first 400 symbols. Remove this line for full run.
-
-    JOB_RUN_DATE = date.today()
-    CHUNK_SIZE = load_config().get("ingestion", {}).get("batch_size", 50)
-    COOLDOWN_SEC = load_config().get("ingestion", {}).get("cool_down", 60)
-
-    for i in range(0, len(symbols), CHUNK_SIZE):
-        chunk = symbols[i : i + CHUNK_SIZE]
-        log_terminal.info(
-            f"Processing chunk {i//CHUNK_SIZE + 1}"
-            f"(out of {round(len(symbols)/len(chunk))})")
-        
-        tasks = []
-            
-        for stock in chunk:
-            tasks.append(
-                api_ingestion_load(
-                    stock_symbol=stock,
-                    job_run_date=JOB_RUN_DATE,
-                    func=func,
-                    period=None
-                )
-            )
-    
-        # Run all task concurrently
-        await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Do not sleep after last chunk
-        if i + CHUNK_SIZE < len(symbols):
-            log_terminal.info(
-                f"Chunk complete. Cooling down for {COOLDOWN_SEC}s..."
-            )
-            await asyncio.sleep(COOLDOWN_SEC)
-            
-        process = psutil.Process(os.getpid())
-        process.cpu_percent(interval=None)   
-        cpu_usage = process.cpu_percent(interval=1)             # CPU usage over short interval
-        memory_info = process.memory_info()                     # Memory usage 
-        memory_mb = memory_info.rss / (1024 * 1024)
-        log_terminal.info("Memory usage: %.2f MB", memory_mb)    
-
-    log_terminal.info("All chunks completed.")
+async def trigger_daily_ingestion(methods: Union[str, list[str]], job_run_date: Optional[date] = None,
+                                  symbols: Optional[list[str]] = None, shard: Optional[tuple[int, int]] = None):
+    """
+    `shard=(i, N)` restricts the run to the i-th of N stable symbol shards; the
+    catalog refresh and the merged run report are then left to the launcher
+    (`stockify.orchestration.shard`), this process only writes its shard report.
+    """
+    methods = [methods] if isinstance(methods, str) else list(methods)
+
+    if symbols is None:
+        symbols = load_ticker_list()
+    if shard is not None:
+        symbols = select_shard(symbols, *shard)
+        log_terminal.info("Shard %d/%d: %d symbols", shard[0], shard[1], len(symbols))
+
+    JOB_RUN_DATE = job_run_date or date.today()
+    settings = get_settings()
+    QUEUE_SIZE = settings.ingestion.batch_size
+    FETCH_WORKERS = settings.ingestion.max_concurrency
+    WRITE_WORKERS = settings.ingestion.writer_concurrency
+    executor = get_executor()
+
+    # The manifest decides what is left to do before anything touches the network
+    manifest = get_run_manifest()
+    manifest.start_run(str(JOB_RUN_DATE), methods)
+    content_index = get_content_index()
+    if WRITER_FORMAT == "parquet":
+        def on_flush(func: str, batch_date: str, flushed_symbols: list[str]) -> None:
+            manifest.mark_flushed(func, batch_date, flushed_symbols)
+            content_index.confirm(func, batch_date, flushed_symbols)
+        get_parquet_writer(get_raw_data_path()).on_flush = on_flush
+
+    # Every (symbol, method) pair goes through one shared pool and one request budget
+    pending_by_method = {}
+    for method in methods:
+        completed = manifest.completed(method, str(JOB_RUN_DATE))
+        pending = [stock for stock in symbols if stock not in completed]
+        if completed:
+            log_terminal.info("`%s`: %d symbols already done for %s, %d left",
+                              method, len(symbols) - len(pending), JOB_RUN_DATE, len(pending))
+        if not SCHEDULING_ENABLED and method in CHANGE_DETECTION_METHODS:
+            due = content_index.due(method, pending, JOB_RUN_DATE)
+            if len(due) < len(pending):
+                log_terminal.info("`%s`: %d symbols unchanged for a while, not due today",
+                                  method, len(pending) - len(due))
+            pending = due
+        pending_by_method[method] = pending
+
+    # Only what is due, most important first, within the request budget (shards split it)
+    schedule = None
+    if SCHEDULING_ENABLED:
+        scheduler = get_scheduler()
+        budget = math.ceil(scheduler.max_requests / shard[1]) if shard is not None else scheduler.max_requests
+        schedule = scheduler.plan(pending_by_method, JOB_RUN_DATE, budget=budget)
+        log_terminal.info("Schedule: %d of %d items due, %d scheduled, %d left for later by the request budget",
+                          schedule.summary["due"], schedule.summary["candidates"],
+                          schedule.summary["scheduled"], schedule.summary["deferred"])
+        ordered = [(item.symbol, item.func) for item in schedule.items]
+    else:
+        ordered = [(stock, method) for method in methods for stock in pending_by_method[method]]
+
+    bulk_history = []
+    if "history" in methods and bulk_history_available():
+        # multi-ticker downloads, per-ticker fallback
+        bulk_history = [stock for stock, method in ordered if method == "history"]
+        ordered = [(stock, method) for stock, method in ordered if method != "history"]
+    work_items = [WorkItem(symbol=stock, func=method) for stock, method in ordered]
+    log_terminal.info("Queueing %d work items (+%d bulk history) for %d symbols x %d methods %s",
+                      len(work_items), len(bulk_history), len(symbols), len(methods), methods)
+
+    pipeline = IngestionPipeline(job_run_date=JOB_RUN_DATE,
+                                 fetch_workers=FETCH_WORKERS,
+                                 write_workers=WRITE_WORKERS,
+                                 queue_size=QUEUE_SIZE,
+                                 manifest=manifest,
+                                 retries=MAIN_PASS_RETRIES,
+                                 dead_letters=get_dead_letter_queue()
+                                 )
+    summary = await pipeline.run(work_items, bulk_history=bulk_history)
+
+    # Deferred retry pass: whatever failed today, or on earlier runs, at low concurrency
+    retry_summary = {}
+    if RETRY_AFTER_RUN:
+        retry_summary = await retry_dead_letters(manifest, symbols=symbols if shard is not None else None,
+                                                   run_date=JOB_RUN_DATE)
+        if retry_summary:
+            log_terminal.info("Dead-letter retry pass: %s", retry_summary)
+
+    # Write out whatever the columnar writer still holds in memory
+    flushed = await asyncio.get_running_loop().run_in_executor(executor, flush_parquet_writer)
+    if flushed:
+        log_terminal.info("Flushed %d parquet file(s)", len(flushed))
+
+    # Derived analytics over the new `history` bars
+    features = None
+    if shard is None and "history" in methods and settings.features.refresh_after_run:
+        features = await asyncio.get_running_loop().run_in_executor(executor, build_features)
+        log_terminal.info("Feature store updated: %s", features)
+
+    # Register the new partitions with the query catalog
+    if shard is None and settings.catalog.refresh_after_run:
+        cataloged = await asyncio.get_running_loop().run_in_executor(executor, refresh_catalog)
+        if cataloged:
+            log_terminal.info("Catalog refreshed: %s", cataloged)
+
+    # Watermarks are persisted only once the rows they cover are on disk
+    save_watermark_store()
+    cache_stats = save_symbol_cache()
+    if cache_stats:
+        log_terminal.info("Symbol resolution cache: %s", cache_stats)
+
+    log_terminal.info("All work items completed: %s", summary)
+    log_terminal.info("Manifest for %s: %s", JOB_RUN_DATE, manifest.summary(str(JOB_RUN_DATE)))
+    quality = quality_summary(metrics.summary()["counters"])
+    if any(entry["quarantined"] for entry in quality.values()):
+        log_terminal.warning("Data quality: %s", quality)
+
+    report = {"batch_date": JOB_RUN_DATE, "methods": methods, "symbols": len(symbols),
+              "pipeline": summary, "retry_pass": retry_summary, "manifest": manifest.summary(str(JOB_RUN_DATE)),
+              "dead_letter": get_dead_letter_queue().summary(), "executor": executor.stats(),
+              "features": features, "quality": quality,
+              "schedule": schedule.summary if schedule is not None else None,
+              "rate_controller": rate_controller.snapshot(), "symbol_cache": cache_stats,
+              "content_index": content_index.summary()}
+    if shard is not None:
+        # Raw metric state goes along so the launcher can merge exact percentiles
+        report_file = metrics.write_summary(shard_report_path(JOB_RUN_DATE, *shard),
+                                            extra={**report, "shard": f"{shard[0]}/{shard[1]}",
+                                                   "metrics_state": metrics.state()})
+        log_terminal.info("Shard report written to %s", report_file)
+        return summary
+
+    manifest.finish_run(str(JOB_RUN_DATE))
+
+    # Metrics export: Prometheus textfile (latest run) + JSON summary per run
+    prom_file = metrics.write_prometheus(get_state_path() / "metrics" / "ingest.prom")
+    run_file = metrics.write_summary(
+        get_state_path() / "runs" / f"{JOB_RUN_DATE}-{datetime.now():%H%M%S}.json", extra=report
+    )
+    log_terminal.info("Metrics written to %s and %s", prom_file, run_file)
+    return summary
 
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Daily market data ingestion")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last unfinished run (same batch date and methods)")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="batch date (default: today)")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N tickers of the list")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help="only the i-th of N symbol shards (0-based), see stockify.orchestration.shard")
+    parser.add_argument("--split-rate-limit", action="store_true",
+                        help="with --shard: the N shards share this host's request budget")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
     log_terminal.info("Daily Market Ingestion Started....")
     start_time = time.perf_counter()
 
-    methods = ['get_news', 'get_actions', 'earnings_dates', 'calendar' ]
-    COOLDOWN_BETWEEN_METHODS = 600  # 10 minutes (600 seconds)
-    async def run_all_methods():
-        for method in methods:
-            log_terminal.info(f"Starting method: `{method}`")
-            try:
-                await trigger_daily_ingestion(func=method)
-                log_terminal.info(f"`{method}` completed successfully.")
-
-                # Wait only if not last method
-                if method != methods[-1]:
-                    log_terminal.info(
-                        f"Going to next METHOD. Cooling down for {COOLDOWN_BETWEEN_METHODS//60} minutes..."
-                    )
-                    await asyncio.sleep(COOLDOWN_BETWEEN_METHODS)
-
-            except Exception as e:
-                logger_file.error(f"{method} failed. Skipping cooldown.", exc_info=True)
-
-    asyncio.run(run_all_methods())
+    methods = args.methods
+    job_run_date = args.date
+    symbols = load_ticker_list()[:args.limit] if args.limit else None
+    if args.shard is not None and args.split_rate_limit:
+        rate_controller.scale(1 / args.shard[1])
+
+    if args.resume:
+        last_run = get_run_manifest().last_unfinished_run()
+        if last_run is None:
+            log_terminal.info("Nothing to resume: the last run finished.")
+            raise SystemExit(0)
+        job_run_date, methods = date.fromisoformat(last_run[0]), last_run[1]
+        log_terminal.info("Resuming run of %s for %s", job_run_date, methods)
+
+    try:
+        asyncio.run(trigger_daily_ingestion(methods, job_run_date=job_run_date, symbols=symbols, shard=args.shard))
+    except Exception:
+        logger_file.error("Daily ingestion failed for %s", methods, exc_info=True)
+        if args.shard is not None:
+            raise SystemExit(1)
 
     end_time = time.perf_counter()
     total_time = end_time - start_time
 
     logger_file.info("Total runtime: %.2f seconds", total_time)
     log_terminal.info("Total runtime: %.2f seconds", total_time)
-    log_terminal.info("Daily Market Ingestion Completed....")
\ No newline at end of file
+    log_terminal.info("Rate controller: %s", rate_controller.snapshot())
+    log_terminal.info("Daily Market Ingestion Completed....")
@@ -0,0 +1,269 @@
+import asyncio
+import os
+import time
+from datetime import date
+from functools import partial
+from typing import Any, Iterable, NamedTuple, Optional
+import psutil
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.ingest.ingest_main import fetch_for_symbol, write_result
+from stockify.ingest.bulk_history import BULK_PARALLEL_BATCHES, fetch_history_batch, plan_history_batches
+from stockify.ingest.rate_control import rate_controller
+from stockify.ingest.manifest import RunManifest
+from stockify.ingest.dead_letter import DeadLetterQueue
+from stockify.ingest.fetcher import FetchFailed
+from stockify.utils.metrics import ResourceSampler, metrics
+from stockify.ingest.fetcher import get_executor
+from stockify.config import get_settings
+
+_SAMPLE_INTERVAL = get_settings().metrics.sample_interval_seconds
+
+
+class WorkItem(NamedTuple):
+    symbol: str
+    func: str
+    enqueued_at: float = 0.0
+
+
+class FetchedItem(NamedTuple):
+    symbol: str
+    func: str
+    result: Any
+    latency_ms: float
+    enqueued_at: float
+
+
+class IngestionPipeline:
+    """
+    Streaming producer / consumer ingestion:
+
+        producer -> work queue -> N fetch workers -> write queue -> M write workers
+
+    Both queues are bounded so memory stays flat regardless of universe size.
+    A fetch worker picks up the next (symbol, method) as soon as its current one
+    finishes, so one slow symbol or retry back-off never holds up the others.
+    All methods share the same workers and the same rate controller budget.
+    Every finished item is recorded in the run `manifest`, when one is given.
+
+    With a `dead_letters` queue, a fetch gets `retries` attempts per variant
+    and retryable failures, as well as failed writes, are parked in the queue
+    instead of being retried inline. `replay=True` marks the deferred retry pass over that queue: items
+    that succeed, or turn out not to be retryable, leave the queue.
+
+    `history` can instead be fetched in multi-ticker batches (`bulk_history`):
+    a second producer downloads the batches, splits them into per-symbol items
+    for the write queue, and feeds the symbols a batch did not return into the
+    work queue for the regular per-ticker fetch.
+    """
+    def __init__(self, job_run_date: date, fetch_workers: int, write_workers: int,
+                 queue_size: int, period=None, manifest: Optional[RunManifest] = None,
+                 retries: int = 3, dead_letters: Optional[DeadLetterQueue] = None, replay: bool = False):
+        self.job_run_date = job_run_date
+        self.fetch_workers = fetch_workers
+        self.write_workers = write_workers
+        self.queue_size = queue_size
+        self.progress_every = queue_size
+        self.period = period
+        self.manifest = manifest
+        self.retries = retries
+        self.dead_letters = dead_letters
+        self.replay = replay
+
+        self.total = 0
+        self.fetched = 0
+        self.written = 0
+        self.empty = 0                    # nothing (new) to write
+        self.unchanged = 0                # same content as the stored copy
+        self.quarantined = 0              # failed validation, held back
+        self.failed = 0
+        self.dead_lettered = 0            # failed, parked for the retry pass
+        self.completed = 0
+        self._chunk: dict[str, dict[str, int]] = {}     # {func: {status: items, "rows": rows}} since the last progress line
+        self._started = 0.0
+
+    async def _produce(self, items: Iterable[WorkItem], work_queue: asyncio.Queue) -> None:
+        for item in items:
+            await work_queue.put(item._replace(enqueued_at=time.perf_counter()))
+            self.total += 1
+
+    async def _produce_bulk_history(self, symbols: list[str], work_queue: asyncio.Queue,
+                                    write_queue: asyncio.Queue) -> None:
+        batches, up_to_date = plan_history_batches(symbols, self.job_run_date)
+        self.total += len(symbols)
+        for symbol in up_to_date:
+            self.empty += 1
+            await self._item_done(symbol, "history", "empty", 0, 0.0)
+
+        pending = iter(batches)
+
+        async def batch_worker():
+            # the shared iterator hands every batch to exactly one worker
+            for window, batch in pending:
+                await self._bulk_batch(window, batch, work_queue, write_queue)
+
+        await asyncio.gather(*(batch_worker() for _ in range(BULK_PARALLEL_BATCHES)))
+
+    async def _bulk_batch(self, window: dict, batch: list[str], work_queue: asyncio.Queue,
+                          write_queue: asyncio.Queue) -> None:
+        started = time.perf_counter()
+        try:
+            frames, missing = await fetch_history_batch(batch, window)
+        except Exception:
+            logger_file.error("Bulk history batch failed (%d symbols)", len(batch), exc_info=True)
+            frames, missing = {}, batch
+        latency_ms = (time.perf_counter() - started) * 1000 / len(batch)       # per-symbol share of the call
+        metrics.observe("fetch_bulk", time.perf_counter() - started, "history")
+
+        for symbol, frame in frames.items():
+            if frame.empty:
+                self.empty += 1
+                await self._item_done(symbol, "history", "empty", 0, latency_ms)
+                continue
+            self.fetched += 1
+            await write_queue.put(FetchedItem(symbol, "history", frame, latency_ms, time.perf_counter()))
+
+        for symbol in missing:
+            await work_queue.put(WorkItem(symbol, "history", time.perf_counter()))
+
+    async def _fetch_worker(self, work_queue: asyncio.Queue, write_queue: asyncio.Queue) -> None:
+        while True:
+            item = await work_queue.get()
+            if item is None:
+                return
+            started = time.perf_counter()
+            metrics.observe("queue_wait", started - item.enqueued_at, item.func)
+            try:
+                result = await fetch_for_symbol(stock_symbol=item.symbol,
+                                                job_run_date=self.job_run_date,
+                                                func=item.func,
+                                                period=self.period,
+                                                retries=self.retries
+                                                )
+            except FetchFailed as e:
+                result, failure = None, e
+            except Exception as e:
+                logger_file.error("Fetch failed for %s (%s)", item.symbol, item.func, exc_info=True)
+                result, failure = None, FetchFailed(f"{type(e).__name__}: {str(e)[:200]}")
+            latency_ms = (time.perf_counter() - started) * 1000
+            metrics.observe("fetch", latency_ms / 1000, item.func)
+
+            if result is None:
+                self.failed += 1
+                await self._dead_letter(item.symbol, item.func, failure)
+                await self._item_done(item.symbol, item.func, "failed", None, latency_ms)
+                continue
+            if len(result) == 0:
+                self.empty += 1
+                await self._item_done(item.symbol, item.func, "empty", 0, latency_ms)
+                continue
+            self.fetched += 1
+            await write_queue.put(FetchedItem(item.symbol, item.func, result, latency_ms, time.perf_counter()))
+
+    async def _write_worker(self, write_queue: asyncio.Queue) -> None:
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                return
+            row_count = len(item.result)
+            started = time.perf_counter()
+            metrics.observe("write_queue_wait", started - item.enqueued_at, item.func)
+            status = await write_result(item.symbol, self.job_run_date, item.func, item.result)
+            metrics.observe("write", time.perf_counter() - started, item.func)
+            if status in ("done", "buffered"):
+                self.written += 1
+            elif status == "unchanged":
+                self.unchanged += 1
+            elif status == "quarantined":
+                self.quarantined += 1
+            elif status == "failed":
+                # the payload is gone, so a write failure is retried like a fetch failure
+                self.failed += 1
+                await self._dead_letter(item.symbol, item.func, FetchFailed("write failed, see the ingestion log"))
+            await self._item_done(item.symbol, item.func, status, row_count, item.latency_ms)
+
+    @staticmethod
+    async def _in_executor(call, *args, **kwargs) -> None:
+        # manifest and dead-letter updates are SQLite commits, kept off the event loop
+        await asyncio.get_running_loop().run_in_executor(get_executor(), partial(call, *args, **kwargs))
+
+    async def _dead_letter(self, symbol: str, func: str, failure: FetchFailed) -> None:
+        if self.dead_letters is None:
+            return
+        batch_date = str(self.job_run_date)
+        if failure.retryable:
+            await self._in_executor(self.dead_letters.push, symbol, func, batch_date, failure.reason)
+            self.dead_lettered += 1
+            metrics.incr("dead_lettered", func)
+        elif self.replay:
+            await self._in_executor(self.dead_letters.resolve, symbol, func, batch_date)
+            logger_file.info("Dropping %s (%s) from the dead-letter queue: %s", symbol, func, failure.reason)
+
+    async def _item_done(self, symbol: str, func: str, status: str,
+                         row_count: Optional[int], latency_ms: float) -> None:
+        if self.replay and status != "failed":
+            await self._in_executor(self.dead_letters.resolve, symbol, func, str(self.job_run_date))
+        if self.manifest is not None:
+            await self._in_executor(self.manifest.record, symbol, func, str(self.job_run_date), status,
+                                    row_count=row_count, latency_ms=round(latency_ms, 1))
+        counts = self._chunk.setdefault(func, {})
+        counts[status] = counts.get(status, 0) + 1
+        if status in ("done", "buffered") and row_count:
+            counts["rows"] = counts.get("rows", 0) + row_count
+        self.completed += 1
+        if self.completed % self.progress_every == 0:
+            self.log_progress()
+
+    def log_progress(self) -> None:
+        # one line per chunk instead of one per symbol; a new dict, the logged one is formatted later
+        chunk, self._chunk = self._chunk, {}
+        logger_file.info("Items up to %d for %s: %s", self.completed, self.job_run_date, chunk,
+                         extra={"batch_date": str(self.job_run_date), "completed": self.completed, "chunk": chunk})
+        elapsed = time.perf_counter() - self._started
+        memory_mb = psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+        log_terminal.info(
+            "Progress %d items (fetched %d, written %d, unchanged %d, quarantined %d, empty %d, failed %d) | "
+            "%.1f items/s | RSS %.2f MB | rate %s",
+            self.completed, self.fetched, self.written, self.unchanged, self.quarantined, self.empty, self.failed,
+            self.completed / elapsed if elapsed else 0.0, memory_mb, rate_controller.snapshot()
+        )
+
+    async def run(self, items: Iterable[WorkItem], bulk_history: Optional[list[str]] = None) -> dict:
+        self._started = time.perf_counter()
+        sampler = ResourceSampler(metrics, interval=_SAMPLE_INTERVAL, executor=get_executor())
+        sampler.start()
+        work_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        fetchers = [asyncio.create_task(self._fetch_worker(work_queue, write_queue))
+                    for _ in range(self.fetch_workers)]
+        writers = [asyncio.create_task(self._write_worker(write_queue))
+                   for _ in range(self.write_workers)]
+
+        producers = [self._produce(items, work_queue)]
+        if bulk_history:
+            producers.append(self._produce_bulk_history(bulk_history, work_queue, write_queue))
+        await asyncio.gather(*producers)
+        for _ in range(self.fetch_workers):
+            await work_queue.put(None)
+        await asyncio.gather(*fetchers)
+
+        # Fetch side is drained, let the writers finish what is queued
+        for _ in range(self.write_workers):
+            await write_queue.put(None)
+        await asyncio.gather(*writers)
+        await sampler.stop()
+
+        if self.completed % self.progress_every:
+            self.log_progress()
+        return {
+            "total": self.total,
+            "fetched": self.fetched,
+            "written": self.written,
+            "unchanged": self.unchanged,
+            "quarantined": self.quarantined,
+            "empty": self.empty,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+            "seconds": round(time.perf_counter() - self._started, 3),
+        }
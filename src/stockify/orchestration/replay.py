@@ -0,0 +1,165 @@
+# src/stockify/orchestration/replay.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import Iterable, Optional
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.ingest.dead_letter import get_dead_letter_queue
+from stockify.ingest.manifest import RunManifest, get_run_manifest
+from stockify.config import add_settings_argument, get_raw_data_path, get_settings
+
+""" Deferred retry pass over the dead-letter queue, and a CLI to inspect / replay / purge it """
+
+# CONFIGURATION
+_dead_letter_config = get_settings().dead_letter
+MAIN_PASS_RETRIES = _dead_letter_config.main_pass_retries
+RETRY_AFTER_RUN = _dead_letter_config.retry_after_run
+_RETRY_CONCURRENCY = _dead_letter_config.retry_concurrency
+_RETRY_ATTEMPTS = _dead_letter_config.retry_attempts
+
+
+async def retry_dead_letters(manifest: Optional[RunManifest] = None, symbols: Optional[Iterable[str]] = None,
+                             func: Optional[str] = None, batch_date: Optional[str] = None,
+                             include_exhausted: bool = False, concurrency: int = _RETRY_CONCURRENCY,
+                             retries: int = _RETRY_ATTEMPTS, run_date: Optional[date] = None) -> dict:
+    """
+    Run the queued items again, with back-off between attempts but only
+    `concurrency` fetch workers so the retries never crowd out a main pass.
+    Returns the summed pipeline summaries.
+
+    A fetch returns what the source has now, so an item queued on a batch date
+    before `run_date` (default: today) is replayed as part of `run_date` and
+    lands in that day's partition; `history` asks for the bars after the
+    symbol's watermark as usual. Such items are dropped instead when a later
+    fetch already covered them: `run_date` has them completed in the manifest,
+    or, for `history`, the watermark has reached their batch date.
+    """
+    # the ingestion stack (pandas, sources, ...) only when there is something to retry, `list` / `purge` start without it
+    from stockify.orchestration.pipeline import IngestionPipeline, WorkItem
+    from stockify.ingest.watermark import get_watermark_store
+    dead_letters = get_dead_letter_queue()
+    statuses = ("pending", "exhausted") if include_exhausted else ("pending",)
+    queued = dead_letters.items(statuses, func=func, batch_date=batch_date, symbols=symbols)
+    if not queued:
+        return {}
+
+    run_date = run_date or date.today()
+    completed: dict[str, set[str]] = {}
+    by_date: dict[str, dict[tuple[str, str], WorkItem]] = {}
+    stale = 0
+    for row in queued:
+        symbol, row_func, queued_date = row["symbol"], row["func"], row["batch_date"]
+        if queued_date < run_date.isoformat():
+            if row_func not in completed:
+                completed[row_func] = manifest.completed(row_func, str(run_date)) if manifest is not None else set()
+            watermark = get_watermark_store().get(symbol) if row_func == "history" else None
+            if symbol in completed[row_func] or (watermark is not None and watermark.isoformat() >= queued_date):
+                dead_letters.resolve(symbol, row_func, queued_date)
+                stale += 1
+                continue
+            dead_letters.move(symbol, row_func, queued_date, str(run_date))
+            queued_date = str(run_date)
+        # items from several earlier dates collapse into one fetch
+        by_date.setdefault(queued_date, {})[(symbol, row_func)] = WorkItem(symbol=symbol, func=row_func)
+    if stale:
+        logger_file.info("Dropped %d dead-lettered item(s) a later fetch already covered", stale)
+    if not by_date:
+        return {}
+    log_terminal.info("Retrying %d dead-lettered item(s) over %d batch date(s) with %d worker(s)",
+                      sum(map(len, by_date.values())), len(by_date), concurrency)
+
+    total: dict[str, float] = {}
+    for queued_date, items in by_date.items():
+        pipeline = IngestionPipeline(job_run_date=date.fromisoformat(queued_date),
+                                     fetch_workers=concurrency,
+                                     write_workers=1,
+                                     queue_size=max(concurrency * 2, 10),
+                                     manifest=manifest,
+                                     retries=retries,
+                                     dead_letters=dead_letters,
+                                     replay=True
+                                     )
+        summary = await pipeline.run(items.values())
+        for key, value in summary.items():
+            total[key] = total.get(key, 0) + value
+    total["seconds"] = round(total["seconds"], 3)
+    return total
+
+
+async def _replay(args: argparse.Namespace) -> dict:
+    from stockify.ingest.fetcher import get_executor
+    from stockify.ingest.content_index import get_content_index
+    from stockify.ingest.parquet_writer import WRITER_FORMAT, flush_parquet_writer, get_parquet_writer
+    from stockify.ingest.watermark import save_watermark_store
+    from stockify.ingest.symbol_cache import save_symbol_cache
+    manifest = get_run_manifest()
+    content_index = get_content_index()
+    if WRITER_FORMAT == "parquet":
+        def on_flush(func: str, batch_date: str, flushed_symbols: list[str]) -> None:
+            manifest.mark_flushed(func, batch_date, flushed_symbols)
+            content_index.confirm(func, batch_date, flushed_symbols)
+        get_parquet_writer(get_raw_data_path()).on_flush = on_flush
+    summary = await retry_dead_letters(manifest, func=args.func, batch_date=args.date,
+                                       include_exhausted=args.include_exhausted,
+                                       concurrency=args.concurrency)
+    await asyncio.get_running_loop().run_in_executor(get_executor(), flush_parquet_writer)
+    save_watermark_store()
+    save_symbol_cache()
+    return summary
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Dead-letter queue of failed fetches")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="show queued items")
+    list_parser.add_argument("--status", nargs="+", default=["pending", "exhausted"])
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    replay_parser = commands.add_parser("replay", help="retry queued items now")
+    replay_parser.add_argument("--include-exhausted", action="store_true",
+                               help="also retry items that used up `max_attempts`")
+    replay_parser.add_argument("--concurrency", type=int, default=_RETRY_CONCURRENCY)
+
+    purge_parser = commands.add_parser("purge", help="drop queued items")
+    purge_parser.add_argument("--status", choices=["pending", "exhausted"], default=None)
+    purge_parser.add_argument("--before", default=None, help="only batch dates before YYYY-MM-DD")
+
+    for sub in (list_parser, replay_parser, purge_parser):
+        sub.add_argument("--func", default=None)
+    for sub in (list_parser, replay_parser):
+        sub.add_argument("--date", default=None, help="only this batch date (YYYY-MM-DD)")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    dead_letters = get_dead_letter_queue()
+
+    if args.command == "list":
+        print(f"Queue: {dead_letters.summary()}")
+        for row in dead_letters.items(args.status, func=args.func, batch_date=args.date, limit=args.limit):
+            print(f"{row['batch_date']}  {row['func']:<16} {row['symbol']:<20} {row['status']:<9} "
+                  f"attempts={row['attempts']}  last={row['last_failed']}  {row['reason']}")
+
+    elif args.command == "replay":
+        start_time = time.perf_counter()
+        try:
+            summary = asyncio.run(_replay(args))
+        except Exception:
+            logger_file.error("Dead-letter replay failed", exc_info=True)
+            raise
+        log_terminal.info("Replay finished in %.2f seconds: %s", time.perf_counter() - start_time, summary)
+        log_terminal.info("Queue: %s", dead_letters.summary())
+
+    elif args.command == "purge":
+        purged = dead_letters.purge(status=args.status, func=args.func, before=args.before)
+        log_terminal.info("Purged %d item(s), queue: %s", purged, dead_letters.summary())
@@ -0,0 +1,240 @@
+# src/stockify/orchestration/scheduler.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import csv
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+from stockify.utils.logger import logger as logger_file
+from stockify.ingest.manifest import RunManifest, get_run_manifest
+from stockify.ingest.symbol_signals import SymbolSignals, get_symbol_signals
+from stockify.orchestration.shard import DEFAULT_METHODS
+from stockify.utils.tickers import load_ticker_list
+from stockify.config import PROJECT_ROOT, SchedulingIntervals, add_settings_argument, get_settings
+
+""" Decides which (symbol, method) pairs a run fetches, and in which order """
+
+# CONFIGURATION
+_scheduling_config = get_settings().scheduling
+SCHEDULING_ENABLED = _scheduling_config.enabled
+
+# Manifest statuses of a fetch that went through; the second set found nothing new to write
+_FETCHED_STATUSES = ("done", "buffered", "empty", "unchanged", "skipped")
+_NOTHING_NEW_STATUSES = ("empty", "unchanged", "skipped")
+_NEW_ITEM_RATIO = 2.0               # age / interval an item without a recent fetch is ranked at
+
+
+class ScheduledItem(NamedTuple):
+    symbol: str
+    func: str
+    tier: int
+    interval_days: float
+    age_days: Optional[int]         # days since the last fetch, None if not fetched lately
+    score: float
+    reason: str                     # new | stale | event
+
+
+class SchedulePlan(NamedTuple):
+    items: list[ScheduledItem]      # due and within the budget, most important first
+    deferred: list[ScheduledItem]   # due but over the budget, more overdue (so earlier) on the next run
+    summary: dict
+
+
+def _read_tiers_file(path: Path) -> dict[str, int]:
+    """`symbol,tier` rows (header optional), symbols with or without exchange suffix."""
+    tiers = {}
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[1].strip().isdigit():
+                tiers[row[0].strip().split(".")[0]] = int(row[1])
+    return tiers
+
+
+class Scheduler:
+    """
+    Staleness- and priority-aware selection of the work of a run.
+
+    Every (symbol, method) has a refresh interval in days:
+
+        intervals[method] x tier_interval_factors[tier] x 2^k, capped at max_interval_days
+
+    - tier: liquidity rank by median turnover (`SymbolSignals`), top
+      `tier_sizes[0]` symbols first; a tiers file (e.g. index members) can
+      only move a symbol up. Until any turnover is known every symbol is tier 0.
+    - k: for `adaptive_methods`, how far the run of fetches that found nothing
+      new (manifest `empty` / `unchanged` / `skipped`) goes past `backoff_after`.
+      A fetch that writes something resets it.
+    - within `event_window_days` of the next earnings date, `event_methods`
+      are due every day.
+
+    An item is due once its last fetch is at least one interval old. Due
+    items are ranked by how overdue they are, weighted by tier, with the
+    earnings-window ones ahead of all others. The run takes the first
+    `max_requests`; the rest wait for the next run, a day more overdue.
+    """
+    def __init__(self, manifest: RunManifest, signals: SymbolSignals,
+                 intervals: SchedulingIntervals = _scheduling_config.intervals,
+                 max_interval_days: int = _scheduling_config.max_interval_days,
+                 adaptive_methods: Iterable[str] = _scheduling_config.adaptive_methods,
+                 backoff_after: int = _scheduling_config.backoff_after,
+                 tier_sizes: Iterable[int] = _scheduling_config.tier_sizes,
+                 tier_interval_factors: Iterable[float] = _scheduling_config.tier_interval_factors,
+                 tiers_file: Optional[Path] = None,
+                 event_window_days: int = _scheduling_config.event_window_days,
+                 event_methods: Iterable[str] = _scheduling_config.event_methods,
+                 max_requests: int = _scheduling_config.max_requests):
+        self.manifest = manifest
+        self.signals = signals
+        self.intervals = intervals
+        self.max_interval_days = max_interval_days
+        self.adaptive_methods = frozenset(adaptive_methods)
+        self.backoff_after = backoff_after
+        self.tier_sizes = tuple(tier_sizes)
+        self.tier_interval_factors = tuple(tier_interval_factors)
+        if len(self.tier_interval_factors) != len(self.tier_sizes) + 1:
+            raise ValueError(f"scheduling.tier_interval_factors needs {len(self.tier_sizes) + 1} entries "
+                             f"(one per tier), got {len(self.tier_interval_factors)}")
+        self.tier_overrides = _read_tiers_file(tiers_file) if tiers_file is not None else {}
+        self.event_window_days = event_window_days
+        self.event_methods = frozenset(event_methods)
+        self.max_requests = max_requests
+
+    def tiers(self, symbols: list[str]) -> dict[str, int]:
+        turnover = self.signals.turnover()
+        last_tier = len(self.tier_sizes) if turnover else 0
+        # ranked over every symbol seen so far, so a shard gets the same tiers as a single run
+        ranked = sorted(turnover, key=turnover.__getitem__, reverse=True)
+        bounds = list(accumulate(self.tier_sizes))
+        rank = {symbol: bisect_right(bounds, position) for position, symbol in enumerate(ranked)}
+        tiers = {symbol: rank.get(symbol, last_tier) for symbol in symbols}
+        for symbol in tiers:
+            override = self.tier_overrides.get(symbol.split(".")[0])
+            if override is not None:
+                tiers[symbol] = min(tiers[symbol], override, len(self.tier_sizes))
+        return tiers
+
+    def interval(self, func: str, tier: int, nothing_new_streak: int) -> float:
+        interval = getattr(self.intervals, func, 1) * self.tier_interval_factors[tier]
+        if func in self.adaptive_methods and nothing_new_streak >= self.backoff_after:
+            interval *= 2 ** (nothing_new_streak - self.backoff_after + 1)
+        return min(interval, self.max_interval_days)
+
+    def _assess(self, symbol: str, func: str, tier: int, statuses: list[tuple[str, str]],
+                next_earnings: Optional[date], batch_date: date) -> Optional[ScheduledItem]:
+        """The item if it is due on `batch_date`, else None."""
+        fetched = [(day, status) for day, status in statuses if status in _FETCHED_STATUSES]
+        streak = 0
+        for _, status in fetched:
+            if status not in _NOTHING_NEW_STATUSES:
+                break
+            streak += 1
+        weight = 1 / self.tier_interval_factors[tier]
+
+        if func in self.event_methods and next_earnings is not None and \
+                abs((next_earnings - batch_date).days) <= self.event_window_days:
+            interval, reason = 1, "event"
+        else:
+            interval, reason = self.interval(func, tier, streak), "stale"
+
+        if not fetched:
+            # not fetched lately: ranks like an item one full interval late, so a newly added
+            # method or symbol cannot take the whole budget from everything else
+            return ScheduledItem(symbol, func, tier, interval, None, _NEW_ITEM_RATIO * weight,
+                                 "event" if reason == "event" else "new")
+        age = (batch_date - date.fromisoformat(fetched[0][0])).days
+        if age < interval:
+            return None
+        return ScheduledItem(symbol, func, tier, interval, age, age / interval * weight, reason)
+
+    def plan(self, pending: dict[str, list[str]], batch_date: date, budget: Optional[int] = None) -> SchedulePlan:
+        """
+        `pending`: {method: symbols not yet done for `batch_date`}. `budget`
+        overrides `max_requests` (0: no limit).
+        """
+        symbols = list(dict.fromkeys(symbol for method_symbols in pending.values() for symbol in method_symbols))
+        tiers = self.tiers(symbols)
+        earnings = self.signals.next_earnings()
+        since = (batch_date - timedelta(days=2 * self.max_interval_days)).isoformat()
+
+        due, by_method = [], {}
+        for func, func_symbols in pending.items():
+            statuses = self.manifest.recent_statuses(func, since, batch_date.isoformat())
+            counts = by_method[func] = {"candidates": len(func_symbols), "not_due": 0,
+                                        "new": 0, "stale": 0, "event": 0, "scheduled": 0, "deferred": 0}
+            for symbol in func_symbols:
+                item = self._assess(symbol, func, tiers[symbol], statuses.get(symbol, []),
+                                    earnings.get(symbol), batch_date)
+                if item is None:
+                    counts["not_due"] += 1
+                    continue
+                counts[item.reason] += 1
+                due.append(item)
+
+        # earnings-window items first, however overdue the rest; stable, so ties keep ticker-list order
+        due.sort(key=lambda item: (item.reason == "event", item.score), reverse=True)
+        budget = self.max_requests if budget is None else budget
+        items, deferred = (due[:budget], due[budget:]) if budget else (due, [])
+        for item in items:
+            by_method[item.func]["scheduled"] += 1
+        for item in deferred:
+            by_method[item.func]["deferred"] += 1
+
+        tier_counts: dict[int, int] = {}
+        for tier in tiers.values():
+            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+        summary = {"budget": budget or None, "candidates": sum(len(s) for s in pending.values()),
+                   "due": len(due), "scheduled": len(items), "deferred": len(deferred),
+                   "tiers": dict(sorted(tier_counts.items())), "by_method": by_method}
+        logger_file.info("Schedule for %s: %s", batch_date, summary)
+        return SchedulePlan(items, deferred, summary)
+
+
+# Process-wide scheduler
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    global _scheduler
+    if _scheduler is None:
+        tiers_file = _scheduling_config.tiers_file
+        _scheduler = Scheduler(get_run_manifest(), get_symbol_signals(),
+                               tiers_file=PROJECT_ROOT / tiers_file if tiers_file else None)
+    return _scheduler
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Show what a daily run would fetch, most important first")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="batch date (default: today)")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N tickers of the list")
+    parser.add_argument("--budget", type=int, default=None, help="override scheduling.max_requests")
+    parser.add_argument("--show", type=int, default=20, help="number of scheduled items to list")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    batch_date = args.date or date.today()
+    symbols = load_ticker_list()[:args.limit] if args.limit else load_ticker_list()
+    manifest = get_run_manifest()
+    pending = {}
+    for method in args.methods:
+        completed = manifest.completed(method, str(batch_date))
+        pending[method] = [symbol for symbol in symbols if symbol not in completed]
+    plan = get_scheduler().plan(pending, batch_date, budget=args.budget)
+
+    print(f"Schedule for {batch_date}: {plan.summary['scheduled']} of {plan.summary['candidates']} items "
+          f"({plan.summary['due']} due, {plan.summary['deferred']} over budget), tiers {plan.summary['tiers']}")
+    for method, counts in plan.summary["by_method"].items():
+        print(f"  {method:<16} {counts}")
+    for item in plan.items[:args.show]:
+        age = "never" if item.age_days is None else f"{item.age_days}d"
+        print(f"{item.score:8.2f}  {item.func:<16} {item.symbol:<20} tier {item.tier}  "
+              f"every {item.interval_days:g}d  last {age:<6} {item.reason}")
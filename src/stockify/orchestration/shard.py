@@ -0,0 +1,182 @@
+# src/stockify/orchestration/shard.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import json
+import os
+import subprocess
+import time
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.utils.metrics import RunMetrics
+from stockify.ingest.manifest import get_run_manifest
+from stockify.ingest.validation import quality_summary
+from stockify.query.catalog import refresh_catalog
+from stockify.config import add_settings_argument, get_cli_overrides, get_settings, get_state_path
+
+""" Split the daily job across N worker processes (or hosts) by symbol """
+
+DEFAULT_METHODS = ["get_news", "get_actions", "earnings_dates", "calendar"]
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """`"i/N"` -> (i, N), shards are numbered 0 .. N-1."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index out of range: {spec!r}")
+    return index, count
+
+
+def shard_of(symbol: str, count: int) -> int:
+    """
+    Stable shard of a symbol: crc32 of the base symbol, so `RELIANCE`,
+    `RELIANCE.NS` and `RELIANCE.BO` always land together and the assignment
+    does not depend on the process (unlike `hash()`) or the ticker list order.
+    """
+    return zlib.crc32(symbol.split(".")[0].upper().encode()) % count
+
+
+def select_shard(symbols: Iterable[str], index: int, count: int) -> list[str]:
+    return [symbol for symbol in symbols if shard_of(symbol, count) == index]
+
+
+def shard_report_path(batch_date: date, index: int, count: int) -> Path:
+    return get_state_path() / "runs" / "shards" / str(batch_date) / f"shard-{index}-of-{count}.json"
+
+
+def merge_shard_reports(batch_date: date, report_files: list[Path]) -> Optional[Path]:
+    """
+    Combine the per-shard run reports into one: metrics merged from the raw
+    shard states (percentiles are recomputed, not averaged), pipeline counts
+    summed, manifest summary read from the shared manifest.
+    Writes the usual `<state>/runs/<date>-<time>.json` and `ingest.prom`.
+    """
+    combined = RunMetrics()
+    pipeline: dict[str, float] = {}
+    shards = {}
+    methods: list[str] = []
+    symbols = 0
+    for report_file in report_files:
+        if not report_file.exists():
+            logger_file.warning("Shard report %s missing, left out of the merged report", report_file)
+            continue
+        report = json.loads(report_file.read_text())
+        combined.merge(report.get("metrics_state", {}))
+        for key, value in report.get("pipeline", {}).items():
+            if key == "seconds":                        # shards run side by side: wall time is the slowest one
+                pipeline[key] = max(pipeline.get(key, 0), value)
+            elif isinstance(value, (int, float)):
+                pipeline[key] = pipeline.get(key, 0) + value
+        methods = report.get("methods", methods)
+        symbols += report.get("symbols", 0)
+        shards[report.get("shard", report_file.stem)] = {
+            "symbols": report.get("symbols"),
+            "pipeline": report.get("pipeline"),
+            "rate_controller": report.get("rate_controller"),
+            "schedule": report.get("schedule"),
+        }
+    if not shards:
+        return None
+
+    combined.write_prometheus(get_state_path() / "metrics" / "ingest.prom")
+    return combined.write_summary(
+        get_state_path() / "runs" / f"{batch_date}-{datetime.now():%H%M%S}.json",
+        extra={"batch_date": batch_date, "methods": methods, "symbols": symbols,
+               "pipeline": pipeline, "manifest": get_run_manifest().summary(str(batch_date)),
+               "quality": quality_summary(combined.summary()["counters"]),
+               "shards": shards}
+    )
+
+
+def launch_shards(workers: int, methods: list[str], job_run_date: date,
+                  limit: Optional[int] = None) -> int:
+    """
+    Run `daily_ingest --shard i/N` in `workers` local processes and wait for all of them.
+    The launcher's own settings overrides are passed on. Returns the number of shards that failed.
+    """
+    processes = []
+    for index in range(workers):
+        command = [sys.executable, "-m", "stockify.orchestration.daily_ingest",
+                   "--shard", f"{index}/{workers}", "--split-rate-limit",
+                   "--date", job_run_date.isoformat(), "--methods", *methods]
+        if limit is not None:
+            command += ["--limit", str(limit)]
+        for assignment in get_cli_overrides():
+            command += ["--set", assignment]
+        env = {**os.environ, "STOCKIFY_LOG_TAG": f"shard-{index}-of-{workers}"}
+        processes.append(subprocess.Popen(command, cwd=Path.cwd(), env=env))
+        log_terminal.info("Started shard %d/%d (pid %d)", index, workers, processes[-1].pid)
+
+    failed = 0
+    for index, process in enumerate(processes):
+        returncode = process.wait()
+        if returncode != 0:
+            failed += 1
+            logger_file.error("Shard %d/%d exited with code %d", index, workers, returncode)
+            log_terminal.error("Shard %d/%d exited with code %d", index, workers, returncode)
+    return failed
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Sharded daily ingestion: local launcher and report merge")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="number of shard processes to run on this host")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="batch date (default: today)")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N tickers of the list")
+    parser.add_argument("--merge-only", action="store_true",
+                        help="do not launch anything, merge the shard reports already on disk for --date")
+    parser.add_argument("--merge-manifest", nargs="+", type=Path, default=[], metavar="DB",
+                        help="manifests of shards that ran on other hosts, folded into the local one first")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    job_run_date = args.date or date.today()
+    start_time = time.perf_counter()
+
+    for other_db in args.merge_manifest:
+        merged = get_run_manifest().merge(other_db)
+        log_terminal.info("Merged %d manifest items from %s", merged, other_db)
+
+    failed = 0
+    if not args.merge_only:
+        log_terminal.info("Sharded ingestion of %s for %s on %d workers", job_run_date, args.methods, args.workers)
+        failed = launch_shards(args.workers, args.methods, job_run_date, args.limit)
+
+    report_dir = get_state_path() / "runs" / "shards" / str(job_run_date)
+    report_files = sorted(report_dir.glob("shard-*.json")) if args.merge_only else \
+        [shard_report_path(job_run_date, index, args.workers) for index in range(args.workers)]
+    run_file = merge_shard_reports(job_run_date, report_files)
+    if run_file is not None:
+        log_terminal.info("Merged run report written to %s", run_file)
+
+    # Shards leave the run open; it is finished once every one of them came through
+    if not failed:
+        get_run_manifest().finish_run(str(job_run_date))
+
+    # Feature store and catalog each have a single writer, so shards leave them to the launcher
+    if "history" in args.methods and get_settings().features.refresh_after_run:
+        from stockify.analytics.features import build_features     # not at the top: it imports `shard_of` from here
+        log_terminal.info("Feature store updated: %s", build_features())
+
+    if get_settings().catalog.refresh_after_run:
+        cataloged = refresh_catalog()
+        if cataloged:
+            log_terminal.info("Catalog refreshed: %s", cataloged)
+
+    log_terminal.info("Sharded ingestion finished in %.2f seconds, %d shard(s) failed",
+                      time.perf_counter() - start_time, failed)
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,382 @@
+# src/stockify/query/catalog.py
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
+import json
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+import duckdb
+from stockify.utils.logger import logger as logger_file
+from stockify.utils.logger import logger_terminal as log_terminal
+from stockify.config import add_settings_argument, get_raw_data_path, get_settings, get_state_path
+
+# pyarrow / pandas only come in when files are loaded, queries start without them
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# CONFIGURATION
+_catalog_config = get_settings().catalog
+_TIMEZONE = _catalog_config.timezone
+_LOAD_BATCH_FILES = _catalog_config.load_batch_files
+
+# Column `start` / `end` filter on when a dataset has its own timeline; everything else uses `as_of_date`
+_TIME_COLUMNS = {
+    "history": "Date",
+    "get_actions": "get_actions_features",
+    "earnings_dates": "earnings_dates_features",
+}
+# Derived datasets written as Parquet next to the raw layer, exposed as views over the files
+_FEATURE_VIEWS = {
+    "history_features": "features/history",         # stockify.analytics.features
+}
+_TIME_COLUMNS["history_features"] = "date"
+# Datasets re-delivered in full on every run: the view keeps the latest as_of_date per key
+_DEDUPE_KEYS = {
+    "history": ("symbol", "Date"),
+}
+
+_REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS _files (
+    path          VARCHAR PRIMARY KEY,
+    func          VARCHAR NOT NULL,
+    mtime         DOUBLE NOT NULL,
+    size          BIGINT NOT NULL,
+    registered_at TIMESTAMP NOT NULL
+);
+"""
+
+
+class LakeCatalog:
+    """
+    Persistent DuckDB catalog over the raw data lake.
+
+    Reads both raw layer layouts written by the ingestion job:
+        root_dir/yf/<func>/<batch_date>/<symbol>.csv|json         (csv_json writer)
+        root_dir/yf/func=<func>/as_of_date=<date>/part-*.parquet  (parquet writer)
+    and loads them into one native table per dataset (`raw_<func>`) with
+    `symbol`, `as_of_date` and `_source_file` columns, plus a view `<func>` to query.
+    Derived datasets (`_FEATURE_VIEWS`) are views straight over their Parquet
+    files, so they are current without being loaded.
+
+    `refresh()` is incremental: a `_files` registry remembers (path, mtime, size)
+    of every loaded file, so only new or changed files are read, and rows of
+    deleted files are dropped. Queries run against DuckDB's columnar storage,
+    so projections and filters never touch the raw files again.
+    """
+    def __init__(self, root_dir: Path, db_path: Path, timezone: str = _TIMEZONE):
+        self.root_dir = root_dir
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = duckdb.connect(str(db_path))
+        self._conn.execute(f"SET GLOBAL TimeZone = '{timezone}'")       # GLOBAL: cursors get their own session
+        self._conn.execute(_REGISTRY_SCHEMA)
+
+    # Discovery
+    def _scan(self) -> dict[str, tuple[str, float, int]]:
+        """Every raw file under root_dir/yf: path -> (func, mtime, size)."""
+        found = {}
+        lake = self.root_dir/"yf"
+        if not lake.is_dir():
+            return found
+        for func_dir in os.scandir(lake):
+            if not func_dir.is_dir():
+                continue
+            func = func_dir.name.removeprefix("func=")
+            for date_dir in os.scandir(func_dir.path):
+                if not date_dir.is_dir():
+                    continue
+                for entry in os.scandir(date_dir.path):
+                    if entry.is_file() and entry.name.endswith((".csv", ".json", ".parquet")):
+                        stat = entry.stat()
+                        found[Path(entry.path).as_posix()] = (func, stat.st_mtime, stat.st_size)
+        return found
+
+    def _registered(self) -> dict[str, tuple[str, float, int]]:
+        rows = self._conn.execute("SELECT path, func, mtime, size FROM _files").fetchall()
+        return {path: (func, mtime, size) for path, func, mtime, size in rows}
+
+    # Loading
+    def refresh(self, funcs: Optional[Iterable[str]] = None) -> dict[str, int]:
+        """
+        Register new, changed and deleted raw files. Returns the number of
+        files (re)loaded per dataset.
+        """
+        wanted = set(funcs) if funcs else None
+        with self._lock:
+            self._create_feature_views()
+            found = self._scan()
+            registered = self._registered()
+
+            changed = {path: meta for path, meta in found.items()
+                       if registered.get(path) != meta and (wanted is None or meta[0] in wanted)}
+            gone = {path: meta for path, meta in registered.items()
+                    if path not in found and (wanted is None or meta[0] in wanted)}
+            if not changed and not gone:
+                return {}
+
+            by_func: dict[str, list[str]] = {}
+            for path, (func, _, _) in changed.items():
+                by_func.setdefault(func, []).append(path)
+
+            # a changed file is reloaded from scratch, so its old rows go first
+            stale: dict[str, list[str]] = {}
+            for path in [*gone, *(p for p in changed if p in registered)]:
+                stale.setdefault(registered[path][0], []).append(path)
+
+            loaded = {}
+            with self._conn.cursor() as cur:
+                cur.execute("BEGIN TRANSACTION")
+                try:
+                    for func, paths in stale.items():
+                        self._drop_files(cur, func, paths)
+                    for func, paths in sorted(by_func.items()):
+                        loaded[func] = self._load_files(cur, func, sorted(paths))
+                    now = datetime.now()
+                    if changed:
+                        cur.executemany("INSERT OR REPLACE INTO _files VALUES (?, ?, ?, ?, ?)",
+                                        [(path, *changed[path], now) for path in changed])
+                    cur.commit()
+                except Exception:
+                    cur.rollback()
+                    raise
+                self._create_views(cur)
+
+        if loaded or gone:
+            logger_file.info("Catalog refreshed: %s file(s) loaded, %d removed", loaded, len(gone))
+        return loaded
+
+    @staticmethod
+    def _table(func: str) -> str:
+        return f'"raw_{func}"'
+
+    def _table_exists(self, cur, func: str) -> bool:
+        return cur.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = ?",
+                           (f"raw_{func}",)).fetchone()[0] > 0
+
+    def _drop_files(self, cur, func: str, paths: list[str]) -> None:
+        if not self._table_exists(cur, func):
+            return
+        import pyarrow as pa
+        cur.register("_stale_files", pa.table({"path": pa.array(paths, pa.string())}))
+        cur.execute(f"DELETE FROM {self._table(func)} WHERE _source_file IN (SELECT path FROM _stale_files)")
+        cur.execute("DELETE FROM _files WHERE path IN (SELECT path FROM _stale_files)")
+        cur.unregister("_stale_files")
+
+    def _load_files(self, cur, func: str, paths: list[str]) -> int:
+        csv_files = [p for p in paths if p.endswith(".csv")]
+        json_files = [p for p in paths if p.endswith(".json")]
+        parquet_files = [p for p in paths if p.endswith(".parquet")]
+
+        for batch in self._batches(parquet_files):
+            rel = cur.sql(
+                "SELECT * EXCLUDE (filename, func), filename AS _source_file "
+                "FROM read_parquet($files, hive_partitioning = true, union_by_name = true, filename = true)",
+                params={"files": batch},
+            )
+            self._append(cur, func, rel)
+
+        # one read_csv call per distinct header: files with the same columns share the sniffed schema
+        by_header: dict[str, list[str]] = {}
+        for path in csv_files:
+            with open(path, encoding="utf-8") as f:
+                by_header.setdefault(f.readline(), []).append(path)
+        for group in by_header.values():
+            for batch in self._batches(group):
+                try:
+                    self._append(cur, func, self._read_csv(cur, batch))
+                except (duckdb.ConversionException, duckdb.InvalidInputException):
+                    # a value the sniffed types cannot hold; read the files one by one instead
+                    for path in batch:
+                        self._append(cur, func, self._read_csv(cur, [path]))
+
+        for batch in self._batches(json_files):
+            table = self._read_json(func, batch)
+            if table is not None:
+                cur.register("_json_batch", table)
+                self._append(cur, func, cur.sql("SELECT * FROM _json_batch"))
+                cur.unregister("_json_batch")
+        return len(paths)
+
+    @staticmethod
+    def _batches(paths: list[str]) -> Iterable[list[str]]:
+        for i in range(0, len(paths), _LOAD_BATCH_FILES):
+            yield paths[i:i + _LOAD_BATCH_FILES]
+
+    @staticmethod
+    def _read_csv(cur, files: list[str]):
+        # symbol and as_of_date come from the legacy layout yf/<func>/<batch_date>/<symbol>.csv
+        return cur.sql(
+            "SELECT regexp_extract(filename, '([^/]+)\\.csv$', 1) AS symbol, * EXCLUDE (filename), "
+            "CAST(regexp_extract(filename, '([^/]+)/[^/]+$', 1) AS DATE) AS as_of_date, "
+            "filename AS _source_file "
+            "FROM read_csv($files, filename = true)",
+            params={"files": files},
+        )
+
+    @staticmethod
+    def _read_json(func: str, files: list[str]) -> Optional["pa.Table"]:
+        """JSON payloads get the same `symbol` / `payload` layout the parquet writer uses."""
+        import pyarrow as pa
+        from stockify.ingest.parquet_writer import ParquetBatchWriter
+        tables = []
+        for path in files:
+            file = Path(path)
+            try:
+                with open(file, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                logger_file.error("Unreadable raw file %s, not cataloged", file, exc_info=True)
+                continue
+            table = ParquetBatchWriter.to_arrow(file.stem, func, data)
+            if table is None:
+                continue
+            table = table.append_column("as_of_date", pa.repeat(pa.scalar(date.fromisoformat(file.parent.name)),
+                                                                table.num_rows))
+            tables.append(table.append_column("_source_file", pa.repeat(pa.scalar(path), table.num_rows)))
+        return pa.concat_tables(tables) if tables else None
+
+    def _append(self, cur, func: str, rel) -> None:
+        """Insert a relation into raw_<func>, adding or widening columns the table does not have yet."""
+        table = self._table(func)
+        if not self._table_exists(cur, func):
+            cur.execute(f"CREATE TABLE {table} AS SELECT * FROM rel")
+            return
+
+        existing = {name: dtype for name, dtype, *_ in cur.execute(f"DESCRIBE {table}").fetchall()}
+        for name, dtype in zip(rel.columns, rel.dtypes):
+            dtype = str(dtype)
+            if name not in existing:
+                cur.execute(f'ALTER TABLE {table} ADD COLUMN "{name}" {dtype}')
+            elif existing[name] != dtype:
+                numeric = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "FLOAT", "DOUBLE"}
+                if existing[name] in numeric and dtype in numeric:
+                    widened = "DOUBLE"
+                elif existing[name] == "NULL" or dtype == "NULL":
+                    widened = dtype if existing[name] == "NULL" else existing[name]
+                else:
+                    widened = "VARCHAR"
+                if widened != existing[name]:
+                    cur.execute(f'ALTER TABLE {table} ALTER COLUMN "{name}" TYPE {widened}')
+        cur.execute(f"INSERT INTO {table} BY NAME SELECT * FROM rel")
+
+    def _create_views(self, cur) -> None:
+        for func in self._raw_datasets():
+            keys = _DEDUPE_KEYS.get(func)
+            dedupe = ""
+            if keys:
+                partition = ", ".join(f'"{k}"' for k in keys)
+                dedupe = f" QUALIFY row_number() OVER (PARTITION BY {partition} ORDER BY as_of_date DESC) = 1"
+            cur.execute(f'CREATE OR REPLACE VIEW "{func}" AS '
+                        f"SELECT * EXCLUDE (_source_file) FROM {self._table(func)}{dedupe}")
+
+    def _create_feature_views(self) -> None:
+        for view, rel_dir in _FEATURE_VIEWS.items():
+            files = (self.root_dir/rel_dir).as_posix() + "/**/*.parquet"
+            if next((self.root_dir/rel_dir).glob("**/*.parquet"), None) is None:
+                continue
+            self._conn.execute(f'CREATE OR REPLACE VIEW "{view}" AS SELECT * FROM '
+                               f"read_parquet('{files}', hive_partitioning = true, union_by_name = true)")
+
+    def _raw_datasets(self) -> list[str]:
+        rows = self._conn.execute("SELECT table_name FROM duckdb_tables() WHERE table_name LIKE 'raw\\_%' ESCAPE '\\' "
+                                  "ORDER BY table_name").fetchall()
+        return [row[0].removeprefix("raw_") for row in rows]
+
+    # Querying
+    def datasets(self) -> list[str]:
+        views = self._conn.execute("SELECT view_name FROM duckdb_views() WHERE view_name IN (SELECT unnest(?))",
+                                   [list(_FEATURE_VIEWS)]).fetchall()
+        return self._raw_datasets() + sorted(row[0] for row in views)
+
+    @staticmethod
+    def _output(result, output: str):
+        if output == "arrow":
+            return result.to_arrow_table()
+        if output == "polars":
+            return result.pl()
+        if output == "pandas":
+            return result.df()
+        raise ValueError(f"Unknown output `{output}`, expected arrow, polars or pandas")
+
+    def query(self, func: str, columns: Optional[list[str]] = None, symbols: Optional[list[str]] = None,
+              start: Optional[Union[date, str]] = None, end: Optional[Union[date, str]] = None,
+              time_column: Optional[str] = None, output: str = "arrow"):
+        """
+        Select from one dataset. Only the requested `columns` are read, and the
+        `symbols` / `start` / `end` filters (inclusive dates, on `time_column`,
+        see `_TIME_COLUMNS`) are pushed into the scan.
+        """
+        if func not in self.datasets():
+            raise KeyError(f"Dataset `{func}` is not cataloged, run refresh() first")
+
+        projection = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        time_column = time_column or _TIME_COLUMNS.get(func, "as_of_date")
+        where, params = [], {}
+        if symbols:
+            where.append("symbol IN (SELECT unnest($symbols))")
+            params["symbols"] = list(symbols)
+        if start is not None:
+            where.append(f'CAST("{time_column}" AS DATE) >= CAST($start AS DATE)')
+            params["start"] = str(start)
+        if end is not None:
+            where.append(f'CAST("{time_column}" AS DATE) <= CAST($end AS DATE)')
+            params["end"] = str(end)
+
+        sql = f'SELECT {projection} FROM "{func}"' + (f" WHERE {' AND '.join(where)}" if where else "")
+        with self._lock, self._conn.cursor() as cur:
+            # execute(), not sql(): a parameterised relation is materialised before conversion
+            return self._output(cur.execute(sql, params or None), output)
+
+    def sql(self, query: str, params: Optional[Union[list, dict]] = None, output: str = "arrow"):
+        """Run any SQL against the catalog views."""
+        with self._lock, self._conn.cursor() as cur:
+            return self._output(cur.execute(query, params), output)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide catalog
+_catalog: Optional[LakeCatalog] = None
+
+
+def get_catalog(root_dir: Optional[Path] = None) -> LakeCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = LakeCatalog(root_dir or get_raw_data_path(), get_state_path() / "catalog.duckdb")
+        logger_file.debug("Opened lake catalog %s", _catalog.db_path)
+    return _catalog
+
+
+def refresh_catalog(root_dir: Optional[Path] = None) -> Optional[dict[str, int]]:
+    """Register the files of the last run; returns None if another process holds the catalog."""
+    try:
+        return get_catalog(root_dir).refresh()
+    except duckdb.IOException:
+        logger_file.warning("Catalog is locked by another process, skipping refresh", exc_info=True)
+        return None
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Query the raw data lake through the DuckDB catalog")
+    parser.add_argument("--refresh", action="store_true", help="register new / changed raw files first")
+    parser.add_argument("--sql", help="SQL to run against the dataset views, e.g. \"SELECT count(*) FROM history\"")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    if args.refresh:
+        log_terminal.info("Loaded files per dataset: %s", catalog.refresh())
+    log_terminal.info("Datasets: %s", catalog.datasets())
+    if args.sql:
+        print(catalog.sql(args.sql, output="polars"))
@@ -0,0 +1,105 @@
+# src/stockify/utils/executor.py
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class TrackedExecutor(ThreadPoolExecutor):
+    """
+    Thread pool that knows how many of its threads are busy, how much work is
+    queued, and how many threads are held by *zombies*: calls whose caller
+    gave up on a deadline while the thread is still blocked in I/O.
+
+    The pool has `max_workers + zombie_headroom` threads, so up to
+    `zombie_headroom` abandoned calls can linger without taking threads from
+    live work. Once that headroom is used up, `admit()` holds new work back
+    until a zombie comes home, instead of letting it queue behind them.
+    """
+    def __init__(self, max_workers: int, zombie_headroom: int = 0, thread_name_prefix: str = ""):
+        super().__init__(max_workers=max_workers + zombie_headroom, thread_name_prefix=thread_name_prefix)
+        self.capacity = max_workers
+        self.zombie_headroom = zombie_headroom
+        self.queued = 0
+        self.busy = 0
+        self.zombies = 0
+        self.abandoned = 0                  # total calls given up on, cancelled or zombie
+        self._counts_lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._counts_lock:
+            self.queued += 1
+        future = super().submit(self._tracked, fn, *args, **kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _tracked(self, fn: Callable, *args, **kwargs) -> Any:
+        with self._counts_lock:
+            self.queued -= 1
+            self.busy += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._counts_lock:
+                self.busy -= 1
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():              # never ran, so `_tracked` did not take it off the queue count
+            with self._counts_lock:
+                self.queued -= 1
+        self._wake()
+
+    @property
+    def saturated(self) -> bool:
+        """Zombies fill the headroom. Without headroom there is no admission control."""
+        return self.zombie_headroom > 0 and self.zombies >= self.zombie_headroom
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            return {"busy": self.busy, "queued": self.queued, "zombies": self.zombies,
+                    "abandoned": self.abandoned, "threads": self._max_workers}
+
+    async def admit(self) -> bool:
+        """Wait while zombie calls use up the headroom. Returns True if the caller had to wait."""
+        if not self.saturated:
+            return False
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = loop.create_future()
+            # registered and re-checked under the lock `_zombie_done` counts under,
+            # so a zombie finishing in between cannot wake an empty waiter list
+            with self._counts_lock:
+                if not self.saturated:
+                    return True
+                self._waiters.append((loop, waiter))
+            await waiter
+
+    def _wake(self) -> None:
+        with self._counts_lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+    async def run(self, fn: Callable, timeout: float) -> Any:
+        """
+        Run `fn` in the pool with a deadline. On timeout a call that had not
+        started is cancelled and frees its slot; one that is running is counted
+        as a zombie until its thread returns.
+        """
+        future = self.submit(fn)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            with self._counts_lock:
+                self.abandoned += 1
+            if not future.cancel():
+                with self._counts_lock:
+                    self.zombies += 1
+                future.add_done_callback(self._zombie_done)
+            raise
+
+    def _zombie_done(self, future: Future) -> None:
+        with self._counts_lock:
+            self.zombies -= 1
+        self._wake()
@@ -0,0 +1,25 @@
+# src/stockify/utils/filelock.py
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:             # Windows: no advisory locks, single process use only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Exclusive advisory lock on `<path>.lock`, held for the duration of the block.
+    Lets several ingestion processes (shards) read-merge-write the same state file.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,42 +1,102 @@
+import atexit
+import json
 import logging
+import os
+import queue
 from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from stockify.config import get_logs_path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from stockify.config import get_logs_path, get_settings
+
+# CONFIGURATION
+_logging_config = get_settings().logging
+_LEVEL = getattr(logging, _logging_config.level.upper(), logging.INFO)
+_JSON_LINES = _logging_config.json_lines
+_MAX_BYTES = _logging_config.max_bytes
+_BACKUP_COUNT = _logging_config.backup_count
 
 # Logs directory
 LOG_DIR = get_logs_path()
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-# Timestamped log file
-LOG_FILE = datetime.now().strftime("%m_%d_%Y_%H_%M_%S.log")
+# Timestamped log file, tagged per worker process when several run side by side (shards)
+_LOG_TAG = os.environ.get("STOCKIFY_LOG_TAG")
+LOG_FILE = datetime.now().strftime("%m_%d_%Y_%H_%M_%S") + (f"_{_LOG_TAG}" if _LOG_TAG else "") + ".log"
 LOG_FILE_PATH = LOG_DIR / LOG_FILE
 
-# File logger
-logger = logging.getLogger("app_logger")
-logger.setLevel(logging.INFO)
 
-if not logger.handlers:
-    file_handler = RotatingFileHandler(
-        LOG_FILE_PATH,
-        maxBytes=5 * 1024 * 1024,  # 5 MB
-        backupCount=5
-    )
-    file_handler.setLevel(logging.INFO)
-
-    formatter = logging.Formatter(
+class DeferredQueueHandler(QueueHandler):
+    """
+    Puts the record on the queue untouched. The stock `QueueHandler` renders
+    the message (and any traceback) in the calling thread; here that is left
+    to the listener thread, so a log call on the event loop or in an executor
+    thread costs one queue put. Arguments are formatted later, so pass values,
+    not objects that are mutated right after the call.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, `extra={...}` fields included as keys."""
+    _STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "func": record.funcName,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in self._STANDARD)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+formatter = logging.Formatter(
     "%(asctime)s | %(levelname)s | "
     "%(filename)s:%(lineno)d | %(funcName)s | %(message)s"
 )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+# File logger
+logger = logging.getLogger("app_logger")
+logger.setLevel(_LEVEL)
 
 # Terminal logger
 logger_terminal = logging.getLogger("ETL-Logs")
 logger_terminal.setLevel(logging.INFO)
 
-if not logger_terminal.handlers:
+# Both loggers only enqueue; one listener thread does the formatting, file I/O and rotation
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener = None
+
+if not logger.handlers:
+    file_handler = RotatingFileHandler(LOG_FILE_PATH, maxBytes=_MAX_BYTES, backupCount=_BACKUP_COUNT)
+    file_handler.setFormatter(formatter)
+    file_handler.addFilter(logging.Filter(logger.name))
+    handlers: list[logging.Handler] = [file_handler]
+
+    if _JSON_LINES:
+        json_handler = RotatingFileHandler(Path(LOG_FILE_PATH).with_suffix(".jsonl"),
+                                           maxBytes=_MAX_BYTES, backupCount=_BACKUP_COUNT)
+        json_handler.setFormatter(JsonLinesFormatter())
+        json_handler.addFilter(logging.Filter(logger.name))
+        handlers.append(json_handler)
+
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(formatter)
-    logger_terminal.addHandler(console_handler)
+    console_handler.addFilter(logging.Filter(logger_terminal.name))
+    handlers.append(console_handler)
+
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)             # drains the queue before the interpreter exits
+
+    logger.addHandler(DeferredQueueHandler(_log_queue))
+    logger_terminal.addHandler(DeferredQueueHandler(_log_queue))
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Optional
+import psutil
+
+# Histogram bucket upper bounds in seconds (Prometheus `le` labels)
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class RunMetrics:
+    """
+    In-process collector for one ingestion run.
+
+    - stage timings in seconds, optionally labelled by method
+      (queue_wait, semaphore_wait, rate_wait, executor_wait, http_call,
+       validation, quality_check, serialization, disk_write, fetch, write)
+    - event counters, optionally labelled by method
+      (retries, timeouts, variant_fallbacks, rate_limit_hits, empty_results,
+       quarantined, dq_<rule>, ...)
+    - gauges for sampled resources, with their peak value
+
+    Timings are kept raw so exact percentiles can be reported; histograms are
+    derived at export time. Safe to use from the event loop and executor threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: dict[tuple[str, Optional[str]], list[float]] = {}
+        self._counters: dict[tuple[str, Optional[str]], int] = {}
+        self._gauges: dict[str, float] = {}
+        self._gauge_peaks: dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float, method: Optional[str] = None) -> None:
+        with self._lock:
+            self._timings.setdefault((stage, method), []).append(seconds)
+
+    def incr(self, name: str, method: Optional[str] = None, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[(name, method)] = self._counters.get((name, method), 0) + amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+            self._gauge_peaks[name] = max(value, self._gauge_peaks.get(name, value))
+
+    @staticmethod
+    def _quantile(ordered: list[float], q: float) -> float:
+        # nearest-rank percentile
+        index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+        return ordered[index]
+
+    def _values(self, stage: str, method: Optional[str] = None) -> list[float]:
+        """Timings for one stage, for one method or across all of them."""
+        with self._lock:
+            if method is not None:
+                return list(self._timings.get((stage, method), []))
+            return [v for (s, _), values in self._timings.items() if s == stage for v in values]
+
+    def percentiles(self, stage: str, method: Optional[str] = None) -> Optional[dict]:
+        values = sorted(self._values(stage, method))
+        if not values:
+            return None
+        return {
+            "count": len(values),
+            "total_s": round(sum(values), 3),
+            "mean_ms": round(1000 * sum(values) / len(values), 3),
+            "p50_ms": round(1000 * self._quantile(values, 0.50), 3),
+            "p95_ms": round(1000 * self._quantile(values, 0.95), 3),
+            "p99_ms": round(1000 * self._quantile(values, 0.99), 3),
+            "max_ms": round(1000 * values[-1], 3),
+        }
+
+    def counter(self, name: str, method: Optional[str] = None) -> int:
+        with self._lock:
+            if method is not None:
+                return self._counters.get((name, method), 0)
+            return sum(v for (n, _), v in self._counters.items() if n == name)
+
+    def summary(self) -> dict:
+        with self._lock:
+            timing_keys = list(self._timings)
+            counter_keys = list(self._counters)
+            gauges = dict(self._gauges)
+            peaks = dict(self._gauge_peaks)
+
+        stages = {}
+        for stage in dict.fromkeys(s for s, _ in timing_keys):
+            methods = sorted(m for s, m in timing_keys if s == stage and m is not None)
+            stages[stage] = {"all": self.percentiles(stage),
+                             "by_method": {m: self.percentiles(stage, m) for m in methods}}
+
+        counters = {}
+        for name in dict.fromkeys(n for n, _ in counter_keys):
+            methods = sorted(m for n, m in counter_keys if n == name and m is not None)
+            counters[name] = {"all": self.counter(name),
+                              "by_method": {m: self.counter(name, m) for m in methods}}
+
+        return {
+            "stages": stages,
+            "counters": counters,
+            "resources": {name: {"last": gauges[name], "peak": peaks[name]} for name in gauges},
+        }
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        body = ",".join(f'{k}="{v}"' for k, v in labels.items() if v is not None)
+        return f"{{{body}}}" if body else ""
+
+    def to_prometheus(self) -> str:
+        """Render everything in the Prometheus text exposition format."""
+        with self._lock:
+            timings = {key: sorted(values) for key, values in self._timings.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = ["# HELP stockify_stage_seconds Time spent per ingestion stage.",
+                 "# TYPE stockify_stage_seconds histogram"]
+        for (stage, method), values in sorted(timings.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            for bound in _BUCKETS:
+                count = bisect_left(values, bound + 1e-12)
+                lines.append(f"stockify_stage_seconds_bucket{self._labels(stage=stage, method=method, le=bound)} {count}")
+            lines.append(f"stockify_stage_seconds_bucket{self._labels(stage=stage, method=method, le='+Inf')} {len(values)}")
+            lines.append(f"stockify_stage_seconds_sum{self._labels(stage=stage, method=method)} {sum(values):.6f}")
+            lines.append(f"stockify_stage_seconds_count{self._labels(stage=stage, method=method)} {len(values)}")
+
+        lines += ["# HELP stockify_events_total Ingestion events (retries, timeouts, fallbacks, ...).",
+                  "# TYPE stockify_events_total counter"]
+        for (name, method), value in sorted(counters.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            lines.append(f"stockify_events_total{self._labels(event=name, method=method)} {value}")
+
+        lines += ["# HELP stockify_resource Sampled process resources.",
+                  "# TYPE stockify_resource gauge"]
+        for name, value in sorted(gauges.items()):
+            lines.append(f"stockify_resource{self._labels(name=name)} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _atomic_write(path: Path, text: str) -> None:
+        # textfile collectors may read at any time, never expose a half written file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def write_prometheus(self, path: Path) -> Path:
+        self._atomic_write(path, self.to_prometheus())
+        return path
+
+    def write_summary(self, path: Path, extra: Optional[dict[str, Any]] = None) -> Path:
+        """JSON run summary: the metrics plus anything the caller wants recorded with them."""
+        self._atomic_write(path, json.dumps({**(extra or {}), "metrics": self.summary()}, indent=2, default=str))
+        return path
+
+    def state(self) -> dict:
+        """Raw timings, counters and gauges, for merging runs of several processes."""
+        with self._lock:
+            return {
+                "timings": [[stage, method, values] for (stage, method), values in self._timings.items()],
+                "counters": [[name, method, value] for (name, method), value in self._counters.items()],
+                "gauges": {name: [self._gauges[name], self._gauge_peaks[name]] for name in self._gauges},
+            }
+
+    def merge(self, state: dict) -> None:
+        """
+        Add another process' `state()`. Timings and counters combine exactly;
+        gauges are summed, so resources read as the total over all processes.
+        """
+        with self._lock:
+            for stage, method, values in state.get("timings", []):
+                self._timings.setdefault((stage, method), []).extend(values)
+            for name, method, value in state.get("counters", []):
+                self._counters[(name, method)] = self._counters.get((name, method), 0) + value
+            for name, (last, peak) in state.get("gauges", {}).items():
+                self._gauges[name] = self._gauges.get(name, 0) + last
+                self._gauge_peaks[name] = self._gauge_peaks.get(name, 0) + peak
+
+    def write_state(self, path: Path) -> Path:
+        self._atomic_write(path, json.dumps(self.state()))
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._gauge_peaks.clear()
+
+
+class ResourceSampler:
+    """
+    Background task that samples process RSS, CPU, threads and executor backlog
+    into gauges every `interval` seconds. `cpu_percent(interval=None)` compares
+    against the previous call, so sampling never blocks the event loop.
+    """
+    def __init__(self, run_metrics: RunMetrics, interval: float = 5.0, executor=None):
+        self.metrics = run_metrics
+        self.interval = interval
+        self.executor = executor
+        self._process = psutil.Process(os.getpid())
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self) -> None:
+        self.metrics.set_gauge("rss_bytes", self._process.memory_info().rss)
+        self.metrics.set_gauge("cpu_percent", self._process.cpu_percent(interval=None))
+        self.metrics.set_gauge("threads", self._process.num_threads())
+        if hasattr(self.executor, "stats"):
+            stats = self.executor.stats()
+            self.metrics.set_gauge("executor_queue_depth", stats["queued"])
+            self.metrics.set_gauge("executor_busy", stats["busy"])
+            self.metrics.set_gauge("executor_zombies", stats["zombies"])
+        elif self.executor is not None:
+            # private, but the only way to see how much work is waiting for a thread
+            self.metrics.set_gauge("executor_queue_depth", self.executor._work_queue.qsize())
+
+    async def _run(self) -> None:
+        self._process.cpu_percent(interval=None)        # prime the CPU counter
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.sample()
+
+
+# Process-wide collector
+metrics = RunMetrics()
+
+
+def timed_call(fn, method: Optional[str], submitted: float):
+    """
+    Run `fn` inside an executor thread, recording how long it waited for a
+    thread (`executor_wait`) and how long the call itself took (`http_call`).
+    """
+    started = time.perf_counter()
+    metrics.observe("executor_wait", started - submitted, method)
+    try:
+        return fn()
+    finally:
+        metrics.observe("http_call", time.perf_counter() - started, method)
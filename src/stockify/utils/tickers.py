@@ -1,5 +1,13 @@
+import sys
+from stockify.config import cli_overrides, set_cli_overrides
+
+if __name__ == "__main__":
+    # `--set` values have to be in place before the imports below read their settings
+    set_cli_overrides(cli_overrides(sys.argv[1:]))
+
+import argparse
 import csv
-from stockify.config import get_ticker_list_path
+from stockify.config import add_settings_argument, get_ticker_list_path
 from stockify.utils.logger import logger_terminal as logger
 
 def load_ticker_list():
@@ -14,5 +22,15 @@ def load_ticker_list():
             # logger.info(symbol)
         return symbol
     except Exception as e:
-        logger.error(f"{e}")
-        return []
\ No newline at end of file
+        logger.error("%s", e)
+        return []
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Symbols of the configured ticker list")
+    parser.add_argument("--count", action="store_true", help="only print how many there are")
+    add_settings_argument(parser)
+    args = parser.parse_args()
+
+    symbols = load_ticker_list()
+    print(len(symbols) if args.count else "\n".join(symbols))
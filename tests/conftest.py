@@ -0,0 +1,25 @@
+# tests/conftest.py
+import os
+import tempfile
+from pathlib import Path
+
+# Modules read their settings at import time, so the test config has to be in
+# place before anything from `stockify` is imported: state and logs go to a
+# scratch directory, data comes from the offline synthetic source.
+_TEST_ROOT = Path(tempfile.mkdtemp(prefix="stockify-tests-"))
+_CONFIG = _TEST_ROOT / "config.yaml"
+_CONFIG.write_text(
+    "ingestion:\n"
+    "  source: synthetic\n"
+    "  request_timeout_seconds: 5\n"
+    "rate_limit:\n"
+    "  initial_rate: 1000\n"
+    "  max_rate: 1000\n"
+    "  burst: 100\n"
+    "paths:\n"
+    f"  logs: {_TEST_ROOT / 'logs'}\n"
+    f"  state: {_TEST_ROOT / 'state'}\n"
+)
+os.environ["STOCKIFY_CONFIG"] = str(_CONFIG)
+for name in [name for name in os.environ if name.startswith("STOCKIFY__")]:
+    del os.environ[name]
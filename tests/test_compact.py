@@ -0,0 +1,27 @@
+# tests/test_compact.py
+import polars as pl
+from stockify.orchestration.compact import RawCompactor
+
+
+def _calendar(average: float) -> pl.DataFrame:
+    return pl.DataFrame({"symbol": ["A.NS", "B.NS"], "as_of_date": ["2026-01-02"] * 2,
+                         "Earnings Average": [average, 1.0], "Earnings Date": [None, "2026-02-01"]})
+
+
+def test_content_hash_depends_only_on_content_columns():
+    first = RawCompactor._with_keys("calendar", _calendar(10.0))
+    again = RawCompactor._with_keys("calendar", _calendar(10.0).with_columns(as_of_date=pl.lit("2026-01-03")))
+    changed = RawCompactor._with_keys("calendar", _calendar(11.0))
+    assert first["_key"].to_list() == ["A.NS|", "B.NS|"]
+    assert first["_content_hash"].to_list() == again["_content_hash"].to_list()
+    assert first["_content_hash"].to_list()[1:] == changed["_content_hash"].to_list()[1:]
+    assert first["_content_hash"][0] != changed["_content_hash"][0]
+
+
+def test_rerun_writes_only_new_or_changed_keys(tmp_path):
+    compactor = RawCompactor(tmp_path, tmp_path / "compaction.sqlite")
+    compactor.read_partition = lambda func, files: _calendar(10.0)
+    assert compactor.compact_partition("calendar", "2026-01-02", []) == (2, 2)
+    assert compactor.compact_partition("calendar", "2026-01-03", []) == (2, 0)
+    compactor.read_partition = lambda func, files: _calendar(11.0)
+    assert compactor.compact_partition("calendar", "2026-01-04", []) == (2, 1)
@@ -0,0 +1,39 @@
+# tests/test_config.py
+import sys
+import pytest
+from stockify import config
+from stockify.config import cli_overrides, get_settings, set_cli_overrides
+
+
+@pytest.fixture
+def fresh_settings(monkeypatch):
+    monkeypatch.setattr(config, "_cli_overrides", ())
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_cli_overrides_parses_both_spellings():
+    argv = ["--date", "2026-01-02", "--set", "ingestion.batch_size=50", "--set=writer.format=parquet"]
+    assert cli_overrides(argv) == ["ingestion.batch_size=50", "writer.format=parquet"]
+
+
+def test_settings_ignore_the_process_command_line(fresh_settings, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "--set", "ingestion.batch_size=50"])
+    assert get_settings().ingestion.batch_size != 50
+
+
+def test_set_cli_overrides_applies_typed_values(fresh_settings, monkeypatch):
+    monkeypatch.setenv("STOCKIFY__INGESTION__BATCH_SIZE", "20")
+    set_cli_overrides(["ingestion.batch_size=50", "scheduling.enabled=true"])
+    settings = get_settings()
+    assert settings.ingestion.batch_size == 50                  # command line wins over the environment
+    assert settings.scheduling.enabled is True
+    assert settings.overrides[-2:] == ("ingestion.batch_size=50", "scheduling.enabled=true")
+
+
+def test_set_cli_overrides_after_settings_were_read_raises(fresh_settings):
+    get_settings()
+    set_cli_overrides([])                                       # nothing changes, nothing to warn about
+    with pytest.raises(RuntimeError):
+        set_cli_overrides(["ingestion.batch_size=50"])
@@ -0,0 +1,85 @@
+# tests/test_executor.py
+import asyncio
+import threading
+import pytest
+from stockify.utils.executor import TrackedExecutor
+
+
+async def _make_zombie(executor: TrackedExecutor, release: threading.Event) -> None:
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run(lambda: release.wait(5), timeout=0.05)
+
+
+def test_run_returns_the_result_and_counts_nothing_abandoned():
+    executor = TrackedExecutor(max_workers=2, zombie_headroom=1)
+    assert asyncio.run(executor.run(lambda: 42, timeout=1)) == 42
+    assert executor.stats()["abandoned"] == 0
+    executor.shutdown()
+
+
+def test_admit_without_headroom_never_waits():
+    executor = TrackedExecutor(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        assert not await asyncio.wait_for(executor.admit(), timeout=1)        # idle pool
+        await _make_zombie(executor, release)
+        assert executor.zombies == 1
+        assert not executor.saturated
+        assert not await asyncio.wait_for(executor.admit(), timeout=1)
+
+    asyncio.run(scenario())
+    release.set()
+    executor.shutdown()
+
+
+def test_admit_waits_until_a_zombie_returns():
+    executor = TrackedExecutor(max_workers=1, zombie_headroom=1)
+    release = threading.Event()
+
+    async def scenario():
+        assert not await executor.admit()
+        await _make_zombie(executor, release)
+        assert executor.saturated
+        admitted = asyncio.create_task(executor.admit())
+        await asyncio.sleep(0.05)
+        assert not admitted.done()
+        release.set()
+        assert await asyncio.wait_for(admitted, timeout=2)
+        assert executor.zombies == 0
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+
+def test_admit_does_not_miss_a_wakeup_racing_with_registration():
+    executor = TrackedExecutor(max_workers=1, zombie_headroom=1)
+
+    async def scenario():
+        for _ in range(50):
+            release = threading.Event()
+            await _make_zombie(executor, release)
+            # the zombie returns while `admit` is between its first check and waiting
+            threading.Timer(0.001, release.set).start()
+            await asyncio.wait_for(executor.admit(), timeout=2)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+
+def test_timeout_of_a_queued_call_cancels_it_instead_of_counting_a_zombie():
+    executor = TrackedExecutor(max_workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(lambda: release.wait(5), timeout=5))
+        await asyncio.sleep(0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(lambda: None, timeout=0.05)          # never gets a thread
+        assert executor.stats()["zombies"] == 0
+        assert executor.stats()["abandoned"] == 1
+        release.set()
+        assert await blocker
+
+    asyncio.run(scenario())
+    executor.shutdown()
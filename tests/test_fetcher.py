@@ -0,0 +1,120 @@
+# tests/test_fetcher.py
+import asyncio
+import time
+import pandas as pd
+import pytest
+from stockify.ingest import fetcher
+from stockify.ingest.fetcher import FetchMetaData
+from stockify.ingest.rate_control import AdaptiveRateController
+from stockify.ingest.sources import SourceProvider
+from stockify.ingest.symbol_cache import SymbolResolutionCache
+
+FRAME = pd.DataFrame({"Dividends": [1.0]}, index=pd.DatetimeIndex(["2026-01-02"]))
+
+
+class RateLimited(Exception):
+    pass
+
+
+class ScriptedProvider(SourceProvider):
+    """Answers per variant: a payload, an exception to raise, or `"sleep"` (outlives the timeout)."""
+    name = "scripted"
+
+    def __init__(self, answers: dict):
+        self.answers = answers
+        self.calls: list[str] = []
+
+    def fetch(self, symbol, func, **kwargs):
+        self.calls.append(symbol)
+        answer = self.answers[symbol]
+        if isinstance(answer, str) and answer == "sleep":
+            time.sleep(0.3)
+            return FRAME
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def is_rate_limit_error(self, exc):
+        return isinstance(exc, RateLimited)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = SymbolResolutionCache(tmp_path / "symbol_cache.json")
+    monkeypatch.setattr(fetcher, "get_symbol_cache", lambda: cache)
+    monkeypatch.setattr(fetcher, "rate_controller", AdaptiveRateController(initial_rate=1000, max_rate=1000,
+                                                                           burst=100, cooldown_seconds=0))
+    monkeypatch.setattr(fetcher, "_semaphore", None)        # bound to the event loop of an earlier test
+    return cache
+
+
+def _fetch(monkeypatch, answers: dict, func: str = "get_actions", meta: FetchMetaData = None):
+    provider = ScriptedProvider(answers)
+    monkeypatch.setattr(fetcher, "get_source_provider", lambda: provider)
+    meta = meta or FetchMetaData("ABC.NS", retries=1)
+    result = asyncio.run(meta.fetch_meta_data(func, timeout=0.1))
+    return result, meta, provider
+
+
+def test_first_valid_variant_wins(cache, monkeypatch):
+    result, meta, provider = _fetch(monkeypatch, {"ABC.NS": FRAME, "ABC.BO": FRAME})
+    assert result is FRAME
+    assert provider.calls == ["ABC.NS"]
+    assert cache.order_variants("ABC", ["ABC.NS", "ABC.BO"])[0] == "ABC.NS"
+
+
+def test_empty_result_moves_on_to_the_next_variant(cache, monkeypatch):
+    result, meta, provider = _fetch(monkeypatch, {"ABC.NS": pd.DataFrame(), "ABC.BO": FRAME})
+    assert result is FRAME
+    assert provider.calls == ["ABC.NS", "ABC.BO"]
+    assert cache.order_variants("ABC", ["ABC.NS", "ABC.BO"])[0] == "ABC.BO"
+
+
+def test_delisted_variant_is_cached_dead_and_skipped(cache, monkeypatch):
+    result, meta, provider = _fetch(monkeypatch, {"ABC.NS": Exception("ABC.NS: possibly delisted"),
+                                                  "ABC.BO": FRAME})
+    assert result is FRAME
+    assert cache.order_variants("ABC", ["ABC.NS", "ABC.BO"]) == ["ABC.BO"]
+
+
+@pytest.mark.parametrize("answer", ["sleep", ConnectionError("reset by peer"), RateLimited("429")],
+                         ids=["timeout", "error", "rate_limit"])
+def test_transient_failure_gives_up_on_the_item_not_the_exchange(cache, monkeypatch, answer):
+    result, meta, provider = _fetch(monkeypatch, {"ABC.NS": answer, "ABC.BO": FRAME})
+    assert result is None
+    assert meta.retryable
+    assert provider.calls == ["ABC.NS"]                      # never resolved to BSE
+    assert cache.order_variants("ABC", ["ABC.NS", "ABC.BO"]) == ["ABC.NS", "ABC.BO"]
+
+
+def test_all_variants_empty_or_delisted_is_not_retryable(cache, monkeypatch):
+    result, meta, provider = _fetch(monkeypatch, {"ABC.NS": pd.DataFrame(),
+                                                  "ABC.BO": Exception("No data found, symbol may be delisted")})
+    assert result is None
+    assert not meta.retryable
+    assert "ABC.BO" in meta.failure_reason
+
+
+def test_retryable_flag_does_not_leak_into_a_later_fetch(cache, monkeypatch):
+    _, meta, _ = _fetch(monkeypatch, {"ABC.NS": "sleep", "ABC.BO": FRAME})
+    assert meta.retryable
+    result, meta, _ = _fetch(monkeypatch, {"ABC.NS": pd.DataFrame(), "ABC.BO": pd.DataFrame()}, meta=meta)
+    assert result is None
+    assert not meta.retryable
+    assert meta.failure_reason == "empty result from ABC.BO"
+
+
+def test_every_variant_cached_dead_skips_the_fetch(cache, monkeypatch):
+    cache.record_dead("ABC.NS")
+    cache.record_dead("ABC.BO")
+    result, meta, provider = _fetch(monkeypatch, {})
+    assert result is None
+    assert not meta.retryable
+    assert provider.calls == []
+
+
+def test_provider_without_bulk_history_only_needs_fetch():
+    provider = ScriptedProvider({})
+    assert not provider.supports_bulk_history
+    with pytest.raises(NotImplementedError, match="scripted"):
+        provider.download_many(["ABC.NS"])
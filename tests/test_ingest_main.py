@@ -0,0 +1,24 @@
+# tests/test_ingest_main.py
+from datetime import date
+import pandas as pd
+from stockify.ingest import ingest_main
+from stockify.ingest.content_index import ContentHashIndex
+from stockify.ingest.parquet_writer import ParquetBatchWriter
+from stockify.ingest.watermark import HistoryWatermarkStore
+
+
+def test_hash_of_a_write_that_flushes_on_the_spot_is_confirmed(tmp_path, monkeypatch):
+    content_index = ContentHashIndex(tmp_path / "content_index.sqlite")
+    watermarks = HistoryWatermarkStore(tmp_path / "watermarks.json")
+    writer = ParquetBatchWriter(tmp_path / "raw", max_rows=1)
+    writer.on_flush = content_index.confirm
+    monkeypatch.setattr(ingest_main, "get_content_index", lambda: content_index)
+    monkeypatch.setattr(ingest_main, "get_parquet_writer", lambda root_dir: writer)
+    monkeypatch.setattr(ingest_main, "get_watermark_store", lambda: watermarks)
+
+    frame = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2026-01-02"]))
+    content_hash = ContentHashIndex.hash_payload(frame)
+    ingest_main._buffer_for_parquet("A.NS", "A", "history", "2026-01-02", frame, content_hash, date(2026, 1, 2))
+
+    assert content_index.unchanged("A.NS", "history", content_hash) == "yf/func=history/as_of_date=2026-01-02"
+    assert watermarks.get("A.NS") == date(2026, 1, 2)
@@ -0,0 +1,104 @@
+# tests/test_manifest.py
+import pandas as pd
+from stockify.ingest.manifest import RunManifest
+from stockify.ingest.parquet_writer import ParquetBatchWriter
+
+
+def _set_updated_at(manifest: RunManifest, symbol: str, func: str, batch_date: str, updated_at: str) -> None:
+    with manifest._conn:
+        manifest._conn.execute("UPDATE items SET updated_at = ? WHERE symbol = ? AND func = ? AND batch_date = ?",
+                               (updated_at, symbol, func, batch_date))
+
+
+def test_completed_only_counts_terminal_statuses(tmp_path):
+    manifest = RunManifest(tmp_path / "manifest.sqlite")
+    for symbol, status in [("A", "done"), ("B", "failed"), ("C", "buffered"), ("D", "unchanged"), ("E", "quarantined")]:
+        manifest.record(symbol, "calendar", "2026-01-02", status)
+    assert manifest.completed("calendar", "2026-01-02") == {"A", "D", "E"}
+
+    manifest.mark_flushed("calendar", "2026-01-02", ["C"])
+    assert "C" in manifest.completed("calendar", "2026-01-02")
+
+
+def test_item_flushed_before_its_buffered_record_ends_up_done(tmp_path):
+    manifest = RunManifest(tmp_path / "manifest.sqlite")
+    writer = ParquetBatchWriter(tmp_path / "raw", max_rows=4)
+    writer.on_flush = manifest.mark_flushed
+    frame = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.date_range("2026-01-01", periods=2))
+
+    # the pipeline records `buffered` only after `write` returns
+    writer.write("A", "history", "2026-01-02", frame)
+    manifest.record("A", "history", "2026-01-02", "buffered")
+    assert writer.write("B", "history", "2026-01-02", frame)            # crosses max_rows, flushes A and B
+    manifest.record("B", "history", "2026-01-02", "buffered")
+
+    assert manifest.completed("history", "2026-01-02") == {"A", "B"}
+    assert manifest.summary("2026-01-02") == {"history": {"done": 2}}
+
+    # the next time B is only buffered, it stays buffered until flushed
+    manifest.record("B", "history", "2026-01-02", "buffered")
+    assert manifest.completed("history", "2026-01-02") == {"A"}
+
+
+def test_record_counts_attempts(tmp_path):
+    manifest = RunManifest(tmp_path / "manifest.sqlite")
+    manifest.record("A", "history", "2026-01-02", "failed")
+    manifest.record("A", "history", "2026-01-02", "done", row_count=3)
+    attempts, status = manifest._conn.execute("SELECT attempts, status FROM items").fetchone()
+    assert (attempts, status) == (2, "done")
+
+
+def test_merge_newest_record_wins(tmp_path):
+    main = RunManifest(tmp_path / "main.sqlite")
+    other = RunManifest(tmp_path / "other.sqlite")
+
+    main.record("A", "history", "2026-01-02", "failed")
+    _set_updated_at(main, "A", "history", "2026-01-02", "2026-01-02T10:00:00")
+    other.record("A", "history", "2026-01-02", "done")
+    _set_updated_at(other, "A", "history", "2026-01-02", "2026-01-02T11:00:00")
+
+    main.record("B", "history", "2026-01-02", "done")
+    _set_updated_at(main, "B", "history", "2026-01-02", "2026-01-02T12:00:00")
+    other.record("B", "history", "2026-01-02", "failed")
+    _set_updated_at(other, "B", "history", "2026-01-02", "2026-01-02T09:00:00")
+
+    other.record("C", "history", "2026-01-02", "done")
+    other.close()
+
+    assert main.merge(tmp_path / "other.sqlite") == 3
+    assert main.completed("history", "2026-01-02") == {"A", "B", "C"}
+    assert main.summary("2026-01-02") == {"history": {"done": 3}}
+
+
+def test_merge_keeps_run_unfinished_until_every_part_finished(tmp_path):
+    main = RunManifest(tmp_path / "main.sqlite")
+    other = RunManifest(tmp_path / "other.sqlite")
+    main.start_run("2026-01-02", ["history"])
+    main.finish_run("2026-01-02")
+    other.start_run("2026-01-02", ["history"])
+    other.close()
+
+    main.merge(tmp_path / "other.sqlite")
+    assert main.last_unfinished_run() == ("2026-01-02", ["history"])
+
+
+def test_merge_detaches_the_other_database(tmp_path):
+    main = RunManifest(tmp_path / "main.sqlite")
+    RunManifest(tmp_path / "other.sqlite").close()
+    main.merge(tmp_path / "other.sqlite")
+    main.merge(tmp_path / "other.sqlite")           # would fail if `other` were still attached
+    assert [row[1] for row in main._conn.execute("PRAGMA database_list")] == ["main"]
+
+
+def test_recent_statuses_newest_first_within_window(tmp_path):
+    manifest = RunManifest(tmp_path / "manifest.sqlite")
+    for batch_date, status in [("2026-01-01", "done"), ("2026-01-03", "unchanged"), ("2026-01-05", "done")]:
+        manifest.record("A", "calendar", batch_date, status)
+    manifest.record("B", "history", "2026-01-03", "done")
+
+    assert manifest.recent_statuses("calendar", "2026-01-02", "2026-01-05") == {
+        "A": [("2026-01-03", "unchanged")],
+    }
+    assert list(manifest.recent_statuses("calendar", "2026-01-01", "2026-01-06")["A"]) == [
+        ("2026-01-05", "done"), ("2026-01-03", "unchanged"), ("2026-01-01", "done"),
+    ]
@@ -0,0 +1,104 @@
+# tests/test_parquet_writer.py
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from stockify.ingest.parquet_writer import ParquetBatchWriter
+
+BATCH_DATE = "2026-03-02"
+
+
+def _frame(rows: int = 2) -> pd.DataFrame:
+    return pd.DataFrame({"Close": [float(i) for i in range(rows)]},
+                        index=pd.date_range("2026-02-02", periods=rows, name="Date"))
+
+
+@pytest.fixture
+def flushes():
+    return []
+
+
+@pytest.fixture
+def writer(tmp_path, flushes):
+    writer = ParquetBatchWriter(tmp_path, max_rows=5, max_bytes=1 << 30)
+    writer.on_flush = lambda func, batch_date, symbols: flushes.append((func, batch_date, symbols))
+    return writer
+
+
+# Arrow conversion
+
+def test_to_arrow_frame_keeps_columns_and_labels_the_index():
+    table = ParquetBatchWriter.to_arrow("A.NS", "history", _frame())
+    assert table.column_names == ["symbol", "Close", "Date"]
+    assert table.column("symbol").to_pylist() == ["A.NS", "A.NS"]
+    assert table.schema.metadata is None
+
+    table = ParquetBatchWriter.to_arrow("A.NS", "get_actions", _frame(1))
+    assert "get_actions_features" in table.column_names
+
+
+def test_to_arrow_mixed_object_column_is_stored_as_text():
+    frame = pd.DataFrame({"Value": ["x", 1.5]}, index=pd.RangeIndex(2))
+    table = ParquetBatchWriter.to_arrow("A.NS", "calendar", frame)
+    assert table.column("Value").to_pylist() == ["x", "1.5"]
+
+
+def test_to_arrow_dicts_and_lists_become_json_payload_rows():
+    table = ParquetBatchWriter.to_arrow("A.NS", "info", {"sector": "IT", 1: 2})
+    assert table.num_rows == 1
+    assert json.loads(table.column("payload")[0].as_py()) == {"sector": "IT", "1": 2}
+
+    table = ParquetBatchWriter.to_arrow("A.NS", "get_news", [{"title": "a"}, {"title": "b"}])
+    assert table.column("payload").to_pylist() == ['{"title": "a"}', '{"title": "b"}']
+
+
+@pytest.mark.parametrize("data", [pd.DataFrame(), {}, [], 42], ids=["frame", "dict", "list", "unsupported"])
+def test_to_arrow_empty_or_unsupported_is_none(data):
+    assert ParquetBatchWriter.to_arrow("A.NS", "history", data) is None
+
+
+# Flush bounds
+
+def test_write_buffers_below_the_row_bound(writer, tmp_path, flushes):
+    assert writer.write("A.NS", "history", BATCH_DATE, _frame(2)) == []
+    assert writer.write("B.NS", "history", BATCH_DATE, _frame(2)) == []
+    assert flushes == []
+    assert not (tmp_path / "yf").exists()
+
+
+def test_write_crossing_the_row_bound_flushes_the_partition(writer, tmp_path, flushes):
+    writer.write("A.NS", "history", BATCH_DATE, _frame(3))
+    written = writer.write("B.NS", "history", BATCH_DATE, _frame(3), source_symbol="B")
+    assert len(written) == 1
+    assert written[0].parent == tmp_path / "yf" / "func=history" / f"as_of_date={BATCH_DATE}"
+    assert pq.read_table(written[0]).column("symbol").to_pylist() == ["A.NS"] * 3 + ["B.NS"] * 3
+    assert flushes == [("history", BATCH_DATE, ["A.NS", "B"])]
+    assert writer.flush() == []                                  # nothing left behind
+
+
+def test_write_crossing_the_byte_bound_flushes(tmp_path, flushes):
+    writer = ParquetBatchWriter(tmp_path, max_rows=1000, max_bytes=1)
+    writer.on_flush = lambda *args: flushes.append(args)
+    assert len(writer.write("A.NS", "history", BATCH_DATE, _frame(1))) == 1
+    assert len(flushes) == 1
+
+
+def test_partitions_are_buffered_and_flushed_separately(writer, tmp_path, flushes):
+    writer.write("A.NS", "history", BATCH_DATE, _frame(2))
+    writer.write("A.NS", "history", "2026-03-03", _frame(2))
+    writer.write("A.NS", "get_news", BATCH_DATE, [{"title": "a"}])
+    written = writer.flush()
+    assert sorted(path.parent.relative_to(tmp_path).as_posix() for path in written) == [
+        "yf/func=get_news/as_of_date=2026-03-02",
+        "yf/func=history/as_of_date=2026-03-02",
+        "yf/func=history/as_of_date=2026-03-03",
+    ]
+    assert sorted(flushes) == [("get_news", BATCH_DATE, ["A.NS"]), ("history", BATCH_DATE, ["A.NS"]),
+                               ("history", "2026-03-03", ["A.NS"])]
+
+
+def test_incompatible_schemas_are_written_to_separate_files(writer, tmp_path):
+    writer.write("A.NS", "calendar", BATCH_DATE, pd.DataFrame({"Value": [1.0]}))
+    writer.write("B.NS", "calendar", BATCH_DATE, pd.DataFrame({"Value": ["x"]}))
+    written = writer.flush()
+    assert sorted(pq.read_table(path).num_rows for path in written) == [1, 1]
@@ -0,0 +1,59 @@
+# tests/test_pipeline.py
+import asyncio
+from datetime import date
+import pandas as pd
+import pytest
+from stockify.ingest.dead_letter import DeadLetterQueue
+from stockify.ingest.fetcher import FetchFailed
+from stockify.ingest.manifest import RunManifest
+from stockify.orchestration import pipeline
+from stockify.orchestration.pipeline import IngestionPipeline, WorkItem
+
+BATCH_DATE = date(2026, 3, 2)
+FRAME = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2026-03-02"]))
+
+
+@pytest.fixture
+def dead_letters(tmp_path):
+    return DeadLetterQueue(tmp_path / "dead_letter.sqlite", max_attempts=3)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return RunManifest(tmp_path / "manifest.sqlite")
+
+
+def _run(monkeypatch, manifest, dead_letters, fetched: dict, written: dict, replay: bool = False) -> dict:
+    async def fetch_for_symbol(stock_symbol, job_run_date, func, period, retries=3):
+        answer = fetched[stock_symbol]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    async def write_result(stock_symbol, job_run_date, func, result):
+        return written[stock_symbol]
+
+    monkeypatch.setattr(pipeline, "fetch_for_symbol", fetch_for_symbol)
+    monkeypatch.setattr(pipeline, "write_result", write_result)
+    runner = IngestionPipeline(job_run_date=BATCH_DATE, fetch_workers=2, write_workers=1, queue_size=4,
+                               manifest=manifest, dead_letters=dead_letters, replay=replay)
+    return asyncio.run(runner.run([WorkItem(symbol, "calendar") for symbol in fetched]))
+
+
+def test_retryable_fetch_failures_and_failed_writes_are_dead_lettered(monkeypatch, manifest, dead_letters):
+    summary = _run(monkeypatch, manifest, dead_letters,
+                   fetched={"A.NS": FRAME, "B.NS": FRAME, "C.NS": FetchFailed("timeout"),
+                            "D.NS": FetchFailed("delisted", retryable=False)},
+                   written={"A.NS": "done", "B.NS": "failed"})
+    assert (summary["written"], summary["failed"], summary["dead_lettered"]) == (1, 3, 2)
+    assert {(row["symbol"], row["reason"]) for row in dead_letters.items()} == {
+        ("B.NS", "write failed, see the ingestion log"), ("C.NS", "timeout")}
+    assert manifest.summary(str(BATCH_DATE)) == {"calendar": {"done": 1, "failed": 3}}
+
+
+def test_replay_resolves_written_items_and_requeues_failed_writes(monkeypatch, manifest, dead_letters):
+    for symbol in ("A.NS", "B.NS"):
+        dead_letters.push(symbol, "calendar", str(BATCH_DATE), "timeout")
+    _run(monkeypatch, manifest, dead_letters, fetched={"A.NS": FRAME, "B.NS": FRAME},
+         written={"A.NS": "done", "B.NS": "failed"}, replay=True)
+    assert [(row["symbol"], row["attempts"]) for row in dead_letters.items()] == [("B.NS", 2)]
@@ -0,0 +1,61 @@
+# tests/test_rate_control.py
+import asyncio
+import time
+import pytest
+from stockify.ingest.rate_control import AdaptiveRateController
+
+
+def test_success_increases_rate_additively_up_to_max():
+    controller = AdaptiveRateController(initial_rate=2.0, max_rate=2.2, additive_increase=0.1)
+    controller.record_success()
+    assert controller.rate == pytest.approx(2.0 + 0.1 / 2.0)
+    for _ in range(100):
+        controller.record_success()
+    assert controller.rate == 2.2
+    assert controller.peak_rate == 2.2
+
+
+def test_throttle_decreases_rate_multiplicatively_down_to_min():
+    controller = AdaptiveRateController(initial_rate=4.0, min_rate=0.5, decrease_factor=0.5, cooldown_seconds=0)
+    assert controller.record_throttle()
+    assert controller.rate == 2.0
+    for _ in range(10):
+        controller.record_throttle()
+    assert controller.rate == 0.5
+    assert controller.throttle_events == 11
+
+
+def test_throttles_during_a_pause_count_once():
+    controller = AdaptiveRateController(initial_rate=4.0, decrease_factor=0.5, cooldown_seconds=60)
+    assert controller.record_throttle()
+    assert controller.paused
+    assert not controller.record_throttle()
+    assert (controller.rate, controller.throttle_events) == (2.0, 1)
+
+
+def test_acquire_spends_burst_then_waits_for_the_rate():
+    controller = AdaptiveRateController(initial_rate=50.0, max_rate=50.0, burst=3)
+
+    async def take(count: int) -> float:
+        started = time.monotonic()
+        for _ in range(count):
+            await controller.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(take(3)) < 0.05                  # the burst goes out at once
+    assert asyncio.run(take(5)) >= 4 / 50 * 0.9         # then about one request per 1/rate seconds
+    assert controller.requests == 8
+
+
+def test_acquire_waits_out_a_pause():
+    controller = AdaptiveRateController(initial_rate=100.0, cooldown_seconds=0.2, burst=5)
+    controller.record_throttle()
+    started = time.monotonic()
+    asyncio.run(controller.acquire())
+    assert time.monotonic() - started >= 0.15
+
+
+def test_scale_shrinks_the_budget():
+    controller = AdaptiveRateController(initial_rate=4.0, min_rate=0.4, max_rate=8.0, burst=6)
+    controller.scale(0.5)
+    assert (controller.rate, controller.min_rate, controller.max_rate, controller.burst) == (2.0, 0.2, 4.0, 3)
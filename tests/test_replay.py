@@ -0,0 +1,97 @@
+# tests/test_replay.py
+import asyncio
+from datetime import date
+import pandas as pd
+import pytest
+from stockify.ingest import watermark
+from stockify.ingest.dead_letter import DeadLetterQueue
+from stockify.ingest.manifest import RunManifest
+from stockify.ingest.watermark import HistoryWatermarkStore
+from stockify.orchestration import pipeline, replay
+
+RUN_DATE = date(2026, 3, 6)
+FRAME = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2026-03-05"]))
+
+
+@pytest.fixture
+def dead_letters(tmp_path, monkeypatch):
+    queue = DeadLetterQueue(tmp_path / "dead_letter.sqlite", max_attempts=5)
+    monkeypatch.setattr(replay, "get_dead_letter_queue", lambda: queue)
+    return queue
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return RunManifest(tmp_path / "manifest.sqlite")
+
+
+@pytest.fixture
+def watermarks(tmp_path, monkeypatch):
+    store = HistoryWatermarkStore(tmp_path / "watermarks.json")
+    monkeypatch.setattr(watermark, "get_watermark_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    writes = []
+
+    async def fetch_for_symbol(stock_symbol, job_run_date, func, period, retries=3):
+        return FRAME
+
+    async def write_result(stock_symbol, job_run_date, func, result):
+        writes.append((stock_symbol, func, str(job_run_date)))
+        return "done"
+
+    monkeypatch.setattr(pipeline, "fetch_for_symbol", fetch_for_symbol)
+    monkeypatch.setattr(pipeline, "write_result", write_result)
+    return writes
+
+
+def _retry(manifest):
+    return asyncio.run(replay.retry_dead_letters(manifest, concurrency=1, run_date=RUN_DATE))
+
+
+def test_old_entries_are_written_under_the_run_date(dead_letters, manifest, watermarks, writes):
+    dead_letters.push("A.NS", "calendar", "2026-03-02", "timeout")
+    dead_letters.push("A.NS", "calendar", "2026-03-04", "timeout")
+    dead_letters.push("B.NS", "calendar", str(RUN_DATE), "timeout")
+    summary = _retry(manifest)
+
+    assert sorted(writes) == [("A.NS", "calendar", "2026-03-06"), ("B.NS", "calendar", "2026-03-06")]
+    assert summary["total"] == 2                                # both dates of A in one fetch
+    assert dead_letters.items(("pending", "exhausted")) == []
+    assert manifest.summary("2026-03-02") == {}
+
+
+def test_history_is_replayed_from_the_watermark_unless_it_is_stale(dead_letters, manifest, watermarks, writes):
+    watermarks.update("A.NS", date(2026, 3, 3))                 # a later run got past the failed day
+    watermarks.update("B.NS", date(2026, 2, 27))
+    dead_letters.push("A.NS", "history", "2026-03-02", "timeout")
+    dead_letters.push("B.NS", "history", "2026-03-02", "timeout")
+    _retry(manifest)
+
+    assert writes == [("B.NS", "history", "2026-03-06")]
+    assert dead_letters.items(("pending", "exhausted")) == []
+
+
+def test_entries_the_run_date_already_completed_are_dropped(dead_letters, manifest, watermarks, writes):
+    manifest.record("A.NS", "calendar", str(RUN_DATE), "unchanged")
+    dead_letters.push("A.NS", "calendar", "2026-03-02", "timeout")
+    assert _retry(manifest) == {}
+    assert writes == []
+    assert dead_letters.items(("pending", "exhausted")) == []
+
+
+def test_failed_replay_keeps_the_item_queued_under_the_run_date(dead_letters, manifest, watermarks, monkeypatch):
+    async def fetch_for_symbol(stock_symbol, job_run_date, func, period, retries=3):
+        raise replay_failure
+
+    replay_failure = pipeline.FetchFailed("timeout")
+    monkeypatch.setattr(pipeline, "fetch_for_symbol", fetch_for_symbol)
+    dead_letters.push("A.NS", "calendar", "2026-03-02", "timeout")
+    dead_letters.push("A.NS", "calendar", "2026-03-02", "timeout")
+    _retry(manifest)
+
+    [row] = dead_letters.items()
+    assert (row["batch_date"], row["attempts"]) == ("2026-03-06", 3)
@@ -0,0 +1,157 @@
+# tests/test_scheduler.py
+from datetime import date, timedelta
+import pytest
+from stockify.config import SchedulingIntervals
+from stockify.ingest.manifest import RunManifest
+from stockify.ingest.symbol_signals import SymbolSignals
+from stockify.orchestration.scheduler import Scheduler
+
+BATCH_DATE = date(2026, 3, 2)
+
+
+def _days_ago(days: int) -> str:
+    return (BATCH_DATE - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return RunManifest(tmp_path / "manifest.sqlite")
+
+
+@pytest.fixture
+def signals(tmp_path):
+    return SymbolSignals(tmp_path / "signals.sqlite")
+
+
+@pytest.fixture
+def scheduler(manifest, signals):
+    return Scheduler(manifest, signals,
+                     intervals=SchedulingIntervals(history=1, get_news=1, get_actions=7, earnings_dates=7, calendar=7),
+                     max_interval_days=30, adaptive_methods=("calendar", "get_actions"), backoff_after=2,
+                     tier_sizes=(1, 1), tier_interval_factors=(1, 2, 4),
+                     event_window_days=3, event_methods=("calendar", "history"), max_requests=0)
+
+
+def _set_turnover(signals: SymbolSignals, turnover: dict) -> None:
+    for symbol, value in turnover.items():
+        signals._update_turnover(symbol, value, 20, BATCH_DATE)
+
+
+# Intervals and back-off
+
+def test_interval_scales_with_tier_and_caps(scheduler):
+    assert scheduler.interval("calendar", 0, 0) == 7
+    assert scheduler.interval("calendar", 2, 0) == 28
+    assert scheduler.interval("calendar", 2, 5) == 30
+    assert scheduler.interval("unknown_method", 1, 0) == 2
+
+
+def test_back_off_doubles_after_nothing_new_streak(scheduler):
+    assert scheduler.interval("calendar", 0, 1) == 7
+    assert scheduler.interval("calendar", 0, 2) == 14
+    assert scheduler.interval("calendar", 0, 3) == 28
+
+
+def test_back_off_only_for_adaptive_methods(scheduler):
+    # `history` finds nothing new over weekends; that must not slow it down
+    assert scheduler.interval("history", 0, 5) == 1
+
+
+def test_assess_due_once_an_interval_old(scheduler):
+    statuses = [(_days_ago(6), "done")]
+    assert scheduler._assess("A.NS", "calendar", 0, statuses, None, BATCH_DATE) is None
+    item = scheduler._assess("A.NS", "calendar", 0, [(_days_ago(7), "done")], None, BATCH_DATE)
+    assert (item.reason, item.age_days, item.interval_days, item.score) == ("stale", 7, 7, 1.0)
+
+
+def test_assess_streak_counts_only_recent_nothing_new_fetches(scheduler):
+    unchanged = [(_days_ago(10), "unchanged"), (_days_ago(17), "unchanged"), (_days_ago(24), "done")]
+    assert scheduler._assess("A.NS", "calendar", 0, unchanged, None, BATCH_DATE) is None     # every 14 days now
+
+    # failures and quarantined payloads are not fetches: they neither count nor break the streak
+    with_failures = [(_days_ago(1), "failed"), (_days_ago(3), "quarantined")] + unchanged
+    assert scheduler._assess("A.NS", "calendar", 0, with_failures, None, BATCH_DATE) is None
+
+    changed = [(_days_ago(10), "done"), (_days_ago(17), "unchanged"), (_days_ago(24), "unchanged")]
+    assert scheduler._assess("A.NS", "calendar", 0, changed, None, BATCH_DATE).reason == "stale"
+
+
+def test_assess_never_fetched_is_new(scheduler):
+    item = scheduler._assess("A.NS", "calendar", 1, [(_days_ago(1), "failed")], None, BATCH_DATE)
+    assert (item.reason, item.age_days, item.score) == ("new", None, 1.0)       # 2 x interval, tier 1 weight 1/2
+
+
+def test_assess_earnings_window_forces_daily(scheduler):
+    statuses = [(_days_ago(1), "unchanged"), (_days_ago(2), "unchanged"), (_days_ago(3), "unchanged")]
+    item = scheduler._assess("A.NS", "calendar", 2, statuses, BATCH_DATE + timedelta(days=2), BATCH_DATE)
+    assert (item.reason, item.interval_days) == ("event", 1)
+
+    outside = BATCH_DATE + timedelta(days=4)
+    assert scheduler._assess("A.NS", "calendar", 2, statuses, outside, BATCH_DATE) is None
+    # only event_methods are pulled forward
+    assert scheduler._assess("A.NS", "get_actions", 0, [(_days_ago(1), "done")], BATCH_DATE, BATCH_DATE) is None
+
+
+# Tiers
+
+def test_tiers_from_turnover_rank(scheduler, signals):
+    _set_turnover(signals, {"A.NS": 10.0, "B.NS": 300.0, "C.NS": 20.0})
+    assert scheduler.tiers(["A.NS", "B.NS", "C.NS", "D.NS"]) == {"A.NS": 2, "B.NS": 0, "C.NS": 1, "D.NS": 2}
+
+
+def test_tiers_without_any_turnover_are_all_top(scheduler):
+    assert set(scheduler.tiers(["A.NS", "B.NS"]).values()) == {0}
+
+
+def test_tiers_file_only_raises_a_symbol(manifest, signals, tmp_path):
+    tiers_file = tmp_path / "tiers.csv"
+    tiers_file.write_text("symbol,tier\nA,0\nB.NS,2\n")
+    scheduler = Scheduler(manifest, signals, tier_sizes=(1, 1), tier_interval_factors=(1, 2, 4),
+                          tiers_file=tiers_file)
+    _set_turnover(signals, {"A.NS": 1.0, "B.NS": 300.0, "C.NS": 20.0})
+    assert scheduler.tiers(["A.NS", "B.NS", "C.NS"]) == {"A.NS": 0, "B.NS": 0, "C.NS": 1}
+
+
+def test_tier_factors_must_match_tiers(manifest, signals):
+    with pytest.raises(ValueError):
+        Scheduler(manifest, signals, tier_sizes=(10, 20), tier_interval_factors=(1, 2))
+
+
+# Plans
+
+def test_plan_skips_items_not_due(scheduler, manifest):
+    manifest.record("A.NS", "calendar", _days_ago(2), "done")
+    plan = scheduler.plan({"calendar": ["A.NS", "B.NS"]}, BATCH_DATE)
+    assert [(item.symbol, item.reason) for item in plan.items] == [("B.NS", "new")]
+    assert plan.summary["by_method"]["calendar"]["not_due"] == 1
+
+
+def test_plan_budget_keeps_the_most_overdue_and_defers_the_rest(scheduler, manifest):
+    for symbol, age in [("A.NS", 1), ("B.NS", 4), ("C.NS", 2), ("D.NS", 3)]:
+        manifest.record(symbol, "history", _days_ago(age), "done")
+    plan = scheduler.plan({"history": ["A.NS", "B.NS", "C.NS", "D.NS"]}, BATCH_DATE, budget=2)
+    assert [item.symbol for item in plan.items] == ["B.NS", "D.NS"]
+    assert [item.symbol for item in plan.deferred] == ["C.NS", "A.NS"]
+    assert (plan.summary["due"], plan.summary["scheduled"], plan.summary["deferred"]) == (4, 2, 2)
+    assert plan.summary["budget"] == 2
+
+
+def test_plan_without_budget_takes_everything_due_in_ticker_order_on_ties(scheduler):
+    symbols = [f"S{i}.NS" for i in range(5)]
+    plan = scheduler.plan({"get_news": symbols}, BATCH_DATE)
+    assert [item.symbol for item in plan.items] == symbols
+    assert plan.deferred == [] and plan.summary["budget"] is None
+
+
+def test_plan_events_go_before_overdue_items(scheduler, manifest, signals):
+    manifest.record("A.NS", "history", _days_ago(20), "done")
+    manifest.record("B.NS", "history", _days_ago(1), "done")
+    signals._upsert("B.NS", "next_earnings", (BATCH_DATE + timedelta(days=1)).isoformat())
+    plan = scheduler.plan({"history": ["A.NS", "B.NS"]}, BATCH_DATE, budget=1)
+    assert [(item.symbol, item.reason) for item in plan.items] == [("B.NS", "event")]
+
+
+def test_plan_new_method_does_not_starve_overdue_items(scheduler, manifest):
+    manifest.record("A.NS", "history", _days_ago(3), "done")
+    plan = scheduler.plan({"history": ["A.NS"], "get_news": ["A.NS", "B.NS", "C.NS"]}, BATCH_DATE, budget=1)
+    assert [(item.symbol, item.func) for item in plan.items] == [("A.NS", "history")]
@@ -0,0 +1,34 @@
+# tests/test_shard.py
+import zlib
+import pytest
+from stockify.orchestration.shard import parse_shard, select_shard, shard_of
+
+SYMBOLS = [f"SYM{i:04d}.NS" for i in range(500)]
+
+
+def test_shard_of_ignores_exchange_suffix_and_case():
+    for count in (2, 3, 8):
+        assert shard_of("RELIANCE.NS", count) == shard_of("RELIANCE.BO", count) == shard_of("reliance", count)
+
+
+def test_shard_of_is_stable_across_processes():
+    # crc32, not hash(): the assignment must not change with PYTHONHASHSEED or between hosts
+    assert shard_of("RELIANCE.NS", 4) == zlib.crc32(b"RELIANCE") % 4
+    assert [shard_of(symbol, 5) for symbol in SYMBOLS] == [shard_of(symbol, 5) for symbol in SYMBOLS]
+
+
+def test_select_shard_partitions_the_universe():
+    shards = [select_shard(SYMBOLS, index, 4) for index in range(4)]
+    assert sorted(symbol for shard in shards for symbol in shard) == sorted(SYMBOLS)
+    assert all(shards), "every shard should get some of 500 symbols"
+    assert select_shard(list(reversed(SYMBOLS)), 1, 4) == list(reversed(shards[1]))
+
+
+@pytest.mark.parametrize("spec", ["1", "a/b", "4/4", "-1/4", "0/0"])
+def test_parse_shard_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+
+def test_parse_shard():
+    assert parse_shard("2/8") == (2, 8)